@@ -7,6 +7,23 @@ from slackhealthbot.containers import Container
 from slackhealthbot.settings import Settings
 
 
+def verify_credentials(
+    username: str,
+    password: str | None,
+    settings: Settings,
+) -> bool:
+    """
+    :return: True if the username and the hash of the password match
+        the admin username and password hash in the settings.
+    """
+    return bool(
+        username == settings.secret_settings.admin_username
+        and password
+        and settings.secret_settings.admin_password_hash
+        and pbkdf2_sha256.verify(password, settings.secret_settings.admin_password_hash)
+    )
+
+
 class AdminAuth(AuthenticationBackend):
     """
     Basic authentication backend for the sqladmin interface.
@@ -30,13 +47,7 @@ class AdminAuth(AuthenticationBackend):
         username = form["username"]
         password = form["password"]
 
-        if (
-            username == settings.secret_settings.admin_username
-            and password
-            and pbkdf2_sha256.verify(
-                password, settings.secret_settings.admin_password_hash
-            )
-        ):
+        if verify_credentials(username, password, settings):
             request.session["admin"] = True
             return True
 
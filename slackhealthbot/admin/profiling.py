@@ -0,0 +1,121 @@
+from dependency_injector.wiring import Provide, inject
+from fastapi import Request, Response, status
+from fastapi.responses import RedirectResponse
+from sqladmin import BaseView, expose
+
+from slackhealthbot.containers import Container
+from slackhealthbot.core.profiling import (
+    Profile,
+    ProfileMode,
+    Profiler,
+    ProfilerBusyException,
+)
+from slackhealthbot.settings import Settings
+
+
+@inject
+def get_profiler(
+    profiler: Profiler = Provide[Container.profiler],
+) -> Profiler:
+    return profiler
+
+
+def _profile_response(profile: Profile) -> Response:
+    return Response(
+        content=profile.content,
+        media_type=profile.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{profile.filename}"'},
+    )
+
+
+def _parse_mode(value: str | None) -> ProfileMode | None:
+    try:
+        return ProfileMode(value or ProfileMode.sampling)
+    except ValueError:
+        return None
+
+
+class ProfilingAdmin(BaseView):
+    """
+    Profiles of this process, captured on demand: for a duration,
+    or for the next run of a scheduled job.
+
+    The menu links to the exposed method whose name sorts first: the other
+    methods are prefixed with the name of the profiling page.
+    """
+
+    name = "Profiling"
+    icon = "fa-solid fa-fire"
+
+    @expose("/profiling/process", methods=["GET"])
+    @inject
+    async def profiling_process(
+        self,
+        request: Request,
+        settings: Settings = Provide[Container.settings],
+    ):
+        """
+        Profile the process for the duration_s query parameter,
+        and download the profile.
+        """
+        mode = _parse_mode(request.query_params.get("mode"))
+        try:
+            duration_s = float(request.query_params.get("duration_s", "10"))
+        except ValueError:
+            duration_s = 0
+        max_duration_s = settings.app_settings.profiling.max_duration_s
+        if mode is None or not 0 < duration_s <= max_duration_s:
+            return Response(
+                f"The mode must be one of {', '.join(ProfileMode)},"
+                f" and the duration between 0 and {max_duration_s}s",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            profile = await get_profiler().profile_for(duration_s, mode)
+        except ProfilerBusyException as e:
+            return Response(str(e), status_code=status.HTTP_409_CONFLICT)
+        return _profile_response(profile)
+
+    @expose("/profiling/runs/{name}", methods=["POST"])
+    async def profiling_arm_run(self, request: Request):
+        """
+        Profile the next run of the scheduled job.
+        """
+        profiler = get_profiler()
+        name = request.path_params["name"]
+        form = await request.form()
+        mode = _parse_mode(form.get("mode"))
+        if name not in profiler.jobs or mode is None:
+            return Response(status_code=status.HTTP_404_NOT_FOUND)
+        profiler.arm(name, mode)
+        return RedirectResponse(
+            request.url_for("admin:profiling"),
+            status_code=status.HTTP_303_SEE_OTHER,
+        )
+
+    @expose("/profiling/runs/{name}", methods=["GET"])
+    async def profiling_run(self, request: Request):
+        profile = get_profiler().get_run_profile(request.path_params["name"])
+        if profile is None:
+            return Response(status_code=status.HTTP_404_NOT_FOUND)
+        return _profile_response(profile)
+
+    @expose("/profiling", methods=["GET"])
+    async def profiling(self, request: Request):
+        profiler = get_profiler()
+        armed_jobs = profiler.armed_jobs()
+        return await self.templates.TemplateResponse(
+            request,
+            "admin/profiling.html",
+            context={
+                "modes": list(ProfileMode),
+                "jobs": [
+                    {
+                        "name": name,
+                        "armed_mode": armed_jobs.get(name),
+                        "profile": profiler.get_run_profile(name),
+                    }
+                    for name in sorted(profiler.jobs)
+                ],
+            },
+        )
@@ -10,6 +10,8 @@ from slackhealthbot.admin.models import (
     UserAdmin,
     WithingsUserAdmin,
 )
+from slackhealthbot.admin.profiling import ProfilingAdmin
+from slackhealthbot.admin.statements import StatementsAdmin
 from slackhealthbot.containers import Container
 from slackhealthbot.settings import Settings
 
@@ -37,4 +39,6 @@ def init_admin(
     admin.add_view(FitbitUserAdmin)
     admin.add_view(FitbitActivityAdmin)
     admin.add_view(FitbitDailyActivityAdmin)
+    admin.add_view(StatementsAdmin)
+    admin.add_view(ProfilingAdmin)
     return admin
@@ -0,0 +1,36 @@
+from dependency_injector.wiring import Provide, inject
+from fastapi import Request
+from sqladmin import BaseView, expose
+
+from slackhealthbot.containers import Container
+from slackhealthbot.data.database.instrumentation import StatementLog
+
+
+@inject
+def get_statement_log(
+    statement_log: StatementLog = Provide[Container.statement_log],
+) -> StatementLog:
+    return statement_log
+
+
+class StatementsAdmin(BaseView):
+    """
+    Statistics of the database statements executed by this process,
+    and its latest slow statements with their query plan.
+    """
+
+    name = "Database statements"
+    icon = "fa-solid fa-gauge"
+
+    @expose("/statements", methods=["GET"])
+    async def statements(self, request: Request):
+        statement_log = get_statement_log()
+        return await self.templates.TemplateResponse(
+            request,
+            "admin/statements.html",
+            context={
+                "statement_stats": statement_log.stats(),
+                "slow_statements": statement_log.slow_statements(),
+                "slow_threshold_s": statement_log.slow_threshold_s,
+            },
+        )
@@ -1,19 +1,55 @@
 from dependency_injector import containers, providers
+from openai import AsyncOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from slackhealthbot.core.jobqueue import InMemoryJobQueue, JobQueue
+from slackhealthbot.core.profiling import Profiler
+from slackhealthbot.core.ttlcache import TTLCache
+from slackhealthbot.core.workerpool import WorkerPool
 from slackhealthbot.data.database.connection import (
     create_async_session_maker,
+    get_session,
     session_context_manager,
+    session_scope,
 )
-from slackhealthbot.data.repositories.sqlalchemyfitbitrepository import (
-    SQLAlchemyFitbitRepository,
+from slackhealthbot.data.database.instrumentation import StatementLog
+from slackhealthbot.data.repositories.cachedfitbitrepository import (
+    CachedFitbitRepository,
+)
+from slackhealthbot.data.repositories.inmemorydeduperepository import (
+    InMemoryDedupeRepository,
+)
+from slackhealthbot.data.repositories.sqlalchemydeduperepository import (
+    SQLAlchemyDedupeRepository,
+)
+from slackhealthbot.data.repositories.sqlalchemyjobqueue import SQLAlchemyJobQueue
+from slackhealthbot.data.repositories.sqlalchemyleaserepository import (
+    SQLAlchemyLeaseRepository,
+)
+from slackhealthbot.data.repositories.sqlalchemymotivationalmessagerepository import (
+    SQLAlchemyMotivationalMessageRepository,
+)
+from slackhealthbot.data.repositories.sqlalchemyschedulerepository import (
+    SQLAlchemyScheduleRepository,
 )
 from slackhealthbot.data.repositories.sqlalchemywithingsrepository import (
     SQLAlchemyWithingsRepository,
 )
+from slackhealthbot.domain.localrepository.localdeduperepository import (
+    LocalDedupeRepository,
+)
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
 )
+from slackhealthbot.domain.localrepository.localleaserepository import (
+    LocalLeaseRepository,
+)
+from slackhealthbot.domain.localrepository.localmotivationalmessagerepository import (
+    LocalMotivationalMessageRepository,
+)
+from slackhealthbot.domain.localrepository.localschedulerepository import (
+    LocalScheduleRepository,
+)
 from slackhealthbot.domain.localrepository.localwithingsrepository import (
     LocalWithingsRepository,
 )
@@ -46,6 +82,7 @@ from slackhealthbot.remoteservices.repositories.webhookslackrepository import (
 )
 from slackhealthbot.remoteservices.repositories.webopenairepository import (
     WebOpenAiRepository,
+    create_openai_client,
 )
 from slackhealthbot.settings import AppSettings, SecretSettings, Settings
 
@@ -60,6 +97,7 @@ class Container(containers.DeclarativeContainer):
             "slackhealthbot.domain.usecases.fitbit.usecase_get_last_sleep",
             "slackhealthbot.domain.usecases.fitbit.usecase_login_user",
             "slackhealthbot.domain.usecases.fitbit.usecase_post_user_logged_out",
+            "slackhealthbot.domain.usecases.fitbit.usecase_pregenerate_motivational_messages",
             "slackhealthbot.domain.usecases.fitbit.usecase_process_daily_activities",
             "slackhealthbot.domain.usecases.fitbit.usecase_process_daily_activity",
             "slackhealthbot.domain.usecases.fitbit.usecase_process_new_activity",
@@ -83,9 +121,16 @@ class Container(containers.DeclarativeContainer):
             "slackhealthbot.routers.dependencies",
             "slackhealthbot.routers.fitbit",
             "slackhealthbot.routers.google",
+            "slackhealthbot.routers.metrics",
             "slackhealthbot.routers.withings",
+            "slackhealthbot.tasks.configreload",
             "slackhealthbot.tasks.fitbitpoll",
+            "slackhealthbot.tasks.leaderelection",
+            "slackhealthbot.tasks.motivational_messages_task",
+            "slackhealthbot.tasks.scheduler",
             "slackhealthbot.admin.auth",
+            "slackhealthbot.admin.profiling",
+            "slackhealthbot.admin.statements",
             "slackhealthbot.admin.setup",
         ],
     )
@@ -97,6 +142,32 @@ class Container(containers.DeclarativeContainer):
         app_settings,
         secret_settings,
     )
+    response_cache: TTLCache = providers.Singleton(
+        TTLCache,
+        max_entries=settings.provided.app_settings.response_cache.max_entries,
+        ttl_s=settings.provided.app_settings.response_cache.ttl_s,
+    )
+    fitbit_worker_pool: WorkerPool = providers.Singleton(
+        WorkerPool,
+        name="fitbit",
+        worker_count=settings.provided.app_settings.fitbit.workers.worker_count,
+        max_queue_size=settings.provided.app_settings.fitbit.workers.max_queue_size,
+        retry_after_s=settings.provided.app_settings.fitbit.workers.retry_after_s,
+    )
+    withings_worker_pool: WorkerPool = providers.Singleton(
+        WorkerPool,
+        name="withings",
+        worker_count=settings.provided.app_settings.withings.workers.worker_count,
+        max_queue_size=settings.provided.app_settings.withings.workers.max_queue_size,
+        retry_after_s=settings.provided.app_settings.withings.workers.retry_after_s,
+    )
+    google_worker_pool: WorkerPool = providers.Singleton(
+        WorkerPool,
+        name="google",
+        worker_count=settings.provided.app_settings.google.workers.worker_count,
+        max_queue_size=settings.provided.app_settings.google.workers.max_queue_size,
+        retry_after_s=settings.provided.app_settings.google.workers.retry_after_s,
+    )
     slack_repository: RemoteSlackRepository = providers.Factory(
         WebhookSlackRepository,
         settings,
@@ -104,6 +175,7 @@ class Container(containers.DeclarativeContainer):
     remote_fitbit_repository: RemoteFitbitRepository = providers.Factory(
         WebApiFitbitRepository,
         settings,
+        response_cache,
     )
     remote_google_repository: RemoteGoogleRepository = providers.Factory(
         WebApiGoogleRepository,
@@ -112,27 +184,108 @@ class Container(containers.DeclarativeContainer):
     remote_withings_repository: RemoteWithingsRepository = providers.Factory(
         WebApiWithingsRepository,
         settings,
+        response_cache,
+    )
+    # Shared by all the requests, and closed when the application stops.
+    openai_client: AsyncOpenAI | None = providers.Singleton(
+        create_openai_client,
+        settings,
     )
     openai_repository: RemoteOpenAiRepository = providers.Factory(
         WebOpenAiRepository,
         settings,
+        openai_client,
+    )
+    statement_log: StatementLog = providers.Singleton(
+        StatementLog,
+        slow_threshold_s=settings.provided.app_settings.metrics.slow_statement_threshold_s,
+        max_slow_statements=settings.provided.app_settings.metrics.max_slow_statements,
+    )
+    profiler: Profiler = providers.Singleton(
+        Profiler,
+        sampling_interval_s=settings.provided.app_settings.profiling.sampling_interval_s,
     )
     session_factory: async_sessionmaker = providers.Singleton(
         create_async_session_maker,
         settings,
+        statement_log,
     )
 
-    db: AsyncSession = providers.Resource(
+    shared_db: AsyncSession = providers.Resource(
         session_context_manager,
         session_factory,
     )
 
+    db: AsyncSession = providers.Callable(
+        get_session,
+        shared_db,
+    )
+
+    # Gives a dedicated session to the code running within it, for concurrent tasks.
+    db_scope = providers.Factory(
+        session_scope,
+        session_factory,
+    )
+
     local_withings_repository: LocalWithingsRepository = providers.Factory(
         SQLAlchemyWithingsRepository,
         db,
     )
 
+    fitbit_user_cache: TTLCache = providers.Singleton(
+        TTLCache,
+        max_entries=settings.provided.app_settings.fitbit.user_cache.max_entries,
+        ttl_s=settings.provided.app_settings.fitbit.user_cache.ttl_s,
+    )
+
     local_fitbit_repository: LocalFitbitRepository = providers.Factory(
-        SQLAlchemyFitbitRepository,
+        CachedFitbitRepository,
+        db,
+        fitbit_user_cache,
+    )
+
+    lease_repository: LocalLeaseRepository = providers.Factory(
+        SQLAlchemyLeaseRepository,
         db,
     )
+
+    schedule_repository: LocalScheduleRepository = providers.Factory(
+        SQLAlchemyScheduleRepository,
+        db,
+    )
+
+    motivational_message_repository: LocalMotivationalMessageRepository = (
+        providers.Factory(
+            SQLAlchemyMotivationalMessageRepository,
+            db,
+        )
+    )
+
+    dedupe_repository: LocalDedupeRepository = providers.Selector(
+        settings.provided.app_settings.dedupe.backend,
+        memory=providers.Singleton(
+            InMemoryDedupeRepository,
+            max_entries=settings.provided.app_settings.dedupe.max_entries,
+        ),
+        database=providers.Factory(
+            SQLAlchemyDedupeRepository,
+            db,
+        ),
+    )
+
+    job_queue: JobQueue = providers.Selector(
+        settings.provided.app_settings.inbound_queue.backend,
+        memory=providers.Singleton(
+            InMemoryJobQueue,
+            pools=providers.Dict(
+                fitbit=fitbit_worker_pool,
+                withings=withings_worker_pool,
+                google=google_worker_pool,
+            ),
+        ),
+        database=providers.Singleton(
+            SQLAlchemyJobQueue,
+            session_factory=session_factory,
+            settings=settings.provided.app_settings.inbound_queue,
+        ),
+    )
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from slackhealthbot.core.metrics import registry
+
+K = TypeVar("K", bound=Hashable)
+P = TypeVar("P")
+
+submissions_counter = registry.counter(
+    "coalescer_submissions_total",
+    "Number of submissions to a coalescer.",
+    labelnames=("coalescer",),
+)
+runs_counter = registry.counter(
+    "coalescer_runs_total",
+    "Number of times a coalescer processed a merged submission.",
+    labelnames=("coalescer",),
+)
+ratio_gauge = registry.gauge(
+    "coalescer_ratio",
+    "Average number of submissions merged into each processing, "
+    "over the recent runs.",
+    labelnames=("coalescer",),
+)
+
+
+class CoalescingRatio:
+    """
+    Number of submissions per processing of a coalescer, over a recent period.
+
+    The ratio is published in the coalescer_ratio gauge.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_s = window_s
+        self._clock = clock
+        self._submission_times: deque[float] = deque()
+        self._run_times: deque[float] = deque()
+
+    def record_submission(self):
+        submissions_counter.inc(coalescer=self.name)
+        self._submission_times.append(self._clock())
+
+    def record_run(self):
+        runs_counter.inc(coalescer=self.name)
+        self._run_times.append(self._clock())
+        ratio_gauge.set(self.value, coalescer=self.name)
+
+    @property
+    def value(self) -> float:
+        oldest_time = self._clock() - self.window_s
+        for times in (self._submission_times, self._run_times):
+            while times and times[0] < oldest_time:
+                times.popleft()
+        if not self._run_times:
+            return 0.0
+        return len(self._submission_times) / len(self._run_times)
+
+
+class Coalescer(Generic[K, P]):
+    """
+    Merge the payloads submitted for the same key within a time window,
+    and process each merged payload once.
+
+    The first submission for a key waits for the window to elapse, then processes
+    the merge of the payloads of all the submissions received in the meantime.
+    The following submissions for that key return immediately.
+
+    A key stays busy until its processing completes: submissions received
+    during the processing are merged into a follow-up run, so the same key is
+    never processed concurrently.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_s: float,
+        ratio_window_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param ratio_window_s: the coalescing ratio is computed over the runs
+            of this last period.
+        """
+        self.name = name
+        self.window_s = window_s
+        self._ratio = CoalescingRatio(name=name, window_s=ratio_window_s, clock=clock)
+        # The merged payload of the next run of each key.
+        self._pending: dict[K, P] = {}
+        self._busy: set[K] = set()
+
+    async def submit(
+        self,
+        key: K,
+        payload: P,
+        merge: Callable[[P, P], P],
+        process: Callable[[P], Awaitable[None]],
+    ):
+        task = self.submit_nowait(
+            key=key, payload=payload, merge=merge, process=process
+        )
+        if task:
+            await task
+
+    def submit_nowait(
+        self,
+        key: K,
+        payload: P,
+        merge: Callable[[P, P], P],
+        process: Callable[[P], Awaitable[None]],
+    ) -> asyncio.Task | None:
+        """
+        Like submit, but return as soon as the payload is registered.
+
+        :return: the task processing the key, if this is the first submission
+            for this key, None if the payload was merged into a pending one.
+        """
+        self._ratio.record_submission()
+        if key in self._busy:
+            self._pending[key] = (
+                merge(self._pending[key], payload) if key in self._pending else payload
+            )
+            logging.info(f"{self.name}: coalesced submission for {key}")
+            return None
+
+        self._busy.add(key)
+        self._pending[key] = payload
+        return asyncio.create_task(self._process_pending(key, process))
+
+    async def _process_pending(
+        self,
+        key: K,
+        process: Callable[[P], Awaitable[None]],
+    ):
+        try:
+            while key in self._pending:
+                await asyncio.sleep(self.window_s)
+                merged_payload = self._pending.pop(key)
+                self._ratio.record_run()
+                await process(merged_payload)
+        finally:
+            self._busy.discard(key)
+            if key in self._pending:
+                del self._pending[key]
+                logging.warning(f"{self.name}: dropped submissions for {key}")
+
+    def has_pending(self, key: K) -> bool:
+        """
+        :return: whether a submission for this key would be merged into
+            a payload waiting to be processed.
+        """
+        return key in self._pending
+
+    def __len__(self) -> int:
+        """
+        :return: the number of merged payloads waiting to be processed.
+        """
+        return len(self._pending)
+
+    @property
+    def ratio(self) -> float:
+        return self._ratio.value
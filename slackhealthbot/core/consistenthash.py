@@ -0,0 +1,55 @@
+import bisect
+import dataclasses
+import hashlib
+from typing import Iterable
+
+
+def _hash(value: str) -> int:
+    # Not the builtin hash: it's salted per process, and all the processes
+    # must agree on the position of a key on the ring.
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class ConsistentHashRing:
+    """
+    Assigns keys to nodes, so that when a node joins or leaves, only the keys
+    of that node move to other nodes.
+
+    Each node is placed at several points of the ring, to spread the keys
+    evenly among the nodes.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str],
+        replicas: int = 100,
+    ):
+        self.nodes = frozenset(nodes)
+        if not self.nodes:
+            raise ValueError("A consistent hash ring needs at least one node")
+        points = sorted(
+            (_hash(f"{node}#{index}"), node)
+            for node in self.nodes
+            for index in range(replicas)
+        )
+        self._hashes = [point_hash for point_hash, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get_node(self, key: str) -> str:
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+@dataclasses.dataclass(frozen=True)
+class ShardAssignment:
+    """
+    The share of the keys assigned to a node, among the nodes of the ring.
+    """
+
+    ring: ConsistentHashRing
+    node: str
+
+    def owns(self, key: str) -> bool:
+        return self.ring.get_node(key) == self.node
@@ -8,3 +8,13 @@ class UnknownUserException(Exception):
     """
     Raised when we fail to find a user.
     """
+
+
+class QueueFullException(Exception):
+    """
+    Raised when a job can't be queued because too many jobs are already pending.
+    """
+
+    def __init__(self, name: str, retry_after_s: int):
+        super().__init__(f"{name}: queue full")
+        self.retry_after_s = retry_after_s
@@ -0,0 +1,207 @@
+import asyncio
+import dataclasses
+import functools
+import itertools
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from slackhealthbot.core.coalescer import Coalescer
+from slackhealthbot.core.exceptions import QueueFullException
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import tracer
+from slackhealthbot.core.workerpool import WorkerPool
+
+JobHandler = Callable[[dict], Awaitable[None]]
+PayloadMerger = Callable[[dict, dict], dict]
+
+enqueued_counter = registry.counter(
+    "jobs_enqueued_total",
+    "Number of jobs enqueued.",
+    labelnames=("kind",),
+)
+rejected_counter = registry.counter(
+    "jobs_rejected_total",
+    "Number of jobs rejected because the queue was full.",
+    labelnames=("kind",),
+)
+processed_counter = registry.counter(
+    "jobs_processed_total",
+    "Number of jobs processed, by outcome: success, retry or failure.",
+    labelnames=("kind", "outcome"),
+)
+depth_gauge = registry.gauge(
+    "jobs_queue_depth",
+    "Number of jobs waiting to be processed.",
+    labelnames=("kind",),
+)
+oldest_age_gauge = registry.gauge(
+    "jobs_oldest_age_seconds",
+    "Age of the oldest job waiting to be processed.",
+    labelnames=("kind",),
+)
+
+
+@dataclasses.dataclass
+class JobType:
+    handler: JobHandler
+    merge: PayloadMerger | None = None
+
+
+job_types: dict[str, JobType] = {}
+
+
+def job_handler(kind: str, merge: PayloadMerger | None = None):
+    """
+    Register the decorated function as the handler of the jobs of the given kind.
+
+    :param merge: how to merge the payloads of two jobs, if the jobs of this kind
+        may be coalesced.
+    """
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        job_types[kind] = JobType(handler=handler, merge=merge)
+        return handler
+
+    return decorator
+
+
+class JobQueue(ABC):
+    """
+    Queue of the jobs to execute in the background, like processing
+    webhook notifications.
+
+    A job is described by its kind, which determines the handler executing it,
+    and a json-serializable payload, passed to the handler.
+
+    Jobs enqueued with the same kind and key are executed one at a time, in the order
+    in which they were enqueued. Other jobs are executed in parallel.
+    """
+
+    @abstractmethod
+    async def enqueue(
+        self,
+        kind: str,
+        key: str,
+        payload: dict,
+        coalesce_window_s: float = 0.0,
+    ):
+        """
+        :param coalesce_window_s: if positive, delay the job by this time.
+            Jobs of the same kind and key enqueued in the meantime are merged
+            into this one.
+
+        :raises QueueFullException: if too many jobs of this kind are pending.
+        """
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    async def stop(self):
+        pass
+
+
+class InMemoryJobQueue(JobQueue):
+    """
+    Job queue in the server process, with a worker pool per kind of job.
+
+    Jobs which are still queued when the server stops are lost.
+    """
+
+    def __init__(self, pools: dict[str, WorkerPool]):
+        self.pools = pools
+        self._coalescers: dict[str, Coalescer] = {}
+        self._coalescing_tasks: set[asyncio.Task] = set()
+        self._job_ids = itertools.count()
+        self._enqueued_at: dict[str, dict[int, float]] = {}
+
+    def start(self):
+        for pool in self.pools.values():
+            pool.start()
+
+    async def stop(self):
+        await asyncio.gather(*self._coalescing_tasks, return_exceptions=True)
+        for pool in self.pools.values():
+            await pool.stop()
+
+    async def enqueue(
+        self,
+        kind: str,
+        key: str,
+        payload: dict,
+        coalesce_window_s: float = 0.0,
+    ):
+        job_type = job_types[kind]
+        coalescing = coalesce_window_s > 0 and job_type.merge is not None
+        coalescer = self._coalescers.get(kind)
+        # A job merged into a pending one doesn't need more room in the queue.
+        if not (coalescing and coalescer is not None and coalescer.has_pending(key)):
+            self._check_not_full(kind)
+        enqueued_counter.inc(kind=kind)
+        if not coalescing:
+            self._submit(kind, key, payload)
+            return
+
+        if coalescer is None:
+            coalescer = self._coalescers[kind] = Coalescer(
+                name=kind, window_s=coalesce_window_s
+            )
+        coalescer.window_s = coalesce_window_s
+        task = coalescer.submit_nowait(
+            key=key,
+            payload=payload,
+            merge=job_type.merge,
+            process=functools.partial(self._submit_async, kind, key),
+        )
+        if task:
+            self._coalescing_tasks.add(task)
+            task.add_done_callback(self._coalescing_tasks.discard)
+
+    def _check_not_full(self, kind: str):
+        """
+        The payloads waiting in the coalescer count against the size of the
+        queue: room is reserved for them when they're accepted, so that they
+        aren't rejected after the webhook responded.
+
+        :raises QueueFullException: if the queue of this kind of job is full.
+        """
+        pool = self.pools[kind]
+        coalescer = self._coalescers.get(kind)
+        queued_count = len(pool) + (len(coalescer) if coalescer is not None else 0)
+        if 0 < pool.max_queue_size <= queued_count:
+            rejected_counter.inc(kind=kind)
+            raise QueueFullException(name=kind, retry_after_s=pool.retry_after_s)
+
+    async def _submit_async(self, kind: str, key: str, payload: dict):
+        self._submit(kind, key, payload, reserved=True)
+
+    def _submit(self, kind: str, key: str, payload: dict, reserved: bool = False):
+        job_id = next(self._job_ids)
+        self.pools[kind].submit(
+            key=key,
+            job=functools.partial(self._run, kind, job_id, payload),
+            reserved=reserved,
+        )
+        self._enqueued_at.setdefault(kind, {})[job_id] = time.monotonic()
+        self._update_gauges(kind)
+
+    async def _run(self, kind: str, job_id: int, payload: dict):
+        self._enqueued_at[kind].pop(job_id, None)
+        self._update_gauges(kind)
+        try:
+            with tracer.span(f"job {kind}"):
+                await job_types[kind].handler(payload)
+        except Exception:
+            processed_counter.inc(kind=kind, outcome="failure")
+            raise
+        processed_counter.inc(kind=kind, outcome="success")
+
+    def _update_gauges(self, kind: str):
+        enqueued_at = self._enqueued_at.get(kind, {})
+        depth_gauge.set(len(enqueued_at), kind=kind)
+        oldest_age_gauge.set(
+            time.monotonic() - min(enqueued_at.values()) if enqueued_at else 0.0,
+            kind=kind,
+        )
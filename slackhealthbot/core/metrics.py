@@ -0,0 +1,252 @@
+import bisect
+import contextlib
+import math
+import threading
+import time
+from typing import Iterator
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type: str = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def samples(self) -> Iterator[tuple[dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield dict(zip(self.labelnames, label_values)), value
+
+    def exposition_samples(self) -> Iterator[Sample]:
+        """
+        :return: the samples of the metric in the Prometheus exposition format:
+            the name of the series, its labels and its value.
+        """
+        for labels, value in self.samples():
+            yield self.name, labels, value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, like durations, counted in cumulative
+    buckets by upper bound.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name=name, description=description, labelnames=labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            bucket_counts = self._bucket_counts.get(key)
+            if bucket_counts is None:
+                # The last bucket is +Inf.
+                bucket_counts = self._bucket_counts[key] = [0] * (len(self.buckets) + 1)
+            bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+            self._values[key] = self._values.get(key, 0.0) + 1
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observe the duration of the block, in seconds, even if it raises.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def get(self, **labels: str) -> float:
+        """
+        :return: the number of observed values.
+        """
+        return super().get(**labels)
+
+    def get_sum(self, **labels: str) -> float:
+        return self._sums.get(self._label_values(labels), 0.0)
+
+    def exposition_samples(self) -> Iterator[Sample]:
+        with self._lock:
+            series = [
+                (key, list(bucket_counts), self._sums[key], self._values[key])
+                for key, bucket_counts in self._bucket_counts.items()
+            ]
+        for key, bucket_counts, total, count in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(
+                (*self.buckets, math.inf), bucket_counts
+            ):
+                cumulative_count += bucket_count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(upper_bound)},
+                    cumulative_count,
+                )
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._bucket_counts.clear()
+            self._sums.clear()
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    In-process registry of the application metrics.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(
+        self,
+        metric_class: type[Metric],
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...],
+        **options,
+    ) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(
+                    name=name,
+                    description=description,
+                    labelnames=labelnames,
+                    **options,
+                )
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"{name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+    ) -> Counter:
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = self._get_or_create(
+            Histogram, name, description, labelnames, buckets=buckets
+        )
+        if histogram.buckets != tuple(sorted(buckets)):
+            raise ValueError(f"{name} is already registered with other buckets")
+        return histogram
+
+    def metrics(self) -> list[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """
+        :return: the metrics in the Prometheus text exposition format:
+        https://prometheus.io/docs/instrumenting/exposition_formats/
+        """
+        lines = []
+        for metric in sorted(self.metrics(), key=lambda x: x.name):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.exposition_samples():
+                series = name
+                if labels:
+                    formatted_labels = ",".join(
+                        f'{label}="{_escape_label_value(label_value)}"'
+                        for label, label_value in labels.items()
+                    )
+                    series = f"{name}{{{formatted_labels}}}"
+                lines.append(f"{series} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,217 @@
+import asyncio
+import collections
+import contextlib
+import cProfile
+import dataclasses
+import datetime as dt
+import enum
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Iterator
+
+
+class ProfileMode(enum.StrEnum):
+    # Deterministic profile of every call, as a pstats file.
+    cprofile = enum.auto()
+    # Stacks sampled at an interval, as collapsed stacks for flame graphs.
+    sampling = enum.auto()
+
+
+class ProfilerBusyException(Exception):
+    """
+    Raised when a profile is requested while another one is being captured.
+    """
+
+
+@dataclasses.dataclass(frozen=True)
+class Profile:
+    mode: ProfileMode
+    started_at: dt.datetime
+    duration_s: float
+    content: bytes
+
+    @property
+    def filename(self) -> str:
+        extension = "prof" if self.mode == ProfileMode.cprofile else "collapsed"
+        return f"slackhealthbot-{self.started_at:%Y%m%dT%H%M%S}.{extension}"
+
+    @property
+    def media_type(self) -> str:
+        if self.mode == ProfileMode.cprofile:
+            return "application/octet-stream"
+        return "text/plain"
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame: FrameType | None) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _StackSampler:
+    """
+    Samples the stack of a thread from another thread. The sampled thread
+    isn't slowed down, apart from the GIL taken by the sampler.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def _run(self):
+        while not self._stopped.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> bytes:
+        """
+        :return: the stacks in the collapsed format of flamegraph.pl
+            and speedscope: one line per stack, with its sample count.
+        """
+        self._stopped.set()
+        self._thread.join()
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        ).encode()
+
+
+class _CProfiler:
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self) -> bytes:
+        """
+        :return: the stats in the format of pstats.Stats.dump_stats,
+            readable by pstats, snakeviz, or flameprof.
+        """
+        self._profile.disable()
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+class Profiler:
+    """
+    Captures profiles of the event loop thread of this process, on demand:
+    either for a duration, or for the next run of a scheduled job.
+
+    The coroutines interleave on the event loop: a profile of a job also
+    includes whatever else ran while the job was awaiting.
+
+    Nothing is hooked into the interpreter until a profile is captured:
+    while none is requested, a scheduled run only costs a dictionary lookup.
+    """
+
+    def __init__(self, sampling_interval_s: float):
+        self.sampling_interval_s = sampling_interval_s
+        self.jobs: set[str] = set()
+        self._armed_jobs: dict[str, ProfileMode] = {}
+        self._run_profiles: dict[str, Profile] = {}
+        self._busy = False
+
+    @contextlib.contextmanager
+    def _capture(self, mode: ProfileMode) -> Iterator[list[Profile]]:
+        """
+        Profile the block, in the thread which enters it.
+
+        :return: a list, which holds the profile once the block exits.
+        """
+        if self._busy:
+            raise ProfilerBusyException("A profile is already being captured")
+        self._busy = True
+        if mode == ProfileMode.cprofile:
+            profiler = _CProfiler()
+        else:
+            profiler = _StackSampler(
+                thread_id=threading.get_ident(),
+                interval_s=self.sampling_interval_s,
+            )
+        result: list[Profile] = []
+        started_at = dt.datetime.now(dt.timezone.utc)
+        start = time.monotonic()
+        profiler.start()
+        try:
+            yield result
+        finally:
+            content = profiler.stop()
+            self._busy = False
+            result.append(
+                Profile(
+                    mode=mode,
+                    started_at=started_at,
+                    duration_s=time.monotonic() - start,
+                    content=content,
+                )
+            )
+
+    async def profile_for(self, duration_s: float, mode: ProfileMode) -> Profile:
+        """
+        :raises ProfilerBusyException: if another profile is being captured.
+        """
+        with self._capture(mode) as result:
+            await asyncio.sleep(duration_s)
+        return result[0]
+
+    def add_job(self, name: str):
+        self.jobs.add(name)
+
+    def arm(self, name: str, mode: ProfileMode):
+        """
+        Profile the next run of the job.
+        """
+        self._armed_jobs[name] = mode
+
+    def armed_jobs(self) -> dict[str, ProfileMode]:
+        return dict(self._armed_jobs)
+
+    def get_run_profile(self, name: str) -> Profile | None:
+        """
+        :return: the profile of the latest profiled run of the job.
+        """
+        return self._run_profiles.get(name)
+
+    @contextlib.contextmanager
+    def profile_run(self, name: str) -> Iterator[None]:
+        """
+        Profile the run of the job in the block, if it's armed.
+        """
+        mode = self._armed_jobs.get(name)
+        if mode is None:
+            yield
+            return
+        if self._busy:
+            logging.warning(f"{name}: another profile is being captured, not profiling")
+            yield
+            return
+        del self._armed_jobs[name]
+        result: list[Profile] = []
+        try:
+            with self._capture(mode) as result:
+                yield
+        finally:
+            # A failed run is worth profiling too.
+            self._run_profiles[name] = result[0]
+            logging.info(f"{name}: profiled the run in {result[0].duration_s:.1f}s")
@@ -0,0 +1,55 @@
+import datetime
+from abc import ABC, abstractmethod
+
+
+class Schedule(ABC):
+    """
+    When a job runs. The times are datetimes with a timezone.
+    """
+
+    @abstractmethod
+    def next_after(self, when: datetime.datetime) -> datetime.datetime:
+        """
+        :return: the first time the job runs strictly after the given time.
+        """
+
+    def first_run(self, start: datetime.datetime) -> datetime.datetime:
+        """
+        :return: when a job which never ran runs first, if started at
+            the given time.
+        """
+        return self.next_after(start)
+
+
+class DailySchedule(Schedule):
+    """
+    Runs every day at the given local time.
+    """
+
+    def __init__(self, time: datetime.time):
+        self.time = time
+
+    def next_after(self, when: datetime.datetime) -> datetime.datetime:
+        date = when.astimezone().date()
+        while True:
+            # astimezone() on a naive datetime uses the local timezone,
+            # with the utc offset of that day.
+            next_run = datetime.datetime.combine(date, self.time).astimezone()
+            if next_run > when:
+                return next_run
+            date += datetime.timedelta(days=1)
+
+
+class IntervalSchedule(Schedule):
+    """
+    Runs at a fixed interval after the previous run.
+    """
+
+    def __init__(self, interval: datetime.timedelta):
+        self.interval = interval
+
+    def next_after(self, when: datetime.datetime) -> datetime.datetime:
+        return when + self.interval
+
+    def first_run(self, start: datetime.datetime) -> datetime.datetime:
+        return start
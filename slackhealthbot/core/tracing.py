@@ -0,0 +1,321 @@
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import enum
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, ParamSpec, TypeVar
+
+from asgi_correlation_id import correlation_id
+
+from slackhealthbot.core.metrics import registry
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+AttributeValue = str | int | float | bool
+
+dropped_spans_counter = registry.counter(
+    "tracing_dropped_spans_total",
+    "Number of spans dropped because too many were waiting to be exported.",
+)
+
+
+class SpanStatus(enum.StrEnum):
+    ok = enum.auto()
+    error = enum.auto()
+
+
+@dataclasses.dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_time_ns: int
+    end_time_ns: int | None = None
+    attributes: dict[str, AttributeValue] = dataclasses.field(default_factory=dict)
+    status: SpanStatus = SpanStatus.ok
+
+    @property
+    def duration_s(self) -> float:
+        return ((self.end_time_ns or time.time_ns()) - self.start_time_ns) / 1e9
+
+
+def new_correlation_id() -> str:
+    """
+    Start a new correlation id for the code running in the current context,
+    like a run of a scheduled task, as the correlation middleware does
+    for a request.
+    """
+    value = uuid.uuid4().hex
+    correlation_id.set(value)
+    return value
+
+
+def _otlp_trace_id(trace_id: str) -> str:
+    # The correlation ids generated by the middleware are already 32 hex digits.
+    # Others, like the ids sent by a client, are hashed to the size of a trace id.
+    if re.fullmatch(r"[0-9a-f]{32}", trace_id):
+        return trace_id
+    return hashlib.blake2b(trace_id.encode(), digest_size=16).hexdigest()
+
+
+def _otlp_attribute_value(value: AttributeValue) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _to_jsonl(spans: list[Span]) -> list[dict]:
+    return [
+        {
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "start_time_ns": span.start_time_ns,
+            "duration_ms": round(span.duration_s * 1000, 3),
+            "status": span.status,
+            "attributes": span.attributes,
+        }
+        for span in spans
+    ]
+
+
+def _to_otlp(spans: list[Span]) -> list[dict]:
+    """
+    :return: an OTLP/JSON export request, as written by the file exporter
+        of the OpenTelemetry collector.
+    """
+    return [
+        {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": "slackhealthbot"},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "slackhealthbot"},
+                            "spans": [
+                                {
+                                    "traceId": _otlp_trace_id(span.trace_id),
+                                    "spanId": span.span_id,
+                                    "parentSpanId": span.parent_id or "",
+                                    "name": span.name,
+                                    # Internal span.
+                                    "kind": 1,
+                                    "startTimeUnixNano": str(span.start_time_ns),
+                                    "endTimeUnixNano": str(span.end_time_ns),
+                                    "attributes": [
+                                        {
+                                            "key": key,
+                                            "value": _otlp_attribute_value(value),
+                                        }
+                                        for key, value in span.attributes.items()
+                                    ],
+                                    "status": {
+                                        "code": (
+                                            1 if span.status == SpanStatus.ok else 2
+                                        )
+                                    },
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+    ]
+
+
+class FileSpanExporter:
+    """
+    Buffers the completed spans, and appends them to a local file
+    when flushed: one span per line in the jsonl format, or one OTLP export
+    request per flush in the otlp format.
+
+    If the spans aren't flushed fast enough, the oldest ones are dropped.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        trace_format: str,
+        max_buffered_spans: int,
+    ):
+        """
+        :param trace_format: jsonl or otlp.
+        """
+        self.path = Path(path)
+        self.trace_format = trace_format
+        self._spans: collections.deque[Span] = collections.deque(
+            maxlen=max_buffered_spans
+        )
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            if len(self._spans) == self._spans.maxlen:
+                dropped_spans_counter.inc()
+            self._spans.append(span)
+
+    def flush(self):
+        """
+        Write the buffered spans. This blocks on the file i/o.
+        """
+        with self._lock:
+            spans = list(self._spans)
+            self._spans.clear()
+        if not spans:
+            return
+        records = _to_otlp(spans) if self.trace_format == "otlp" else _to_jsonl(spans)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+    async def flush_periodically(self, interval_s: float):
+        """
+        Flush the spans until cancelled, and one last time then.
+        """
+        try:
+            while True:
+                await asyncio.sleep(interval_s)
+                try:
+                    await asyncio.to_thread(self.flush)
+                except OSError:
+                    logging.exception("Error exporting the spans")
+        finally:
+            self.flush()
+
+
+class Tracer:
+    """
+    Lightweight in-process tracing: spans record the duration of the stages
+    of a request or a job, and their parent span.
+
+    The spans of a request share its correlation id as trace id. Until an
+    exporter is configured, tracing is disabled and spans cost an attribute
+    lookup.
+    """
+
+    def __init__(self):
+        self.exporter: FileSpanExporter | None = None
+        self._current_span: ContextVar[Span | None] = ContextVar(
+            "current_span", default=None
+        )
+
+    def configure(self, exporter: FileSpanExporter | None):
+        self.exporter = exporter
+
+    def _create_span(
+        self,
+        name: str,
+        start_time_ns: int,
+        attributes: dict[str, AttributeValue],
+    ) -> Span:
+        parent = self._current_span.get()
+        if parent is not None:
+            trace_id = parent.trace_id
+        else:
+            trace_id = correlation_id.get() or new_correlation_id()
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            start_time_ns=start_time_ns,
+            attributes=attributes,
+        )
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: AttributeValue) -> Iterator[Span | None]:
+        """
+        Record a span around the block, as a child of the current span.
+
+        :return: the span, to add attributes to, or None if tracing is disabled.
+        """
+        exporter = self.exporter
+        if exporter is None:
+            yield None
+            return
+        span = self._create_span(name, time.time_ns(), attributes)
+        token = self._current_span.set(span)
+        try:
+            yield span
+        except BaseException:
+            span.status = SpanStatus.error
+            raise
+        finally:
+            self._current_span.reset(token)
+            span.end_time_ns = time.time_ns()
+            exporter.export(span)
+
+    def record_span(
+        self,
+        name: str,
+        duration_s: float,
+        **attributes: AttributeValue,
+    ):
+        """
+        Record a span which just ended, as a child of the current span,
+        for the stages timed by callbacks, like the database statements.
+        """
+        exporter = self.exporter
+        if exporter is None:
+            return
+        end_time_ns = time.time_ns()
+        span = self._create_span(name, end_time_ns - int(duration_s * 1e9), attributes)
+        span.end_time_ns = end_time_ns
+        exporter.export(span)
+
+
+tracer = Tracer()
+
+
+def traced(
+    name: str | None = None,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Record a span around each call of the decorated coroutine function.
+
+    Apply it below @inject, so that the dependencies are injected
+    into the traced function.
+
+    :param name: the name of the spans, by default the module and name
+        of the function, like usecase_process_new_activity.do.
+    """
+
+    def decorator(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with tracer.span(span_name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
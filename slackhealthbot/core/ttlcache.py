@@ -0,0 +1,99 @@
+import dataclasses
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING = object()
+
+
+@dataclasses.dataclass
+class _Entry(Generic[V]):
+    value: V
+    expires_at: float
+    version: Any
+
+
+class TTLCache(Generic[K, V]):
+    """
+    In-memory cache, bounded in size with LRU eviction, whose entries expire
+    after a fixed time to live.
+
+    Entries may be stored with a version (ex: a timestamp): a lookup with a newer
+    minimum version invalidates the entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entries: OrderedDict[K, _Entry[V]] = OrderedDict()
+
+    def get(
+        self,
+        key: K,
+        min_version: Any = None,
+        default: V | None = None,
+    ) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if entry.expires_at <= self._clock() or (
+            min_version is not None
+            and (entry.version is None or entry.version < min_version)
+        ):
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(
+        self,
+        key: K,
+        value: V,
+        version: Any = None,
+        ttl_s: float | None = None,
+    ):
+        """
+        :param ttl_s: the time to live of this entry, if different from
+            the cache's default time to live.
+        """
+        ttl_s = self.ttl_s if ttl_s is None else ttl_s
+        if self.max_entries <= 0 or ttl_s <= 0:
+            return
+        self._entries[key] = _Entry(
+            value=value,
+            expires_at=self._clock() + ttl_s,
+            version=version,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K):
+        self._entries.pop(key, None)
+
+    def invalidate_if(self, predicate: Callable[[V], bool]):
+        """
+        Invalidate the entries whose value matches the predicate.
+        """
+        for key in [
+            key for key, entry in self._entries.items() if predicate(entry.value)
+        ]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, default=MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Hashable
+
+from slackhealthbot.core.exceptions import QueueFullException
+
+Job = Callable[[], Awaitable[None]]
+
+
+class WorkerPool:
+    """
+    Execute jobs in the background, with a fixed number of workers.
+
+    Jobs submitted with the same key are executed one at a time, in the order
+    in which they were submitted. Jobs with different keys are executed in parallel.
+
+    Jobs are executed in a copy of the context of the code which submitted them,
+    so that context variables, like the request correlation id, are preserved.
+
+    If max_queue_size is positive, submitting a job while max_queue_size jobs
+    are waiting to be executed raises a QueueFullException.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        worker_count: int,
+        max_queue_size: int = 0,
+        retry_after_s: int = 30,
+    ):
+        self.name = name
+        self.worker_count = worker_count
+        self.max_queue_size = max_queue_size
+        self.retry_after_s = retry_after_s
+        # The jobs waiting to be executed, by key. A key stays here while
+        # one of its jobs is executed, even if it has no other waiting jobs.
+        self._jobs_by_key: dict[Hashable, deque[tuple[Job, contextvars.Context]]] = {}
+        self._queued_job_count = 0
+        # The keys with waiting jobs, and none being executed.
+        # Workers only take jobs from these keys, so they never wait
+        # for the job of another worker to complete.
+        self._ready_keys: asyncio.Queue[Hashable] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def start(self):
+        self._ready_keys = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"{self.name}-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+
+    async def stop(self, timeout_s: float = 30.0):
+        """
+        Wait for the submitted jobs to complete, then stop the workers.
+        """
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._ready_keys.join(), timeout=timeout_s)
+        except TimeoutError:
+            logging.warning(
+                f"{self.name}: stopping with {self._queued_job_count} pending jobs"
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._ready_keys = None
+        self._jobs_by_key.clear()
+        self._queued_job_count = 0
+
+    def submit(
+        self,
+        key: Hashable,
+        job: Job,
+        reserved: bool = False,
+    ):
+        """
+        :param reserved: whether the caller reserved room for this job when
+            it accepted it. Such a job is queued even if the queue is full.
+        """
+        if self._ready_keys is None:
+            raise RuntimeError(f"{self.name}: worker pool not started")
+        if not reserved and self.full():
+            raise QueueFullException(name=self.name, retry_after_s=self.retry_after_s)
+        self._queued_job_count += 1
+        jobs = self._jobs_by_key.get(key)
+        if jobs is not None:
+            # The key is either ready, or has a job being executed:
+            # the worker executing it makes the key ready again when done.
+            jobs.append((job, contextvars.copy_context()))
+            return
+        self._jobs_by_key[key] = deque([(job, contextvars.copy_context())])
+        self._ready_keys.put_nowait(key)
+
+    def full(self) -> bool:
+        return 0 < self.max_queue_size <= self._queued_job_count
+
+    def __len__(self) -> int:
+        """
+        :return: the number of jobs waiting to be executed.
+        """
+        return self._queued_job_count
+
+    async def _work(self):
+        while True:
+            key = await self._ready_keys.get()
+            jobs = self._jobs_by_key[key]
+            job, context = jobs.popleft()
+            self._queued_job_count -= 1
+            try:
+                await asyncio.create_task(job(), context=context)
+            except Exception:
+                logging.exception(f"{self.name}: error executing job for {key}")
+            finally:
+                if jobs:
+                    # Go to the back of the queue, so that a key with many jobs
+                    # doesn't delay the jobs of the other keys.
+                    self._ready_keys.put_nowait(key)
+                else:
+                    del self._jobs_by_key[key]
+                self._ready_keys.task_done()
@@ -1,10 +1,16 @@
 import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from typing import AsyncGenerator
 
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from slackhealthbot.data.database.instrumentation import (
+    StatementLog,
+    instrument_engine,
+)
 from slackhealthbot.settings import Settings
 
 
@@ -24,12 +30,14 @@ def get_connection_url(
 
 def create_async_session_maker(
     settings: Settings,
+    statement_log: StatementLog,
 ) -> async_sessionmaker:
     engine = create_async_engine(
         get_connection_url(settings),
         connect_args={"check_same_thread": False},
     )
     Path(settings.app_settings.database_path).parent.mkdir(parents=True, exist_ok=True)
+    instrument_engine(engine.sync_engine, statement_log)
     if settings.app_settings.logging.sql_log_level.upper() == "DEBUG":
 
         def before_cursor_execute(_conn, _cursor, statement, parameters, *args):
@@ -49,3 +57,35 @@ async def session_context_manager(
         yield db
     finally:
         await db.close()
+
+
+_scoped_session: ContextVar[AsyncSession | None] = ContextVar(
+    "scoped_session", default=None
+)
+
+
+def get_session(shared_session: AsyncSession) -> AsyncSession:
+    """
+    :return: the session of the enclosing session_scope, if any,
+        otherwise the session shared by the whole application.
+    """
+    return _scoped_session.get() or shared_session
+
+
+@asynccontextmanager
+async def session_scope(
+    session_factory: async_sessionmaker,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Use a dedicated session for the database accesses done within this context.
+
+    An AsyncSession must not be used by concurrent tasks: background jobs which
+    may run in parallel must each execute within their own session scope.
+    """
+    db: AsyncSession = session_factory()
+    token = _scoped_session.set(db)
+    try:
+        yield db
+    finally:
+        _scoped_session.reset(token)
+        await db.close()
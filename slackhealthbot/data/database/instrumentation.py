@@ -0,0 +1,276 @@
+import collections
+import dataclasses
+import datetime as dt
+import functools
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import Engine, event
+
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import tracer
+from slackhealthbot.data.database import timestamps
+
+statement_duration_histogram = registry.histogram(
+    "db_statement_duration_seconds",
+    "Duration of the database statements, by operation and fingerprint.",
+    labelnames=("operation", "fingerprint"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+statement_rows_counter = registry.counter(
+    "db_statement_rows_total",
+    "Number of rows returned by the queries, or changed by the other statements,"
+    " by operation and fingerprint.",
+    labelnames=("operation", "fingerprint"),
+)
+slow_statements_counter = registry.counter(
+    "db_slow_statements_total",
+    "Number of statements slower than the threshold, by fingerprint.",
+    labelnames=("fingerprint",),
+)
+statement_info_gauge = registry.gauge(
+    "db_statement_info",
+    "The normalized statement of each fingerprint, in the statement label.",
+    labelnames=("fingerprint", "statement"),
+)
+
+OPERATIONS = {"select", "insert", "update", "delete", "with"}
+# The operations which have a query plan worth explaining.
+EXPLAINED_OPERATIONS = {"select", "update", "delete", "with"}
+
+_START_TIMES_KEY = "statement_start_times"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_PLACEHOLDER_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclasses.dataclass(frozen=True)
+class Fingerprint:
+    id: str
+    operation: str
+    normalized_statement: str
+
+
+@functools.lru_cache(maxsize=1024)
+def get_fingerprint(statement: str) -> Fingerprint:
+    """
+    Identify the statements which only differ by their literal values,
+    or by the number of values in a list, like the parameters of an IN clause
+    or the rows of an insert.
+    """
+    normalized_statement = _STRING_LITERAL.sub("?", statement)
+    normalized_statement = _NUMBER_LITERAL.sub("?", normalized_statement)
+    normalized_statement = _PLACEHOLDER_LIST.sub("(...)", normalized_statement)
+    normalized_statement = _REPEATED_PLACEHOLDER_LISTS.sub(
+        "(...)", normalized_statement
+    )
+    normalized_statement = _WHITESPACE.sub(" ", normalized_statement).strip()
+    return Fingerprint(
+        id=hashlib.blake2b(normalized_statement.encode(), digest_size=6).hexdigest(),
+        operation=get_operation(normalized_statement),
+        normalized_statement=normalized_statement,
+    )
+
+
+def get_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(maxsplit=1)[0].lower() if statement else ""
+    return keyword if keyword in OPERATIONS else "other"
+
+
+@dataclasses.dataclass
+class StatementStats:
+    fingerprint: Fingerprint
+    count: int = 0
+    total_duration_s: float = 0.0
+    max_duration_s: float = 0.0
+    rows: int = 0
+
+    @property
+    def mean_duration_s(self) -> float:
+        return self.total_duration_s / self.count if self.count else 0.0
+
+
+@dataclasses.dataclass(frozen=True)
+class SlowStatement:
+    fingerprint: Fingerprint
+    statement: str
+    duration_s: float
+    executed_at: dt.datetime
+    query_plan: list[str]
+
+
+class StatementLog:
+    """
+    Statistics of the statements executed by the application, by fingerprint,
+    and the latest statements slower than the threshold, with their query plan.
+    """
+
+    def __init__(
+        self,
+        slow_threshold_s: float,
+        max_slow_statements: int,
+    ):
+        self.slow_threshold_s = slow_threshold_s
+        self._stats: dict[str, StatementStats] = {}
+        self._slow_statements: collections.deque[SlowStatement] = collections.deque(
+            maxlen=max_slow_statements
+        )
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        fingerprint: Fingerprint,
+        duration_s: float,
+        rows: int,
+    ):
+        with self._lock:
+            stats = self._stats.get(fingerprint.id)
+            if stats is None:
+                stats = self._stats[fingerprint.id] = StatementStats(fingerprint)
+            stats.count += 1
+            stats.total_duration_s += duration_s
+            stats.max_duration_s = max(stats.max_duration_s, duration_s)
+            stats.rows += rows
+
+    def record_slow(self, slow_statement: SlowStatement):
+        with self._lock:
+            self._slow_statements.append(slow_statement)
+
+    def stats(self) -> list[StatementStats]:
+        """
+        :return: the statistics of the statements, from the longest total
+            duration to the shortest.
+        """
+        with self._lock:
+            stats = [dataclasses.replace(x) for x in self._stats.values()]
+        return sorted(stats, key=lambda x: x.total_duration_s, reverse=True)
+
+    def slow_statements(self) -> list[SlowStatement]:
+        """
+        :return: the latest slow statements, the most recent first.
+        """
+        with self._lock:
+            return list(reversed(self._slow_statements))
+
+
+def _get_row_count(cursor) -> int:
+    if cursor.description is None:
+        return max(cursor.rowcount, 0)
+    # The async sqlite driver fetches all the rows of a query when it executes it:
+    # they can be counted before the application reads them.
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else 0
+
+
+def _explain_query_plan(conn, statement: str, parameters) -> list[str]:
+    """
+    :return: the details of the sqlite query plan, indented by depth.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    depths: dict[int, int] = {}
+    query_plan = []
+    for node_id, parent_id, _, detail in rows:
+        depth = depths[node_id] = depths.get(parent_id, -1) + 1
+        query_plan.append(f"{'  ' * depth}{detail}")
+    return query_plan
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, *_args):
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.monotonic())
+
+
+def _record_statement(  # noqa: PLR0913
+    statement_log: StatementLog,
+    conn,
+    cursor,
+    statement: str,
+    parameters,
+    context,
+):
+    duration_s = time.monotonic() - conn.info[_START_TIMES_KEY].pop()
+    fingerprint = get_fingerprint(statement)
+    rows = _get_row_count(cursor)
+    statement_duration_histogram.observe(
+        duration_s,
+        operation=fingerprint.operation,
+        fingerprint=fingerprint.id,
+    )
+    statement_rows_counter.inc(
+        rows,
+        operation=fingerprint.operation,
+        fingerprint=fingerprint.id,
+    )
+    statement_info_gauge.set(
+        1,
+        fingerprint=fingerprint.id,
+        statement=fingerprint.normalized_statement,
+    )
+    statement_log.record(fingerprint, duration_s, rows)
+    tracer.record_span(
+        f"db {fingerprint.operation}",
+        duration_s,
+        fingerprint=fingerprint.id,
+        statement=fingerprint.normalized_statement,
+        rows=rows,
+    )
+    if duration_s < statement_log.slow_threshold_s:
+        return
+    slow_statements_counter.inc(fingerprint=fingerprint.id)
+    query_plan = []
+    if fingerprint.operation in EXPLAINED_OPERATIONS and not (
+        context is not None and context.executemany
+    ):
+        try:
+            query_plan = _explain_query_plan(conn, statement, parameters)
+        except Exception:
+            logging.warning(f"Error explaining {statement}", exc_info=True)
+    logging.warning(
+        f"Slow statement {fingerprint.id} ({duration_s:.3f}s): {statement}"
+        + "".join(f"\n{line}" for line in query_plan)
+    )
+    statement_log.record_slow(
+        SlowStatement(
+            fingerprint=fingerprint,
+            statement=statement,
+            duration_s=duration_s,
+            executed_at=timestamps.utcnow(),
+            query_plan=query_plan,
+        )
+    )
+
+
+def _handle_error(context):
+    if context.connection is None:
+        return
+    start_times = context.connection.info.get(_START_TIMES_KEY)
+    if start_times:
+        start_times.pop()
+
+
+def instrument_engine(engine: Engine, statement_log: StatementLog):
+    """
+    Record the duration and the row count of the statements executed
+    by the engine, and explain the slow ones.
+
+    The listeners run in the thread executing the statement: apart from
+    the slow statements, their overhead is a couple of clock reads and
+    dictionary lookups per statement.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, _):
+        _record_statement(statement_log, conn, cursor, statement, parameters, context)
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -2,7 +2,7 @@ from datetime import date as dt_date
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Float, ForeignKey, String, func
+from sqlalchemy import Float, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
 from slackhealthbot.domain.models.users import (
@@ -111,3 +111,48 @@ class FitbitDailyActivity(Base):
     sum_cardio_minutes: Mapped[Optional[int]] = mapped_column()
     sum_peak_minutes: Mapped[Optional[int]] = mapped_column()
     sum_out_of_zone_minutes: Mapped[Optional[int]] = mapped_column()
+
+
+class DedupeEntry(Base):
+    __tablename__ = "dedupe_entries"
+    namespace: Mapped[str] = mapped_column(String(40), primary_key=True)
+    key: Mapped[str] = mapped_column(String(80), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255))
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+
+
+class InboundJob(Base):
+    __tablename__ = "inbound_jobs"
+    __table_args__ = (Index("ix_inbound_jobs_kind_key", "kind", "key"),)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(40))
+    key: Mapped[str] = mapped_column(String(80))
+    payload: Mapped[str] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(20), index=True)
+    attempts: Mapped[int] = mapped_column(default=0)
+    available_at: Mapped[datetime] = mapped_column()
+    claimed_until: Mapped[Optional[datetime]] = mapped_column()
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    correlation_id: Mapped[Optional[str]] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column()
+
+
+class Lease(Base):
+    __tablename__ = "leases"
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255))
+    expires_at: Mapped[datetime] = mapped_column()
+
+
+class ScheduledJob(Base):
+    __tablename__ = "scheduled_jobs"
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    last_run_at: Mapped[datetime] = mapped_column()
+    completed_at: Mapped[datetime] = mapped_column()
+
+
+class MotivationalMessage(Base):
+    __tablename__ = "motivational_messages"
+    prompt_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    message: Mapped[str] = mapped_column(Text)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
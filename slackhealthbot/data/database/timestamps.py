@@ -0,0 +1,9 @@
+import datetime
+
+
+def utcnow() -> datetime.datetime:
+    """
+    :return: the current time in UTC, without timezone,
+        as the timestamps are stored in the database.
+    """
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,162 @@
+import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.core.exceptions import UnknownUserException
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.ttlcache import TTLCache
+from slackhealthbot.data.repositories.sqlalchemyfitbitrepository import (
+    SQLAlchemyFitbitRepository,
+)
+from slackhealthbot.domain.localrepository.localfitbitrepository import (
+    User,
+    UserIdentity,
+)
+from slackhealthbot.domain.models.users import UserLookup
+
+lookups_counter = registry.counter(
+    "fitbit_user_cache_lookups_total",
+    "Number of lookups of the fitbit users cache, by result: hit or miss.",
+    labelnames=("result",),
+)
+hit_ratio_gauge = registry.gauge(
+    "fitbit_user_cache_hit_ratio",
+    "Share of the lookups of the fitbit users cache which were hits.",
+)
+
+
+class CachedFitbitRepository(SQLAlchemyFitbitRepository):
+    """
+    Fitbit repository which keeps the users recently looked up in a cache
+    shared by the process, so that processing a notification for a user
+    queries the user once.
+
+    The methods updating the users invalidate their cached entries.
+    Other processes sharing the database don't: the time to live
+    of the cache bounds how long they may use outdated users.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: TTLCache[UserLookup, User],
+    ):
+        super().__init__(db)
+        self.cache = cache
+
+    async def _get_user(
+        self,
+        user_lookup: UserLookup,
+    ) -> User | None:
+        user = self.cache.get(user_lookup)
+        _record_lookup(hit=user is not None)
+        if user is None:
+            try:
+                user = await super().get_user_by_lookup(user_lookup)
+            except UnknownUserException:
+                return None
+            self.cache.put(user_lookup, user)
+        return user
+
+    async def get_user_identity(
+        self,
+        user_lookup: UserLookup,
+    ) -> UserIdentity | None:
+        user = await self._get_user(user_lookup)
+        return user.identity if user else None
+
+    async def get_oauth_data_by_user_lookup(
+        self,
+        user_lookup: UserLookup,
+    ) -> OAuthFields:
+        user = await self._get_user(user_lookup)
+        if not user:
+            raise UnknownUserException
+        return user.oauth_data
+
+    async def get_user_by_lookup(
+        self,
+        user_lookup: UserLookup,
+    ) -> User:
+        user = await self._get_user(user_lookup)
+        if not user:
+            raise UnknownUserException
+        return user
+
+    async def create_user(
+        self,
+        slack_alias: str,
+        fitbit_user_id: str | None,
+        health_user_id: str | None,
+        oauth_data: OAuthFields,
+    ) -> User:
+        self.cache.invalidate_if(lambda user: user.identity.slack_alias == slack_alias)
+        return await super().create_user(
+            slack_alias=slack_alias,
+            fitbit_user_id=fitbit_user_id,
+            health_user_id=health_user_id,
+            oauth_data=oauth_data,
+        )
+
+    async def update_oauth_data(
+        self,
+        oauth_userid: str,
+        oauth_data: OAuthFields,
+    ):
+        self.cache.invalidate_if(
+            lambda user: user.oauth_data.oauth_userid == oauth_userid
+        )
+        await super().update_oauth_data(
+            oauth_userid=oauth_userid,
+            oauth_data=oauth_data,
+        )
+
+    async def update_oauth_data_by_fitbit_user_id(
+        self,
+        fitbit_user_id: str,
+        oauth_data: OAuthFields,
+    ):
+        self.cache.invalidate_if(
+            lambda user: user.identity.fitbit_userid == fitbit_user_id
+        )
+        await super().update_oauth_data_by_fitbit_user_id(
+            fitbit_user_id=fitbit_user_id,
+            oauth_data=oauth_data,
+        )
+
+    async def update_user_ids(
+        self,
+        oauth_userid: str,
+        fitbit_user_id: str | None,
+        health_user_id: str | None,
+    ):
+        self.cache.invalidate_if(
+            lambda user: user.oauth_data.oauth_userid == oauth_userid
+        )
+        await super().update_user_ids(
+            oauth_userid=oauth_userid,
+            fitbit_user_id=fitbit_user_id,
+            health_user_id=health_user_id,
+        )
+
+    async def update_token_by_refresh_token(
+        self,
+        refresh_token: str,
+        new_access_token: str,
+        new_expiration_date: datetime.datetime,
+    ):
+        self.cache.invalidate_if(
+            lambda user: user.oauth_data.oauth_refresh_token == refresh_token
+        )
+        await super().update_token_by_refresh_token(
+            refresh_token=refresh_token,
+            new_access_token=new_access_token,
+            new_expiration_date=new_expiration_date,
+        )
+
+
+def _record_lookup(hit: bool):
+    lookups_counter.inc(result="hit" if hit else "miss")
+    hits = lookups_counter.get(result="hit")
+    hit_ratio_gauge.set(hits / (hits + lookups_counter.get(result="miss")))
@@ -0,0 +1,45 @@
+import datetime
+from typing import Callable
+
+from slackhealthbot.core.ttlcache import TTLCache
+from slackhealthbot.domain.localrepository.localdeduperepository import (
+    LocalDedupeRepository,
+)
+
+
+class InMemoryDedupeRepository(LocalDedupeRepository):
+    """
+    Dedupe store local to this process, bounded in size.
+    """
+
+    def __init__(self, max_entries: int):
+        self.cache: TTLCache[tuple[str, str], str] = TTLCache(
+            max_entries=max_entries,
+            ttl_s=0,
+        )
+
+    async def claim(
+        self,
+        namespace: str,
+        key: str,
+        value: str,
+        ttl: datetime.timedelta,
+        is_duplicate: Callable[[str], bool] | None = None,
+    ) -> bool:
+        is_duplicate = is_duplicate or value.__eq__
+        # No await between the check and the update: this is atomic
+        # for the tasks of this process.
+        current_value = self.cache.get((namespace, key))
+        if current_value is not None and is_duplicate(current_value):
+            return False
+        self.cache.put((namespace, key), value, ttl_s=ttl.total_seconds())
+        return True
+
+    async def release(
+        self,
+        namespace: str,
+        key: str,
+        value: str,
+    ):
+        if self.cache.get((namespace, key)) == value:
+            self.cache.invalidate((namespace, key))
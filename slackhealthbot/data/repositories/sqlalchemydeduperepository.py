@@ -0,0 +1,99 @@
+import datetime
+from typing import Callable
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.database import models
+from slackhealthbot.data.database.timestamps import utcnow
+from slackhealthbot.domain.localrepository.localdeduperepository import (
+    LocalDedupeRepository,
+)
+
+
+class SQLAlchemyDedupeRepository(LocalDedupeRepository):
+    """
+    Dedupe store in the database, shared by all the processes of the application.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def claim(
+        self,
+        namespace: str,
+        key: str,
+        value: str,
+        ttl: datetime.timedelta,
+        is_duplicate: Callable[[str], bool] | None = None,
+    ) -> bool:
+        is_duplicate = is_duplicate or value.__eq__
+        now = utcnow()
+        # Purge expired entries, so the table doesn't grow forever.
+        await self.db.execute(
+            statement=delete(models.DedupeEntry).where(
+                models.DedupeEntry.expires_at <= now
+            )
+        )
+        while True:
+            current_value = (
+                await self.db.scalars(
+                    statement=select(models.DedupeEntry.value).where(
+                        models.DedupeEntry.namespace == namespace,
+                        models.DedupeEntry.key == key,
+                        models.DedupeEntry.expires_at > now,
+                    )
+                )
+            ).one_or_none()
+            if current_value is not None and is_duplicate(current_value):
+                await self.db.commit()
+                return False
+            # Only store the entry if no other process changed it since we read it.
+            if current_value is None:
+                statement = insert(models.DedupeEntry).values(
+                    namespace=namespace,
+                    key=key,
+                    value=value,
+                    expires_at=now + ttl,
+                )
+                statement = statement.on_conflict_do_update(
+                    index_elements=[
+                        models.DedupeEntry.namespace,
+                        models.DedupeEntry.key,
+                    ],
+                    set_={
+                        "value": statement.excluded.value,
+                        "expires_at": statement.excluded.expires_at,
+                    },
+                    where=models.DedupeEntry.expires_at <= now,
+                )
+            else:
+                statement = (
+                    update(models.DedupeEntry)
+                    .where(
+                        models.DedupeEntry.namespace == namespace,
+                        models.DedupeEntry.key == key,
+                        models.DedupeEntry.value == current_value,
+                    )
+                    .values(value=value, expires_at=now + ttl)
+                )
+            result = await self.db.execute(statement=statement)
+            await self.db.commit()
+            if result.rowcount == 1:
+                return True
+
+    async def release(
+        self,
+        namespace: str,
+        key: str,
+        value: str,
+    ):
+        await self.db.execute(
+            statement=delete(models.DedupeEntry).where(
+                models.DedupeEntry.namespace == namespace,
+                models.DedupeEntry.key == key,
+                models.DedupeEntry.value == value,
+            )
+        )
+        await self.db.commit()
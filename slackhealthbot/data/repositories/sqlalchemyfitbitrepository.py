@@ -789,6 +789,10 @@ class SQLAlchemyFitbitRepository(LocalFitbitRepository):
                     models.FitbitDailyActivity.type_id.in_(type_ids),
                 )
             )
+            .order_by(
+                models.FitbitDailyActivity.fitbit_user_id,
+                models.FitbitDailyActivity.type_id,
+            )
         )
         return [
             DailyActivityStats(
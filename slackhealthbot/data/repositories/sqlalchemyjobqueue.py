@@ -0,0 +1,399 @@
+import asyncio
+import dataclasses
+import datetime
+import json
+import logging
+import traceback
+
+from asgi_correlation_id import correlation_id
+from sqlalchemy import delete, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from slackhealthbot.core.coalescer import CoalescingRatio
+from slackhealthbot.core.exceptions import QueueFullException
+from slackhealthbot.core.jobqueue import (
+    JobQueue,
+    depth_gauge,
+    enqueued_counter,
+    job_types,
+    oldest_age_gauge,
+    processed_counter,
+    rejected_counter,
+)
+from slackhealthbot.core.tracing import new_correlation_id, tracer
+from slackhealthbot.data.database import models
+from slackhealthbot.data.database.timestamps import utcnow
+from slackhealthbot.settings import InboundQueue
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"
+
+
+@dataclasses.dataclass
+class ClaimedJob:
+    id: int
+    kind: str
+    key: str
+    payload: dict
+    attempts: int
+    correlation_id: str | None = None
+
+
+class SQLAlchemyJobQueue(JobQueue):
+    """
+    Job queue in the database, shared by all the processes of the application.
+
+    Workers claim jobs for a visibility timeout. A job which isn't completed
+    by then, for example because its process stopped, is claimed again.
+
+    While a worker executes a job, it extends the visibility timeout of the job,
+    so that long jobs aren't claimed again by another worker.
+
+    Failed jobs are retried with an exponential backoff, up to a maximum number
+    of attempts. Jobs which failed too many times are kept in the database
+    with the dead status, for inspection.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        settings: InboundQueue,
+    ):
+        self.session_factory = session_factory
+        self.settings = settings
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._workers: list[asyncio.Task] = []
+        self._monitor: asyncio.Task | None = None
+        self._coalescing_ratios: dict[str, CoalescingRatio] = {}
+
+    def start(self):
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"inbound-queue-worker-{index}")
+            for index in range(self.settings.worker_count)
+        ]
+        self._monitor = asyncio.create_task(
+            self._monitor_queue(), name="inbound-queue-monitor"
+        )
+
+    async def stop(self, timeout_s: float = 30.0):
+        """
+        Wait for the jobs being executed to complete, then stop the workers.
+
+        Jobs which are still queued are executed after the next start.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._workers:
+            _, pending = await asyncio.wait(self._workers, timeout=timeout_s)
+            for worker in pending:
+                logging.warning("inbound queue: stopping with a job in progress")
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+        if self._monitor:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+
+    async def enqueue(
+        self,
+        kind: str,
+        key: str,
+        payload: dict,
+        coalesce_window_s: float = 0.0,
+    ):
+        job_type = job_types[kind]
+        now = utcnow()
+        coalescing = coalesce_window_s > 0 and job_type.merge is not None
+        if coalescing:
+            coalescing_ratio = self._coalescing_ratios.setdefault(
+                kind, CoalescingRatio(name=kind)
+            )
+            coalescing_ratio.record_submission()
+        async with self.session_factory() as db:
+            if coalescing:
+                pending_job = (
+                    await db.execute(
+                        select(models.InboundJob.id, models.InboundJob.payload)
+                        .where(
+                            models.InboundJob.kind == kind,
+                            models.InboundJob.key == key,
+                            models.InboundJob.status == STATUS_PENDING,
+                            models.InboundJob.attempts == 0,
+                            models.InboundJob.claimed_until.is_(None),
+                        )
+                        .order_by(models.InboundJob.id.desc())
+                        .limit(1)
+                    )
+                ).one_or_none()
+                if pending_job:
+                    # Only merge if no worker claimed the job in the meantime.
+                    result = await db.execute(
+                        update(models.InboundJob)
+                        .where(
+                            models.InboundJob.id == pending_job.id,
+                            models.InboundJob.claimed_until.is_(None),
+                        )
+                        .values(
+                            payload=json.dumps(
+                                job_type.merge(json.loads(pending_job.payload), payload)
+                            )
+                        )
+                    )
+                    if result.rowcount:
+                        await db.commit()
+                        enqueued_counter.inc(kind=kind)
+                        logging.info(f"inbound queue: coalesced {kind} job for {key}")
+                        return
+            if self.settings.max_pending_jobs and (
+                await db.scalar(
+                    select(func.count()).where(
+                        models.InboundJob.kind == kind,
+                        models.InboundJob.status == STATUS_PENDING,
+                    )
+                )
+                >= self.settings.max_pending_jobs
+            ):
+                rejected_counter.inc(kind=kind)
+                raise QueueFullException(
+                    name=kind, retry_after_s=self.settings.retry_after_s
+                )
+            db.add(
+                models.InboundJob(
+                    kind=kind,
+                    key=key,
+                    payload=json.dumps(payload),
+                    # The job is executed with the correlation id of the request
+                    # which enqueued it. A coalesced job keeps the first one.
+                    correlation_id=correlation_id.get(),
+                    status=STATUS_PENDING,
+                    attempts=0,
+                    available_at=now + datetime.timedelta(seconds=coalesce_window_s),
+                    created_at=now,
+                )
+            )
+            await db.commit()
+        if coalescing:
+            coalescing_ratio.record_run()
+        enqueued_counter.inc(kind=kind)
+        self._wakeup.set()
+
+    async def claim(self) -> ClaimedJob | None:
+        """
+        Claim the next job to execute.
+
+        A job is only claimed once the previous jobs with the same kind and key
+        are completed.
+        """
+        now = utcnow()
+        candidate = aliased(models.InboundJob)
+        previous = aliased(models.InboundJob)
+        async with self.session_factory() as db:
+            # Give up on jobs whose worker stopped during their last attempt.
+            await db.execute(
+                update(models.InboundJob)
+                .where(
+                    models.InboundJob.status == STATUS_PENDING,
+                    models.InboundJob.claimed_until < now,
+                    models.InboundJob.attempts >= self.settings.max_attempts,
+                )
+                .values(status=STATUS_DEAD, claimed_until=None)
+            )
+            candidate_id = (
+                select(candidate.id)
+                .where(
+                    candidate.status == STATUS_PENDING,
+                    candidate.available_at <= now,
+                    or_(
+                        candidate.claimed_until.is_(None),
+                        candidate.claimed_until < now,
+                    ),
+                    ~exists().where(
+                        previous.kind == candidate.kind,
+                        previous.key == candidate.key,
+                        previous.status == STATUS_PENDING,
+                        previous.id < candidate.id,
+                    ),
+                )
+                .order_by(candidate.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            row = (
+                await db.execute(
+                    update(models.InboundJob)
+                    .where(models.InboundJob.id == candidate_id)
+                    .values(
+                        claimed_until=now
+                        + datetime.timedelta(
+                            seconds=self.settings.visibility_timeout_s
+                        ),
+                        attempts=models.InboundJob.attempts + 1,
+                    )
+                    .returning(
+                        models.InboundJob.id,
+                        models.InboundJob.kind,
+                        models.InboundJob.key,
+                        models.InboundJob.payload,
+                        models.InboundJob.attempts,
+                        models.InboundJob.correlation_id,
+                    )
+                )
+            ).one_or_none()
+            await db.commit()
+        if row is None:
+            return None
+        return ClaimedJob(
+            id=row.id,
+            kind=row.kind,
+            key=row.key,
+            payload=json.loads(row.payload),
+            attempts=row.attempts,
+            correlation_id=row.correlation_id,
+        )
+
+    async def complete(self, job: ClaimedJob):
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(models.InboundJob).where(models.InboundJob.id == job.id)
+            )
+            await db.commit()
+        processed_counter.inc(kind=job.kind, outcome="success")
+
+    async def fail(self, job: ClaimedJob, error: str):
+        values = {"claimed_until": None, "last_error": error}
+        if job.attempts >= self.settings.max_attempts:
+            logging.error(
+                f"inbound queue: giving up on {job.kind} job {job.id} for {job.key}"
+            )
+            values["status"] = STATUS_DEAD
+            outcome = "failure"
+        else:
+            values["available_at"] = utcnow() + datetime.timedelta(
+                seconds=self.settings.retry_backoff_s * 2 ** (job.attempts - 1)
+            )
+            outcome = "retry"
+        async with self.session_factory() as db:
+            await db.execute(
+                update(models.InboundJob)
+                .where(models.InboundJob.id == job.id)
+                .values(**values)
+            )
+            await db.commit()
+        processed_counter.inc(kind=job.kind, outcome=outcome)
+
+    async def extend_visibility_timeout(self, job: ClaimedJob) -> bool:
+        """
+        :return: False if the job was claimed again in the meantime.
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(models.InboundJob)
+                .where(
+                    models.InboundJob.id == job.id,
+                    models.InboundJob.attempts == job.attempts,
+                )
+                .values(
+                    claimed_until=utcnow()
+                    + datetime.timedelta(seconds=self.settings.visibility_timeout_s)
+                )
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def execute(self, job: ClaimedJob):
+        if job.correlation_id:
+            correlation_id.set(job.correlation_id)
+        else:
+            new_correlation_id()
+        heartbeat = asyncio.create_task(
+            self._extend_visibility_timeout_periodically(job),
+            name=f"inbound-queue-heartbeat-{job.id}",
+        )
+        error: str | None = None
+        try:
+            with tracer.span(f"job {job.kind}", attempt=job.attempts):
+                await job_types[job.kind].handler(job.payload)
+        except Exception:
+            logging.exception(
+                f"inbound queue: error executing {job.kind} job for {job.key}"
+            )
+            error = traceback.format_exc()
+        finally:
+            # Stop extending the timeout before releasing the job.
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        if error:
+            await self.fail(job, error=error)
+        else:
+            await self.complete(job)
+
+    async def _extend_visibility_timeout_periodically(self, job: ClaimedJob):
+        while True:
+            await asyncio.sleep(self.settings.visibility_timeout_s / 3)
+            try:
+                if not await self.extend_visibility_timeout(job):
+                    logging.warning(
+                        f"inbound queue: {job.kind} job {job.id} was claimed again"
+                    )
+                    return
+            except Exception:
+                logging.exception(
+                    f"inbound queue: error extending the timeout of job {job.id}"
+                )
+
+    async def update_metrics(self):
+        async with self.session_factory() as db:
+            rows = (
+                await db.execute(
+                    select(
+                        models.InboundJob.kind,
+                        func.count(),
+                        func.min(models.InboundJob.created_at),
+                    )
+                    .where(models.InboundJob.status == STATUS_PENDING)
+                    .group_by(models.InboundJob.kind)
+                )
+            ).all()
+        now = utcnow()
+        stats = {kind: (count, oldest) for kind, count, oldest in rows}
+        for kind in set(job_types) | set(stats):
+            count, oldest = stats.get(kind, (0, None))
+            depth_gauge.set(count, kind=kind)
+            oldest_age_gauge.set(
+                (now - oldest).total_seconds() if oldest else 0.0,
+                kind=kind,
+            )
+
+    async def _work(self):
+        while not self._stopping:
+            try:
+                job = await self.claim()
+            except Exception:
+                logging.exception("inbound queue: error claiming a job")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=self.settings.poll_interval_s,
+                    )
+                except TimeoutError:
+                    pass
+                continue
+            try:
+                await self.execute(job)
+            except Exception:
+                logging.exception(f"inbound queue: error updating job {job.id}")
+
+    async def _monitor_queue(self):
+        while True:
+            try:
+                await self.update_metrics()
+            except Exception:
+                logging.exception("inbound queue: error updating the metrics")
+            await asyncio.sleep(self.settings.poll_interval_s)
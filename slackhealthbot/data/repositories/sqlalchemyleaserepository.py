@@ -0,0 +1,75 @@
+import datetime
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.database import models
+from slackhealthbot.data.database.timestamps import utcnow
+from slackhealthbot.domain.localrepository.localleaserepository import (
+    LocalLeaseRepository,
+)
+
+
+class SQLAlchemyLeaseRepository(LocalLeaseRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def try_acquire(
+        self,
+        name: str,
+        holder: str,
+        ttl: datetime.timedelta,
+    ) -> bool:
+        now = utcnow()
+        statement = insert(models.Lease).values(
+            name=name,
+            holder=holder,
+            expires_at=now + ttl,
+        )
+        # Take over the lease only if we already hold it, or if it expired.
+        await self.db.execute(
+            statement=statement.on_conflict_do_update(
+                index_elements=[models.Lease.name],
+                set_={
+                    "holder": statement.excluded.holder,
+                    "expires_at": statement.excluded.expires_at,
+                },
+                where=or_(
+                    models.Lease.holder == holder,
+                    models.Lease.expires_at < now,
+                ),
+            )
+        )
+        current_holder = await self.db.scalar(
+            statement=select(models.Lease.holder).where(models.Lease.name == name)
+        )
+        await self.db.commit()
+        return current_holder == holder
+
+    async def release(
+        self,
+        name: str,
+        holder: str,
+    ):
+        await self.db.execute(
+            statement=delete(models.Lease).where(
+                models.Lease.name == name,
+                models.Lease.holder == holder,
+            )
+        )
+        await self.db.commit()
+
+    async def get_holders(
+        self,
+        name_prefix: str,
+    ) -> list[str]:
+        holders = await self.db.scalars(
+            statement=select(models.Lease.holder)
+            .where(
+                models.Lease.name.startswith(name_prefix, autoescape=True),
+                models.Lease.expires_at >= utcnow(),
+            )
+            .order_by(models.Lease.holder)
+        )
+        return list(holders.all())
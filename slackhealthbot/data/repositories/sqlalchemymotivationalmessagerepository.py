@@ -0,0 +1,61 @@
+import datetime
+import hashlib
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.database import models
+from slackhealthbot.data.database.timestamps import utcnow
+from slackhealthbot.domain.localrepository.localmotivationalmessagerepository import (
+    LocalMotivationalMessageRepository,
+)
+
+
+def _hash_prompt(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+class SQLAlchemyMotivationalMessageRepository(LocalMotivationalMessageRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_message(
+        self,
+        prompt: str,
+    ) -> str | None:
+        return await self.db.scalar(
+            statement=select(models.MotivationalMessage.message).where(
+                models.MotivationalMessage.prompt_hash == _hash_prompt(prompt),
+                models.MotivationalMessage.expires_at > utcnow(),
+            )
+        )
+
+    async def put_message(
+        self,
+        prompt: str,
+        message: str,
+        ttl: datetime.timedelta,
+    ):
+        now = utcnow()
+        # Purge expired messages, so the table doesn't grow forever.
+        await self.db.execute(
+            statement=delete(models.MotivationalMessage).where(
+                models.MotivationalMessage.expires_at <= now
+            )
+        )
+        statement = insert(models.MotivationalMessage).values(
+            prompt_hash=_hash_prompt(prompt),
+            message=message,
+            expires_at=now + ttl,
+        )
+        await self.db.execute(
+            statement=statement.on_conflict_do_update(
+                index_elements=[models.MotivationalMessage.prompt_hash],
+                set_={
+                    "message": statement.excluded.message,
+                    "expires_at": statement.excluded.expires_at,
+                },
+            )
+        )
+        await self.db.commit()
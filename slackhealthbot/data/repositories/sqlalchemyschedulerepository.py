@@ -0,0 +1,53 @@
+import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.database import models
+from slackhealthbot.data.database.timestamps import utcnow
+from slackhealthbot.domain.localrepository.localschedulerepository import (
+    LocalScheduleRepository,
+)
+
+
+class SQLAlchemyScheduleRepository(LocalScheduleRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_last_run(
+        self,
+        name: str,
+    ) -> datetime.datetime | None:
+        last_run_at = await self.db.scalar(
+            statement=select(models.ScheduledJob.last_run_at).where(
+                models.ScheduledJob.name == name
+            )
+        )
+        if last_run_at is None:
+            return None
+        return last_run_at.replace(tzinfo=datetime.timezone.utc)
+
+    async def record_run(
+        self,
+        name: str,
+        scheduled_at: datetime.datetime,
+    ):
+        last_run_at = scheduled_at.astimezone(datetime.timezone.utc).replace(
+            tzinfo=None
+        )
+        statement = insert(models.ScheduledJob).values(
+            name=name,
+            last_run_at=last_run_at,
+            completed_at=utcnow(),
+        )
+        await self.db.execute(
+            statement=statement.on_conflict_do_update(
+                index_elements=[models.ScheduledJob.name],
+                set_={
+                    "last_run_at": statement.excluded.last_run_at,
+                    "completed_at": statement.excluded.completed_at,
+                },
+            )
+        )
+        await self.db.commit()
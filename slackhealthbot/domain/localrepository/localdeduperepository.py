@@ -0,0 +1,47 @@
+import datetime
+from abc import ABC, abstractmethod
+from typing import Callable
+
+
+class LocalDedupeRepository(ABC):
+    """
+    Store of the last processed webhook notification per user, used to ignore
+    duplicate notifications.
+
+    Entries are grouped by namespace (ex: one namespace per provider), and
+    expire after the given time to live.
+    """
+
+    @abstractmethod
+    async def claim(
+        self,
+        namespace: str,
+        key: str,
+        value: str,
+        ttl: datetime.timedelta,
+        is_duplicate: Callable[[str], bool] | None = None,
+    ) -> bool:
+        """
+        Atomically store the entry, unless the current entry for this key
+        marks the notification as a duplicate.
+
+        Processes sharing the store may receive the same notification:
+        only the one which claims it should process it.
+
+        :param is_duplicate: whether the notification is a duplicate,
+            given the value of the current entry, if it didn't expire.
+            By default, if the value of the current entry is the given value.
+        :return: True if the entry was stored, False if it's a duplicate.
+        """
+
+    @abstractmethod
+    async def release(
+        self,
+        namespace: str,
+        key: str,
+        value: str,
+    ):
+        """
+        Delete the entry if it still has the given value, so that the
+        notification can be processed again, for example after an error.
+        """
@@ -0,0 +1,43 @@
+import datetime
+from abc import ABC, abstractmethod
+
+
+class LocalLeaseRepository(ABC):
+    """
+    Store of named leases, used to elect the single process of the application
+    which executes a given work, like the scheduled tasks.
+
+    A lease is held by one holder at a time, until it expires or is released.
+    """
+
+    @abstractmethod
+    async def try_acquire(
+        self,
+        name: str,
+        holder: str,
+        ttl: datetime.timedelta,
+    ) -> bool:
+        """
+        Acquire the lease, or renew it if the holder already holds it.
+
+        :return: True if the holder now holds the lease, False if another
+            holder holds it.
+        """
+
+    @abstractmethod
+    async def release(
+        self,
+        name: str,
+        holder: str,
+    ):
+        pass
+
+    @abstractmethod
+    async def get_holders(
+        self,
+        name_prefix: str,
+    ) -> list[str]:
+        """
+        :return: the holders of the unexpired leases whose name starts with
+            the given prefix.
+        """
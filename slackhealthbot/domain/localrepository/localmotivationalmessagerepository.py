@@ -0,0 +1,30 @@
+import datetime
+from abc import ABC, abstractmethod
+
+
+class LocalMotivationalMessageRepository(ABC):
+    """
+    Cache of the motivational messages created by an AI, generated in the
+    background ahead of the reports which need them.
+
+    Messages are stored by prompt, and expire after the given time to live.
+    """
+
+    @abstractmethod
+    async def get_message(
+        self,
+        prompt: str,
+    ) -> str | None:
+        """
+        :return: the message generated for this prompt, or None if there's
+            none or it expired.
+        """
+
+    @abstractmethod
+    async def put_message(
+        self,
+        prompt: str,
+        message: str,
+        ttl: datetime.timedelta,
+    ):
+        pass
@@ -0,0 +1,31 @@
+import datetime
+from abc import ABC, abstractmethod
+
+
+class LocalScheduleRepository(ABC):
+    """
+    Store of the last completed run of each scheduled job, so that the runs
+    missed while the application was stopped can be caught up.
+    """
+
+    @abstractmethod
+    async def get_last_run(
+        self,
+        name: str,
+    ) -> datetime.datetime | None:
+        """
+        :return: the time the last completed run of the job was scheduled at,
+            with a timezone, or None if the job never completed.
+        """
+
+    @abstractmethod
+    async def record_run(
+        self,
+        name: str,
+        scheduled_at: datetime.datetime,
+    ):
+        """
+        Record that the run of the job scheduled at the given time completed.
+
+        :param scheduled_at: a datetime with a timezone.
+        """
@@ -3,6 +3,7 @@ import datetime as dt
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
 )
@@ -13,6 +14,7 @@ from slackhealthbot.settings import Settings, StreakMode
 
 
 @inject
+@traced()
 async def do(
     daily_activity: DailyActivityStats,
     end_date: dt.date,
@@ -4,6 +4,7 @@ from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     User,
@@ -19,6 +20,7 @@ from slackhealthbot.domain.remoterepository.remotegooglerepository import (
 
 
 @inject
+@traced()
 async def do(
     user_lookup: UserLookup,
     when: datetime.date,
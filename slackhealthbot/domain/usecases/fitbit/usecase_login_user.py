@@ -4,6 +4,7 @@ from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     User,
@@ -16,6 +17,7 @@ from slackhealthbot.domain.remoterepository.remotefitbitrepository import (
 
 
 @inject
+@traced()
 async def do(
     slack_alias: str,
     token: dict[str, Any],
@@ -1,6 +1,7 @@
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     UserIdentity,
@@ -12,6 +13,7 @@ from slackhealthbot.domain.usecases.slack import (
 
 
 @inject
+@traced()
 async def do(
     user_lookup: UserLookup,
     fitbit_repo: LocalFitbitRepository = Provide[Container.local_fitbit_repository],
@@ -0,0 +1,147 @@
+import asyncio
+import datetime as dt
+import logging
+
+from dependency_injector.wiring import Provide, inject
+
+from slackhealthbot.containers import Container
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import traced
+from slackhealthbot.domain.localrepository.localfitbitrepository import (
+    LocalFitbitRepository,
+)
+from slackhealthbot.domain.localrepository.localmotivationalmessagerepository import (
+    LocalMotivationalMessageRepository,
+)
+from slackhealthbot.domain.models.users import UserLookup
+from slackhealthbot.domain.remoterepository.remoteopenairepository import (
+    RemoteOpenAiRepository,
+)
+from slackhealthbot.domain.usecases.fitbit import usecase_calculate_streak
+from slackhealthbot.domain.usecases.slack.usecase_post_daily_activity import (
+    create_motivational_prompt,
+    is_motivational_streak,
+)
+from slackhealthbot.settings import Settings, StreakMode
+
+logger = logging.getLogger(__name__)
+
+generations_counter = registry.counter(
+    "motivational_message_generations_total",
+    "Number of motivational messages generated ahead of the daily reports, "
+    "by outcome: success, failure or timeout.",
+    labelnames=("outcome",),
+)
+
+
+@inject
+@traced()
+async def do(
+    type_ids: set[int],
+    when: dt.date,
+    settings: Settings = Provide[Container.settings],
+    local_fitbit_repo: LocalFitbitRepository = Provide[
+        Container.local_fitbit_repository
+    ],
+    message_repository: LocalMotivationalMessageRepository = Provide[
+        Container.motivational_message_repository
+    ],
+):
+    """
+    Generate the motivational messages of the daily reports of the given date,
+    for the users whose streak reaches a milestone if they meet their goal
+    that day.
+
+    Messages which couldn't be generated are left to the local templates of
+    the reports.
+    """
+    activities = settings.app_settings.fitbit.activities
+    for user_identity in await local_fitbit_repo.get_all_user_identities():
+        for type_id in sorted(type_ids):
+            report_settings = activities.get_report(activity_type_id=type_id)
+            if report_settings is None:
+                continue
+            streak_days = await _predict_streak_days(
+                user_lookup=user_identity.user_lookup,
+                type_id=type_id,
+                when=when,
+                local_fitbit_repo=local_fitbit_repo,
+            )
+            if not is_motivational_streak(streak_days, report_settings):
+                continue
+            prompt = create_motivational_prompt(
+                slack_alias=user_identity.slack_alias,
+                activity_name=activities.get_activity_type(type_id).name,
+                streak_days=streak_days,
+                distance_km=report_settings.daily_goals.distance_km,
+            )
+            if await message_repository.get_message(prompt) is None:
+                await _generate_message(prompt)
+
+
+@inject
+async def _predict_streak_days(
+    user_lookup: UserLookup,
+    type_id: int,
+    when: dt.date,
+    local_fitbit_repo: LocalFitbitRepository,
+    settings: Settings = Provide[Container.settings],
+) -> int:
+    """
+    :return: the streak of the user on the given date, if they meet their goal
+        that day.
+    """
+    latest_daily_activity = (
+        await local_fitbit_repo.get_latest_daily_activity_by_user_and_activity_type(
+            user_lookup=user_lookup,
+            type_id=type_id,
+            before=when,
+        )
+    )
+    if latest_daily_activity is None:
+        return 1
+    streak_days = await usecase_calculate_streak.do(
+        daily_activity=latest_daily_activity,
+        end_date=latest_daily_activity.date,
+        local_fitbit_repo=local_fitbit_repo,
+    )
+    report_settings = settings.app_settings.fitbit.activities.get_report(
+        activity_type_id=type_id
+    )
+    if (
+        report_settings.streak.mode == StreakMode.strict
+        and latest_daily_activity.date < when - dt.timedelta(days=1)
+    ):
+        # The days without activity broke the streak.
+        return 1
+    return (streak_days or 0) + 1
+
+
+@inject
+async def _generate_message(
+    prompt: str,
+    settings: Settings = Provide[Container.settings],
+    openai_repository: RemoteOpenAiRepository = Provide[Container.openai_repository],
+    message_repository: LocalMotivationalMessageRepository = Provide[
+        Container.motivational_message_repository
+    ],
+):
+    message_settings = settings.app_settings.openai.motivational_messages
+    try:
+        message = await asyncio.wait_for(
+            openai_repository.create_response(prompt),
+            timeout=message_settings.timeout_s,
+        )
+    except TimeoutError:
+        logger.warning("Timed out generating a motivational message")
+        generations_counter.inc(outcome="timeout")
+        return
+    if not message:
+        generations_counter.inc(outcome="failure")
+        return
+    await message_repository.put_message(
+        prompt=prompt,
+        message=message,
+        ttl=dt.timedelta(seconds=message_settings.ttl_s),
+    )
+    generations_counter.inc(outcome="success")
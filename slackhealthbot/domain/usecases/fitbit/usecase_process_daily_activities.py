@@ -1,30 +1,154 @@
+import asyncio
+import dataclasses
 import datetime as dt
+import logging
+from contextlib import AbstractAsyncContextManager
+from typing import Callable, TypeAlias
 
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
 )
 from slackhealthbot.domain.models.activity import DailyActivityStats
+from slackhealthbot.domain.models.users import UserLookup
+from slackhealthbot.domain.remoterepository.remoteslackrepository import (
+    RemoteSlackRepository,
+)
 from slackhealthbot.domain.usecases.fitbit import usecase_process_daily_activity
+from slackhealthbot.settings import Settings
+
+
+@dataclasses.dataclass
+class PreparedReport:
+    daily_activity: DailyActivityStats
+    message: str | None
+
+
+ReportKey: TypeAlias = tuple[UserLookup, int]
+
+
+def _report_key(daily_activity: DailyActivityStats) -> ReportKey:
+    return daily_activity.user_lookup, daily_activity.type_id
 
 
 @inject
-async def do(
+@traced()
+async def prepare(
     type_ids: set[int],
+    when: dt.date | None = None,
     local_fitbit_repo: LocalFitbitRepository = Provide[
         Container.local_fitbit_repository
     ],
-):
-    list_daily_activities: list[DailyActivityStats] = (
-        await local_fitbit_repo.get_daily_activities_by_type(
-            type_ids=type_ids,
-            when=dt.datetime.now(dt.timezone.utc).date(),
-        )
+    settings: Settings = Provide[Container.settings],
+) -> dict[ReportKey, PreparedReport]:
+    """
+    Create the daily reports of all the users ahead of posting them,
+    including their AI motivational messages.
+
+    :param when: the day of the reports, today in UTC by default.
+    """
+    list_daily_activities = await _get_daily_activities(
+        type_ids, when, local_fitbit_repo
     )
-    for daily_activity in list_daily_activities:
-        await usecase_process_daily_activity.do(
-            local_fitbit_repo=local_fitbit_repo,
+    semaphore = asyncio.Semaphore(
+        settings.app_settings.fitbit.activities.daily_report_concurrency
+    )
+    async with asyncio.TaskGroup() as task_group:
+        messages = [
+            task_group.create_task(_create_message(daily_activity, semaphore))
+            for daily_activity in list_daily_activities
+        ]
+    return {
+        _report_key(daily_activity): PreparedReport(
             daily_activity=daily_activity,
+            message=message.result(),
         )
+        for daily_activity, message in zip(list_daily_activities, messages)
+    }
+
+
+@inject
+@traced()
+async def do(  # noqa: PLR0913
+    type_ids: set[int],
+    when: dt.date | None = None,
+    prepared_reports: dict[ReportKey, PreparedReport] | None = None,
+    local_fitbit_repo: LocalFitbitRepository = Provide[
+        Container.local_fitbit_repository
+    ],
+    slack_repo: RemoteSlackRepository = Provide[Container.slack_repository],
+    settings: Settings = Provide[Container.settings],
+):
+    """
+    Create the daily reports of all the users concurrently, up to
+    the daily_report_concurrency setting, and post them to slack in the order
+    of the daily activities.
+
+    :param when: the day of the reports, today in UTC by default.
+    :param prepared_reports: the reports created ahead by prepare().
+        Only the reports of the users who logged activities since then
+        are created again.
+    """
+    list_daily_activities = await _get_daily_activities(
+        type_ids, when, local_fitbit_repo
+    )
+    prepared_reports = prepared_reports or {}
+    semaphore = asyncio.Semaphore(
+        settings.app_settings.fitbit.activities.daily_report_concurrency
+    )
+
+    async def get_message(daily_activity: DailyActivityStats) -> str | None:
+        prepared_report = prepared_reports.get(_report_key(daily_activity))
+        if prepared_report and prepared_report.daily_activity == daily_activity:
+            return prepared_report.message
+        return await _create_message(daily_activity, semaphore)
+
+    async with asyncio.TaskGroup() as task_group:
+        messages = [
+            task_group.create_task(get_message(daily_activity))
+            for daily_activity in list_daily_activities
+        ]
+        # Post each report as soon as it and the ones before it are ready.
+        for message in messages:
+            if message_text := await message:
+                await slack_repo.post_message(message_text)
+
+
+async def _get_daily_activities(
+    type_ids: set[int],
+    when: dt.date | None,
+    local_fitbit_repo: LocalFitbitRepository,
+) -> list[DailyActivityStats]:
+    return await local_fitbit_repo.get_daily_activities_by_type(
+        type_ids=type_ids,
+        when=when or dt.datetime.now(dt.timezone.utc).date(),
+    )
+
+
+@inject
+async def _create_message(
+    daily_activity: DailyActivityStats,
+    semaphore: asyncio.Semaphore,
+    db_scope: Callable[[], AbstractAsyncContextManager] = Provide[
+        Container.db_scope.provider
+    ],
+) -> str | None:
+    """
+    :return: the daily report, or None if it couldn't be created.
+    """
+    async with semaphore:
+        try:
+            # The reports are created concurrently: each needs its own session.
+            async with db_scope():
+                return await usecase_process_daily_activity.create_message(
+                    daily_activity=daily_activity,
+                )
+        except Exception:
+            logging.error(
+                f"Error creating the daily report for {daily_activity.slack_alias}",
+                exc_info=True,
+            )
+            return None
@@ -3,6 +3,7 @@ import datetime as dt
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     UserIdentity,
@@ -12,13 +13,32 @@ from slackhealthbot.domain.models.activity import (
     DailyActivityStats,
     TopActivityStats,
 )
+from slackhealthbot.domain.remoterepository.remoteslackrepository import (
+    RemoteSlackRepository,
+)
 from slackhealthbot.domain.usecases.fitbit import usecase_calculate_streak
 from slackhealthbot.domain.usecases.slack import usecase_post_daily_activity
 from slackhealthbot.settings import Settings
 
 
 @inject
+@traced()
 async def do(
+    daily_activity: DailyActivityStats,
+    local_fitbit_repo: LocalFitbitRepository = Provide[
+        Container.local_fitbit_repository
+    ],
+    slack_repo: RemoteSlackRepository = Provide[Container.slack_repository],
+):
+    message = await create_message(
+        daily_activity=daily_activity,
+        local_fitbit_repo=local_fitbit_repo,
+    )
+    await slack_repo.post_message(message)
+
+
+@inject
+async def create_message(
     daily_activity: DailyActivityStats,
     settings: Settings = Provide[Container.settings],
     local_fitbit_repo: LocalFitbitRepository = Provide[
@@ -29,7 +49,7 @@ async def do(
     streak_distance_km_days = await usecase_calculate_streak.do(
         local_fitbit_repo=local_fitbit_repo,
         daily_activity=daily_activity,
-        end_date=now.date(),
+        end_date=daily_activity.date,
     )
 
     user_identity: UserIdentity = await local_fitbit_repo.get_user_identity(
@@ -39,7 +59,7 @@ async def do(
         await local_fitbit_repo.get_latest_daily_activity_by_user_and_activity_type(
             user_lookup=daily_activity.user_lookup,
             type_id=daily_activity.type_id,
-            before=now.date(),
+            before=daily_activity.date,
         )
     )
     all_time_top_daily_activity_stats: TopActivityStats = (
@@ -70,9 +90,10 @@ async def do(
     )
     activity_name = activity_type.name if activity_type is not None else "Unknown"
 
-    await usecase_post_daily_activity.do(
+    message = await usecase_post_daily_activity.create_message(
         slack_alias=user_identity.slack_alias,
         activity_name=activity_name,
         history=history,
         record_history_days=settings.app_settings.fitbit.activities.history_days,
     )
+    return message.strip()
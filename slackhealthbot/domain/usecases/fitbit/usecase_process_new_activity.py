@@ -3,6 +3,7 @@ import datetime
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     User,
@@ -25,6 +26,7 @@ from slackhealthbot.settings import Settings
 
 
 @inject
+@traced()
 async def do(  # noqa: PLR0913 deal with this later
     user_lookup: UserLookup,
     when: datetime.date,
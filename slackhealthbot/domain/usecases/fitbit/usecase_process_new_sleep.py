@@ -3,6 +3,7 @@ import datetime
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     UserIdentity,
@@ -14,6 +15,7 @@ from slackhealthbot.domain.usecases.slack import usecase_post_sleep
 
 
 @inject
+@traced()
 async def do(
     user_lookup: UserLookup,
     when: datetime.date,
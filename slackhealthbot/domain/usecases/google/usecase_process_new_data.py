@@ -3,6 +3,7 @@ import logging
 from enum import Enum, auto
 
 from slackhealthbot.core.exceptions import UnknownUserException, UserLoggedOutException
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.models.users import UserLookup
 from slackhealthbot.domain.usecases.fitbit import (
     usecase_post_user_logged_out,
@@ -16,6 +17,7 @@ class DataType(Enum):
     EXERCISE = auto()
 
 
+@traced()
 async def do(
     data_type: DataType,
     user_lookup: UserLookup,
@@ -1,6 +1,7 @@
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.models.activity import ActivityHistory
 from slackhealthbot.domain.remoterepository.remoteslackrepository import (
     RemoteSlackRepository,
@@ -13,6 +14,7 @@ from slackhealthbot.settings import ReportField, Settings
 
 
 @inject
+@traced()
 async def do(
     slack_alias: str,
     activity_name: str,
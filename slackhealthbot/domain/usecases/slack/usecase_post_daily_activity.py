@@ -1,10 +1,12 @@
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
-from slackhealthbot.domain.models.activity import DailyActivityHistory
-from slackhealthbot.domain.remoterepository.remoteopenairepository import (
-    RemoteOpenAiRepository,
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import traced
+from slackhealthbot.domain.localrepository.localmotivationalmessagerepository import (
+    LocalMotivationalMessageRepository,
 )
+from slackhealthbot.domain.models.activity import DailyActivityHistory
 from slackhealthbot.domain.remoterepository.remoteslackrepository import (
     RemoteSlackRepository,
 )
@@ -16,8 +18,22 @@ from slackhealthbot.domain.usecases.slack.usecase_activity_message_formatter imp
 )
 from slackhealthbot.settings import Report, ReportField, Settings
 
+motivational_messages_counter = registry.counter(
+    "motivational_messages_total",
+    "Number of motivational messages in the daily reports, by source: ai or template.",
+    labelnames=("source",),
+)
+
+# Used when no message was generated by the AI ahead of the report.
+MOTIVATIONAL_MESSAGE_TEMPLATES = (
+    "🎉 {streak_days} days of {activity_name} in a row, over {distance_km} km every day. Keep it up! 💪",
+    "🔥 What a streak, <@{slack_alias}>: {streak_days} days of {activity_name}! Keep going! 🚀",
+    "🏅 {streak_days} days and counting! Nothing can stop you now! 🙌",
+)
+
 
 @inject
+@traced()
 async def do(
     slack_alias: str,
     activity_name: str,
@@ -217,19 +233,50 @@ New daily {activity_name} activity from <@{slack_alias}>:
     return message
 
 
+def create_motivational_prompt(
+    slack_alias: str,
+    activity_name: str,
+    streak_days: int,
+    distance_km: float,
+) -> str:
+    return f"""
+Generate a short message, using emojis, of congratulations and encouragement for
+<@{slack_alias}> who just finished a {streak_days} day streak of {activity_name}
+doing over {distance_km} km every day.
+"""
+
+
+def is_motivational_streak(streak_days: int, report_settings: Report) -> bool:
+    """
+    :return: whether a streak of this length gets an additional motivational
+        message from AI: if we reached our goal streak by a multiple of x days.
+    """
+    return bool(
+        streak_days
+        and streak_days % report_settings.ai_motivational_message_frequency_days == 0
+        and report_settings.daily_goals
+        and report_settings.daily_goals.distance_km
+    )
+
+
 @inject
 async def create_motivational_message(
     slack_alias: str,
     activity_name: str,
     report_settings: Report,
     history: DailyActivityHistory,
-    openai_repository: RemoteOpenAiRepository = Provide[Container.openai_repository],
+    message_repository: LocalMotivationalMessageRepository = Provide[
+        Container.motivational_message_repository
+    ],
 ) -> str:
     """
     Create a motivational message including, if relevant, a note that the goal
         was reached, that a streak has been accomplished, and a motivational
         text created by an AI.
 
+    The AI text is generated in the background ahead of the report: if it
+        wasn't, a local template is used instead.
+
     :return: the motivational message, or an empty string if not relevant.
     """
     motivational_message = ""
@@ -242,22 +289,29 @@ async def create_motivational_message(
         motivational_message += " Goal reached! 👍"
     if history.streak_distance_km_days:
         motivational_message += f" {history.streak_distance_km_days} day streak! 👏"
-        # If we reached our goal streak by a multiple of x days, include
-        # an additional motivational message from AI.
-        if (
-            history.streak_distance_km_days
-            % report_settings.ai_motivational_message_frequency_days
-            == 0
-            and report_settings.daily_goals.distance_km
-        ):
-            prompt = f"""
-Generate a short message, using emojis, of congratulations and encouragement for
-<@{slack_alias}> who just finished a {history.streak_distance_km_days} day streak of {activity_name}
-doing over {report_settings.daily_goals.distance_km} km every day.
-"""
-            ai_motivational_message = await openai_repository.create_response(prompt)
+        if is_motivational_streak(history.streak_distance_km_days, report_settings):
+            ai_motivational_message = await message_repository.get_message(
+                create_motivational_prompt(
+                    slack_alias=slack_alias,
+                    activity_name=activity_name,
+                    streak_days=history.streak_distance_km_days,
+                    distance_km=report_settings.daily_goals.distance_km,
+                )
+            )
             if ai_motivational_message:
-                motivational_message += f"""
+                motivational_messages_counter.inc(source="ai")
+            else:
+                motivational_messages_counter.inc(source="template")
+                ai_motivational_message = MOTIVATIONAL_MESSAGE_TEMPLATES[
+                    history.streak_distance_km_days
+                    % len(MOTIVATIONAL_MESSAGE_TEMPLATES)
+                ].format(
+                    slack_alias=slack_alias,
+                    activity_name=activity_name,
+                    streak_days=history.streak_distance_km_days,
+                    distance_km=report_settings.daily_goals.distance_km,
+                )
+            motivational_message += f"""
 {ai_motivational_message}"""
     motivational_message += """
 """
@@ -3,6 +3,7 @@ import datetime
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.models.sleep import SleepData
 from slackhealthbot.domain.remoterepository.remoteslackrepository import (
     RemoteSlackRepository,
@@ -10,6 +11,7 @@ from slackhealthbot.domain.remoterepository.remoteslackrepository import (
 
 
 @inject
+@traced()
 async def do(
     slack_alias: str,
     new_sleep_data: SleepData,
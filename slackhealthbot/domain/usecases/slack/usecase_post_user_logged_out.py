@@ -1,6 +1,7 @@
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.remoterepository.remoteslackrepository import (
     RemoteSlackRepository,
 )
@@ -8,6 +9,7 @@ from slackhealthbot.settings import Settings
 
 
 @inject
+@traced()
 async def do(
     slack_alias: str,
     service: str,
@@ -1,6 +1,7 @@
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.models.weight import WeightData
 from slackhealthbot.domain.remoterepository.remoteslackrepository import (
     RemoteSlackRepository,
@@ -8,6 +9,7 @@ from slackhealthbot.domain.remoterepository.remoteslackrepository import (
 
 
 @inject
+@traced()
 async def do(
     weight_data: WeightData,
     slack_repo: RemoteSlackRepository = Provide[Container.slack_repository],
@@ -2,6 +2,7 @@ from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localwithingsrepository import (
     LocalWithingsRepository,
 )
@@ -11,6 +12,7 @@ from slackhealthbot.domain.remoterepository.remotewithingsrepository import (
 
 
 @inject
+@traced()
 async def do(
     local_repo: LocalWithingsRepository,
     withings_userid: str,
@@ -4,6 +4,7 @@ from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localwithingsrepository import (
     LocalWithingsRepository,
     User,
@@ -15,6 +16,7 @@ from slackhealthbot.domain.remoterepository.remotewithingsrepository import (
 
 
 @inject
+@traced()
 async def do(
     slack_alias: str,
     token: dict[str, Any],
@@ -1,6 +1,7 @@
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localwithingsrepository import (
     LocalWithingsRepository,
     UserIdentity,
@@ -11,6 +12,7 @@ from slackhealthbot.domain.usecases.slack import (
 
 
 @inject
+@traced()
 async def do(
     withings_userid: str,
     withings_repo: LocalWithingsRepository = Provide[
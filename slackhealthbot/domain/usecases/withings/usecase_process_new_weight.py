@@ -3,6 +3,7 @@ import dataclasses
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.localrepository.localwithingsrepository import (
     LocalWithingsRepository,
     User,
@@ -20,6 +21,7 @@ class NewWeightParameters:
 
 
 @inject
+@traced()
 async def do(
     new_weight_parameters: NewWeightParameters,
     local_withings_repo: LocalWithingsRepository = Provide[
@@ -3,14 +3,31 @@ Middleware which adds a correlation id to the response headers and logs.
 https://github.com/snok/asgi-correlation-id/blob/main/README.md#integration-with-uvicorn
 """
 
+import copy
+import datetime as dt
+import json
 import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
 
 from asgi_correlation_id import CorrelationIdFilter
 from pydantic.v1.utils import deep_update
 from uvicorn.config import LOGGING_CONFIG
 
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.settings import LogFormat, Logging
+
 logging_format_prefix = "%(asctime)s [%(name)-14s]"
 
+dropped_logs_counter = registry.counter(
+    "logs_dropped_total",
+    "Number of log records dropped because too many were waiting to be written,"
+    " by level.",
+    labelnames=("level",),
+)
+
 
 def get_uvicorn_log_config() -> dict:
     """
@@ -35,15 +52,106 @@ def get_uvicorn_log_config() -> dict:
     )
 
 
-def configure_logging(sql_log_level: str):
+class JsonFormatter(logging.Formatter):
+    """
+    Formats the records as JSON objects, one per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "time": dt.datetime.fromtimestamp(
+                record.created, dt.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "correlation_id": getattr(record, "correlation_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            fields["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(fields)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands the records over to the writer thread, without waiting:
+    when the queue is full, the record is dropped and counted.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base handler, don't format the record here: the writer
+        # thread formats it, including its traceback. Only the message is merged
+        # with its arguments, which may change once the call returns.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_logs_counter.inc(level=record.levelname)
+
+
+class BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room in a full queue, rather than failing to stop.
+        self.queue.put(self._sentinel)
+
+
+def create_log_handlers(
+    logging_settings: Logging,
+    stream: TextIO | None = None,
+) -> tuple[BoundedQueueHandler, BoundedQueueListener]:
+    """
+    :return: the handler for the loggers, and the listener which writes
+        its records to the stream, stderr by default, once started.
+    """
+    queue_handler = BoundedQueueHandler(
+        queue.Queue(maxsize=logging_settings.queue_size)
+    )
+    # The correlation id is read in the context of the code which logs.
+    queue_handler.addFilter(CorrelationIdFilter())
+    console_handler = logging.StreamHandler(stream or sys.stderr)
+    if logging_settings.format == LogFormat.json:
+        console_handler.setFormatter(JsonFormatter())
+    else:
+        console_handler.setFormatter(
+            logging.Formatter(
+                logging_format_prefix
+                + " %(levelname)-9s [%(correlation_id)s] %(message)s"
+            )
+        )
+    return queue_handler, BoundedQueueListener(queue_handler.queue, console_handler)
+
+
+def configure_logging(logging_settings: Logging) -> BoundedQueueListener:
+    """
+    Send the logs to a background thread, which writes them: logging doesn't
+    block the event loop on the i/o of the console.
+
+    :return: the started listener, to stop with stop_logging.
+    """
     # This setup impacts the logs sent from our own code as well as logs from httpx.
-    console_handler = logging.StreamHandler()
-    console_handler.addFilter(CorrelationIdFilter())
-    logging.getLogger("sqlalchemy.engine").setLevel(getattr(logging, sql_log_level))
+    queue_handler, listener = create_log_handlers(logging_settings)
+    logging.getLogger("sqlalchemy.engine").setLevel(
+        getattr(logging, logging_settings.sql_log_level)
+    )
 
     logging.basicConfig(
-        handlers=[console_handler],
-        format=logging_format_prefix
-        + " %(levelname)-9s [%(correlation_id)s] %(message)s",
+        handlers=[queue_handler],
         level=logging.INFO,
     )
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: BoundedQueueListener):
+    """
+    Write the logs still queued, and stop the writer thread.
+    """
+    for handler in list(logging.root.handlers):
+        if isinstance(handler, BoundedQueueHandler) and handler.queue is listener.queue:
+            logging.root.removeHandler(handler)
+    listener.stop()
@@ -1,15 +1,20 @@
+import asyncio
 from asyncio import Task
 from contextlib import asynccontextmanager
 
 import uvicorn
 from asgi_correlation_id import CorrelationIdMiddleware
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response, status
+from openai import AsyncOpenAI
 from starlette.middleware import Middleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from slackhealthbot import logger
 from slackhealthbot.admin.setup import init_admin
 from slackhealthbot.containers import Container
+from slackhealthbot.core.exceptions import QueueFullException
+from slackhealthbot.core.jobqueue import JobQueue
+from slackhealthbot.core.tracing import FileSpanExporter, tracer
 from slackhealthbot.domain.usecases.fitbit.usecase_update_user_oauth import (
     UpdateTokenUseCase as FitbitUpdateTokenUseCase,
 )
@@ -24,39 +29,143 @@ from slackhealthbot.oauth import googleconfig as oauth_google
 from slackhealthbot.oauth import withingsconfig as oauth_withings
 from slackhealthbot.routers.fitbit import router as fitbit_router
 from slackhealthbot.routers.google import router as google_router
+from slackhealthbot.routers.metrics import HttpMetricsMiddleware
+from slackhealthbot.routers.metrics import router as metrics_router
 from slackhealthbot.routers.withings import router as withings_router
-from slackhealthbot.settings import Settings
-from slackhealthbot.tasks import fitbitpoll
+from slackhealthbot.settings import Metrics, Settings, Tracing
+from slackhealthbot.tasks import (
+    configreload,
+    eventlooplag,
+    fitbitpoll,
+    leaderelection,
+)
+from slackhealthbot.tasks.motivational_messages_task import (
+    pregenerate_motivational_messages,
+)
 from slackhealthbot.tasks.post_daily_activities_task import post_daily_activities
 
 
+async def cancel_tasks(*tasks: Task | None):
+    """
+    Cancel the tasks, and wait for them to complete.
+    """
+    started_tasks = [task for task in tasks if task]
+    for task in started_tasks:
+        task.cancel()
+    await asyncio.gather(*started_tasks, return_exceptions=True)
+
+
+def start_event_loop_lag_monitor(metrics_settings: Metrics) -> Task:
+    watchdog_settings = metrics_settings.event_loop_watchdog
+    return asyncio.create_task(
+        eventlooplag.monitor_event_loop_lag(
+            interval_s=metrics_settings.event_loop_lag_interval_s,
+            blocking_threshold_s=(
+                watchdog_settings.threshold_s if watchdog_settings.enabled else None
+            ),
+        )
+    )
+
+
+def start_tracing(tracing_settings: Tracing) -> Task:
+    exporter = FileSpanExporter(
+        path=tracing_settings.path,
+        trace_format=tracing_settings.format,
+        max_buffered_spans=tracing_settings.max_buffered_spans,
+    )
+    tracer.configure(exporter)
+    return asyncio.create_task(
+        exporter.flush_periodically(interval_s=tracing_settings.flush_interval_s)
+    )
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     settings: Settings = _app.container.settings.provided()
-    logger.configure_logging(settings.app_settings.logging.sql_log_level)
+    log_listener = logger.configure_logging(settings.app_settings.logging)
     oauth_withings.configure(WithingsUpdateTokenUseCase())
     oauth_fitbit.configure(FitbitUpdateTokenUseCase())
     oauth_google.configure(GoogleUpdateTokenUseCase())
-    schedule_task = None
-    if settings.app_settings.fitbit.poll.enabled:
-        schedule_task = await fitbitpoll.schedule_fitbit_poll(
+    job_queue: JobQueue = _app.container.job_queue()
+    job_queue.start()
+    openai_client: AsyncOpenAI | None = _app.container.openai_client()
+    scheduled_tasks: list[Task] = []
+    poll_settings = settings.app_settings.fitbit.poll
+
+    async def start_scheduled_tasks():
+        if poll_settings.enabled and not poll_settings.sharded:
+            scheduled_tasks.append(
+                await fitbitpoll.schedule_fitbit_poll(
+                    initial_delay_s=10,
+                )
+            )
+        activities_settings = settings.app_settings.fitbit.activities
+        daily_activity_type_ids = activities_settings.daily_activity_type_ids
+        if daily_activity_type_ids:
+            scheduled_tasks.append(
+                await post_daily_activities(
+                    activity_type_ids=set(daily_activity_type_ids),
+                    post_time=activities_settings.daily_report_time,
+                    lead_time_s=activities_settings.daily_report_lead_time_s,
+                    initial_delay_s=10,
+                )
+            )
+            # Without an api key, the reports use the local templates.
+            if settings.secret_settings.openai_api_key:
+                scheduled_tasks.append(
+                    await pregenerate_motivational_messages(
+                        activity_type_ids=set(daily_activity_type_ids),
+                        post_time=activities_settings.daily_report_time,
+                        initial_delay_s=10,
+                    )
+                )
+
+    async def stop_scheduled_tasks():
+        for scheduled_task in scheduled_tasks:
+            scheduled_task.cancel()
+        scheduled_tasks.clear()
+
+    # When running multiple processes, only the leader runs the scheduled tasks.
+    leader_election_task: Task | None = None
+    if settings.app_settings.leader_election.enabled:
+        leader_election_task = leaderelection.run_leader_election(
+            name="scheduled-tasks",
+            on_elected=start_scheduled_tasks,
+            on_demoted=stop_scheduled_tasks,
+        )
+    else:
+        await start_scheduled_tasks()
+    # A sharded poll runs in all the processes, each for a share of the users.
+    sharded_poll_task: Task | None = None
+    if poll_settings.enabled and poll_settings.sharded:
+        sharded_poll_task = await fitbitpoll.schedule_fitbit_poll(
             initial_delay_s=10,
         )
-    daily_activity_task: Task | None = None
-    daily_activity_type_ids = (
-        settings.app_settings.fitbit.activities.daily_activity_type_ids
-    )
-    if daily_activity_type_ids:
-        daily_activity_task = await post_daily_activities(
-            activity_type_ids=set(daily_activity_type_ids),
-            post_time=settings.app_settings.fitbit.activities.daily_report_time,
+    # Tasks which run in all the processes, until the app stops.
+    background_tasks: list[Task] = [
+        start_event_loop_lag_monitor(settings.app_settings.metrics)
+    ]
+    if settings.app_settings.tracing.enabled:
+        background_tasks.append(start_tracing(settings.app_settings.tracing))
+    if settings.app_settings.config_reload.enabled:
+        background_tasks.append(
+            asyncio.create_task(
+                configreload.watch_config(
+                    poll_interval_s=settings.app_settings.config_reload.poll_interval_s,
+                )
+            )
         )
     init_admin(_app)
     yield
-    if schedule_task:
-        schedule_task.cancel()
-    if daily_activity_task:
-        daily_activity_task.cancel()
+    await cancel_tasks(*background_tasks)
+    tracer.configure(None)
+    await cancel_tasks(leader_election_task)
+    await stop_scheduled_tasks()
+    await cancel_tasks(sharded_poll_task)
+    await job_queue.stop()
+    if openai_client:
+        await openai_client.close()
+    logger.stop_logging(log_listener)
 
 
 container = Container()
@@ -64,6 +173,7 @@ settings: Settings = container.settings.provided()
 app = FastAPI(
     middleware=[
         Middleware(CorrelationIdMiddleware),
+        Middleware(HttpMetricsMiddleware),
         Middleware(
             SessionMiddleware, secret_key=settings.secret_settings.session_secret_key
         ),
@@ -75,6 +185,16 @@ app.container = container
 app.include_router(withings_router)
 app.include_router(fitbit_router)
 app.include_router(google_router)
+app.include_router(metrics_router)
+
+
+@app.exception_handler(QueueFullException)
+def queue_full_exception_handler(_request: Request, exc: QueueFullException):
+    # Ask the provider to call the webhook again later.
+    return Response(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(exc.retry_after_s)},
+    )
 
 
 @app.head("/")
@@ -1,5 +1,33 @@
+from typing import Any, Callable, Coroutine
+
 from authlib.integrations.starlette_client import OAuth
 from starlette.config import Config
 
+from slackhealthbot.core.metrics import registry
+
 config = Config(".env")
 oauth = OAuth(Config(".env"))
+
+token_refreshes_counter = registry.counter(
+    "oauth_token_refreshes_total",
+    "Number of access tokens refreshed, by provider.",
+    labelnames=("provider",),
+)
+
+UpdateTokenCallback = Callable[..., Coroutine]
+
+
+def count_token_refreshes(
+    provider: str,
+    update_token_callback: UpdateTokenCallback,
+) -> UpdateTokenCallback:
+    """
+    :return: the update_token callback of the provider's oauth client,
+        counting the refreshed tokens.
+    """
+
+    async def update_token(token: dict[str, Any], **kwargs):
+        token_refreshes_counter.inc(provider=provider)
+        await update_token_callback(token, **kwargs)
+
+    return update_token
@@ -1,14 +1,14 @@
 import logging
 from typing import Any, Callable, Coroutine
 
-import httpx
 from authlib.integrations.httpx_client.oauth2_client import AsyncOAuth2Client
 from dependency_injector.wiring import Provide, inject
 from fastapi import status
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.exceptions import UserLoggedOutException
-from slackhealthbot.oauth.config import oauth
+from slackhealthbot.oauth.config import count_token_refreshes, oauth
+from slackhealthbot.oauth.retrytransport import create_transport
 from slackhealthbot.settings import Settings
 
 
@@ -51,14 +51,18 @@ def configure(
             "scope": " ".join(settings.fitbit_oauth_settings.oauth_scopes)
         },
         compliance_fix=fitbit_compliance_fix,
-        update_token=update_token_callback,
+        update_token=count_token_refreshes(
+            settings.fitbit_oauth_settings.name, update_token_callback
+        ),
         token_endpoint_auth_method="client_secret_basic",
         client_kwargs={
             "code_challenge_method": "S256",
             "is_auth_failure": is_auth_failure,
             "timeout": settings.app_settings.request_timeout_s,
-            "transport": httpx.AsyncHTTPTransport(
-                retries=settings.app_settings.request_retries
+            "transport": create_transport(
+                provider=settings.fitbit_oauth_settings.name,
+                policy=settings.app_settings.fitbit.retry,
+                settings=settings,
             ),
         },
     )
@@ -1,12 +1,12 @@
 import logging
 from typing import Any, Callable, Coroutine
 
-import httpx
 from dependency_injector.wiring import Provide, inject
 from fastapi import status
 
 from slackhealthbot.containers import Container
-from slackhealthbot.oauth.config import oauth
+from slackhealthbot.oauth.config import count_token_refreshes, oauth
+from slackhealthbot.oauth.retrytransport import create_transport
 from slackhealthbot.settings import Settings
 
 
@@ -29,8 +29,10 @@ def configure(
         client_kwargs={
             "scope": " ".join(settings.google_oauth_settings.oauth_scopes),
             "timeout": settings.app_settings.request_timeout_s,
-            "transport": httpx.AsyncHTTPTransport(
-                retries=settings.app_settings.request_retries
+            "transport": create_transport(
+                provider=settings.google_oauth_settings.name,
+                policy=settings.app_settings.google.retry,
+                settings=settings,
             ),
             "is_auth_failure": is_auth_failure,
         },
@@ -38,5 +40,7 @@ def configure(
             "access_type": "offline",
             "prompt": "select_account consent",
         },
-        update_token=update_token_callback,
+        update_token=count_token_refreshes(
+            settings.google_oauth_settings.name, update_token_callback
+        ),
     )
@@ -6,6 +6,7 @@ from authlib.integrations.starlette_client.apps import StarletteOAuth2App
 from slackhealthbot.core.exceptions import UserLoggedOutException
 from slackhealthbot.core.models import OAuthFields
 from slackhealthbot.oauth.config import oauth
+from slackhealthbot.oauth.retrytransport import IDEMPOTENT_EXTENSION
 
 
 def asdict(token: OAuthFields) -> dict[str, str]:
@@ -42,9 +43,12 @@ async def post(
     token: OAuthFields,
     url: str,
     data: dict[str, str] = None,
+    idempotent: bool = False,
 ) -> httpx.Response:
     """
     Execute a request, and retry with a refreshed access token if we get a 401.
+    :param idempotent: whether the request may be retried on server errors,
+        as for a GET request.
     :raises:
         UserLoggedOutException if the refresh token request fails
     """
@@ -53,6 +57,7 @@ async def post(
         url,
         data=data,
         token=asdict(token),
+        extensions={IDEMPOTENT_EXTENSION: idempotent},
     )
     if client.client_kwargs["is_auth_failure"](response):
         raise UserLoggedOutException
@@ -0,0 +1,180 @@
+import asyncio
+import datetime as dt
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+from fastapi import status
+
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import tracer
+from slackhealthbot.settings import Retry, Settings
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+
+# Request extension to mark a request as safe to retry, even if its http method
+# isn't idempotent. Ex: read-only queries sent with POST.
+IDEMPOTENT_EXTENSION = "idempotent"
+
+remote_request_duration_histogram = registry.histogram(
+    "remote_request_duration_seconds",
+    "Duration of each attempt of the requests to the remote services,"
+    " by provider and status code, or error if the request failed.",
+    labelnames=("provider", "status"),
+)
+remote_request_retries_counter = registry.counter(
+    "remote_request_retries_total",
+    "Number of requests to the remote services retried.",
+    labelnames=("provider",),
+)
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Retry requests which fail with a retryable http status code, with a jittered
+    exponential backoff, honouring the Retry-After response header.
+
+    Connection errors are retried by the wrapped transport.
+
+    Only idempotent requests are retried, except for 429 responses: the server
+    didn't process the request, so it is always safe to retry it.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        policy: Retry,
+        transport: httpx.AsyncBaseTransport,
+    ):
+        self.provider = provider
+        self.policy = policy
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with tracer.span(
+            f"remote {self.provider}",
+            method=request.method,
+            path=request.url.path,
+        ) as span:
+            response, attempt = await self._handle_with_retries(request)
+            if span is not None:
+                span.attributes["status"] = response.status_code
+                span.attributes["attempts"] = attempt
+            return response
+
+    async def _handle_with_retries(
+        self,
+        request: httpx.Request,
+    ) -> tuple[httpx.Response, int]:
+        """
+        :return: the last response, and the number of attempts.
+        """
+        deadline = time.monotonic() + self.policy.total_budget_s
+        attempt = 1
+        while True:
+            response = await self._send(request)
+            if attempt >= self.policy.max_attempts or not self._is_retryable(
+                request, response
+            ):
+                return response, attempt
+            delay_s = self._get_delay_s(attempt, response)
+            if time.monotonic() + delay_s > deadline:
+                logging.warning(
+                    f"{self.provider}: not retrying {request.method} {request.url.path}"
+                    f" after {response.status_code}: retry budget exceeded"
+                )
+                return response, attempt
+            logging.warning(
+                f"{self.provider}: retrying {request.method} {request.url.path}"
+                f" after {response.status_code} in {delay_s:.2f}s"
+                f" (attempt {attempt}/{self.policy.max_attempts})"
+            )
+            await response.aclose()
+            remote_request_retries_counter.inc(provider=self.provider)
+            await asyncio.sleep(delay_s)
+            attempt += 1
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        status_label = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            status_label = str(response.status_code)
+            return response
+        finally:
+            remote_request_duration_histogram.observe(
+                time.monotonic() - start,
+                provider=self.provider,
+                status=status_label,
+            )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    def _is_retryable(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+    ) -> bool:
+        if response.status_code not in self.policy.retry_status_codes:
+            return False
+        if response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            return True
+        return request.method in IDEMPOTENT_METHODS or request.extensions.get(
+            IDEMPOTENT_EXTENSION, False
+        )
+
+    def _get_delay_s(
+        self,
+        attempt: int,
+        response: httpx.Response,
+    ) -> float:
+        retry_after_s = parse_retry_after_s(response.headers.get("Retry-After"))
+        if retry_after_s is not None:
+            return retry_after_s
+        # "Full jitter" backoff:
+        # https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+        return random.uniform(
+            0,
+            min(
+                self.policy.backoff_max_s,
+                self.policy.backoff_base_s * 2 ** (attempt - 1),
+            ),
+        )
+
+
+def parse_retry_after_s(value: str | None) -> float | None:
+    """
+    :return: the delay in seconds from a Retry-After header value, which may be
+    either a number of seconds or an http date. None if the value is missing
+    or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (retry_date - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+def create_transport(
+    provider: str,
+    policy: Retry,
+    settings: Settings,
+) -> RetryTransport:
+    return RetryTransport(
+        provider=provider,
+        policy=policy,
+        transport=httpx.AsyncHTTPTransport(
+            retries=settings.app_settings.request_retries
+        ),
+    )
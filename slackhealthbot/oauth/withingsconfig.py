@@ -1,14 +1,14 @@
 import logging
 from typing import Any, Callable, Coroutine
 
-import httpx
 from authlib.common.urls import add_params_to_qs
 from authlib.integrations.httpx_client.oauth2_client import AsyncOAuth2Client
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.exceptions import UserLoggedOutException
-from slackhealthbot.oauth.config import oauth
+from slackhealthbot.oauth.config import count_token_refreshes, oauth
+from slackhealthbot.oauth.retrytransport import create_transport
 from slackhealthbot.settings import Settings
 
 ACCESS_TOKEN_EXTRA_PARAMS = {
@@ -66,13 +66,17 @@ def configure(
             "scope": ",".join(settings.withings_oauth_settings.oauth_scopes)
         },
         compliance_fix=withings_compliance_fix,
-        update_token=update_token_callback,
+        update_token=count_token_refreshes(
+            settings.withings_oauth_settings.name, update_token_callback
+        ),
         token_endpoint_auth_method="client_secret_post",
         client_kwargs={
             "is_auth_failure": is_auth_failure,
             "timeout": settings.app_settings.request_timeout_s,
-            "transport": httpx.AsyncHTTPTransport(
-                retries=settings.app_settings.request_retries
+            "transport": create_transport(
+                provider=settings.withings_oauth_settings.name,
+                policy=settings.app_settings.withings.retry,
+                settings=settings,
             ),
         },
     )
@@ -1,5 +1,6 @@
 import httpx
 
+from slackhealthbot.oauth.retrytransport import create_transport
 from slackhealthbot.settings import Settings
 
 
@@ -9,8 +10,10 @@ async def post_message(
 ):
     async with httpx.AsyncClient(
         timeout=settings.app_settings.request_timeout_s,
-        transport=httpx.AsyncHTTPTransport(
-            retries=settings.app_settings.request_retries
+        transport=create_transport(
+            provider="slack",
+            policy=settings.app_settings.slack.retry,
+            settings=settings,
         ),
     ) as client:
         await client.post(
@@ -27,6 +27,7 @@ async def get_last_weight_kg(
             "startdate": startdate,
             "enddate": enddate,
         },
+        idempotent=True,
     )
     response_data = response.json()["body"]
     measuregrps = response_data["measuregrps"]
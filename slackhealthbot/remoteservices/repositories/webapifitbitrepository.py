@@ -2,6 +2,7 @@ import datetime
 import logging
 
 from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.ttlcache import MISSING, TTLCache
 from slackhealthbot.domain.models.activity import (
     ActivityData,
     ActivityZone,
@@ -21,9 +22,10 @@ from slackhealthbot.settings import Settings
 
 
 class WebApiFitbitRepository(RemoteFitbitRepository):
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, response_cache: TTLCache):
         super().__init__()
         self.settings = settings
+        self.response_cache = response_cache
 
     async def subscribe(
         self,
@@ -36,22 +38,39 @@ class WebApiFitbitRepository(RemoteFitbitRepository):
         oauth_fields: OAuthFields,
         when: datetime.date,
     ) -> SleepData | None:
+        # Fitbit often calls the webhook multiple times for the same event.
+        cache_key = ("fitbit", "sleep", oauth_fields.oauth_userid, when)
+        cached_sleep = self.response_cache.get(cache_key, default=MISSING)
+        if cached_sleep is not MISSING:
+            return cached_sleep
         sleep: FitbitSleep = await sleepapi.get_sleep(
             oauth_token=oauth_fields,
             when=when,
             settings=self.settings,
         )
-        return remote_service_sleep_to_domain_sleep(sleep) if sleep else None
+        sleep_data = remote_service_sleep_to_domain_sleep(sleep) if sleep else None
+        # Don't cache a missing sleep: fitbit may not have processed it yet.
+        if sleep_data:
+            self.response_cache.put(cache_key, sleep_data)
+        return sleep_data
 
     async def get_activities_for_date(
         self, oauth_fields: OAuthFields, when: datetime.date
     ) -> list[tuple[str, ActivityData]]:
+        cache_key = ("fitbit", "activities", oauth_fields.oauth_userid, when)
+        cached_activities = self.response_cache.get(cache_key, default=MISSING)
+        if cached_activities is not MISSING:
+            return list(cached_activities)
         activities: FitbitActivities | None = await activityapi.get_activities_for_date(
             oauth_token=oauth_fields,
             when=when,
             settings=self.settings,
         )
-        return remote_service_activities_to_domain_activities(activities)
+        activities_data = remote_service_activities_to_domain_activities(activities)
+        # Don't cache missing activities: fitbit may not have processed them yet.
+        if activities_data:
+            self.response_cache.put(cache_key, tuple(activities_data))
+        return activities_data
 
     def parse_oauth_fields(
         self,
@@ -1,6 +1,7 @@
 import datetime
 
 from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.ttlcache import MISSING, TTLCache
 from slackhealthbot.domain.remoterepository.remotewithingsrepository import (
     RemoteWithingsRepository,
 )
@@ -9,9 +10,10 @@ from slackhealthbot.settings import Settings
 
 
 class WebApiWithingsRepository(RemoteWithingsRepository):
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, response_cache: TTLCache):
         super().__init__()
         self.settings = settings
+        self.response_cache = response_cache
 
     async def subscribe(
         self,
@@ -25,12 +27,22 @@ class WebApiWithingsRepository(RemoteWithingsRepository):
         startdate: int,
         enddate: int,
     ) -> float | None:
-        return await weightapi.get_last_weight_kg(
+        # A cached weight is only valid if it was fetched for a notification at
+        # least as recent as this one.
+        cache_key = ("withings", "weight", oauth_fields.oauth_userid, startdate)
+        cached_weight_kg = self.response_cache.get(
+            cache_key, min_version=enddate, default=MISSING
+        )
+        if cached_weight_kg is not MISSING:
+            return cached_weight_kg
+        weight_kg = await weightapi.get_last_weight_kg(
             oauth_token=oauth_fields,
             startdate=startdate,
             enddate=enddate,
             settings=self.settings,
         )
+        self.response_cache.put(cache_key, weight_kg, version=enddate)
+        return weight_kg
 
     def parse_oauth_fields(
         self,
@@ -1,3 +1,4 @@
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.remoterepository.remoteslackrepository import (
     RemoteSlackRepository,
 )
@@ -10,5 +11,6 @@ class WebhookSlackRepository(RemoteSlackRepository):
         super().__init__()
         self.settings = settings
 
+    @traced("slack.post_message")
     async def post_message(self, message: str):
         await messageapi.post_message(message, self.settings)
@@ -1,8 +1,13 @@
+import asyncio
 import logging
+import time
 
-from openai import AsyncOpenAI, OpenAIError
-from openai.types.responses import Response
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAIError
+from openai.types.responses import ResponseUsage
 
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import traced
 from slackhealthbot.domain.remoterepository.remoteopenairepository import (
     RemoteOpenAiRepository,
 )
@@ -10,36 +15,106 @@ from slackhealthbot.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+requests_counter = registry.counter(
+    "openai_requests_total",
+    "Number of openai requests, by outcome: success, truncated or failure.",
+    labelnames=("outcome",),
+)
+request_duration_counter = registry.counter(
+    "openai_request_duration_seconds_total",
+    "Total duration of the openai requests, by outcome.",
+    labelnames=("outcome",),
+)
+last_request_duration_gauge = registry.gauge(
+    "openai_last_request_duration_seconds",
+    "Duration of the last openai request.",
+)
+tokens_counter = registry.counter(
+    "openai_tokens_total",
+    "Number of tokens used by the openai requests, by kind: input or output.",
+    labelnames=("kind",),
+)
+
+
+def create_openai_client(settings: Settings) -> AsyncOpenAI | None:
+    """
+    :return: the client shared by all the openai requests, with its pool
+        of connections, or None if openai_api_key hasn't been configured.
+    """
+    api_key = settings.secret_settings.openai_api_key
+    if api_key is None:
+        return None
+    openai_settings = settings.app_settings.openai
+    return AsyncOpenAI(
+        api_key=api_key,
+        timeout=openai_settings.latency_budget_s,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=openai_settings.max_connections,
+                max_keepalive_connections=openai_settings.max_keepalive_connections,
+            ),
+        ),
+    )
+
 
 class WebOpenAiRepository(RemoteOpenAiRepository):
     def __init__(
         self,
         settings: Settings,
+        client: AsyncOpenAI | None,
     ):
         super().__init__()
-        self.api_key = settings.secret_settings.openai_api_key
+        self.client = client
         self.model_name = settings.app_settings.openai.model
+        self.latency_budget_s = settings.app_settings.openai.latency_budget_s
 
+    @traced("openai.create_response")
     async def create_response(self, prompt: str) -> str | None:
         """
+        The response is streamed: if it isn't complete within the latency
+        budget, the text received so far is returned.
+
         :return: a response for the given prompt,
             None if openai_api_key hasn't been configured,
             None if the openai client returned an error.
         """
-        if self.api_key is None:
+        if self.client is None:
             return None
 
-        client = AsyncOpenAI(
-            api_key=self.api_key,
-        )
+        start = time.monotonic()
+        deltas: list[str] = []
+        outcome = "failure"
         try:
-            response = await client.responses.create(
-                model=self.model_name,
-                input=prompt,
-            )
-
-            if isinstance(response, Response) and response.output:
-                return response.output_text
+            async with asyncio.timeout(self.latency_budget_s):
+                stream = await self.client.responses.create(
+                    model=self.model_name,
+                    input=prompt,
+                    stream=True,
+                )
+                async with stream:
+                    async for event in stream:
+                        if event.type == "response.output_text.delta":
+                            deltas.append(event.delta)
+                        elif event.type == "response.completed":
+                            self._record_usage(event.response.usage)
+            outcome = "success"
+        except TimeoutError:
+            logger.warning(f"OpenAi response cut off after {self.latency_budget_s}s")
+            outcome = "truncated"
         except OpenAIError as e:
             logger.warning(f"Error from OpenAi when trying to create response: {e}")
-        return None
+        finally:
+            duration_s = time.monotonic() - start
+            requests_counter.inc(outcome=outcome)
+            request_duration_counter.inc(duration_s, outcome=outcome)
+            last_request_duration_gauge.set(duration_s)
+        if outcome == "failure":
+            return None
+        return "".join(deltas).strip() or None
+
+    @staticmethod
+    def _record_usage(usage: ResponseUsage | None):
+        if usage is None:
+            return
+        tokens_counter.inc(usage.input_tokens, kind="input")
+        tokens_counter.inc(usage.output_tokens, kind="output")
@@ -1,13 +1,18 @@
 import datetime
 import logging
-from asyncio import Lock
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Request, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.exceptions import UnknownUserException, UserLoggedOutException
+from slackhealthbot.core.jobqueue import JobQueue, job_handler
+from slackhealthbot.data.database.connection import session_scope
+from slackhealthbot.domain.localrepository.localdeduperepository import (
+    LocalDedupeRepository,
+)
 from slackhealthbot.domain.models.users import FitbitUserLookup
 from slackhealthbot.domain.usecases.fitbit import (
     usecase_login_user,
@@ -76,66 +81,124 @@ class FitbitNotification(BaseModel):
     subscriptionId: str | None = None
 
 
-last_processed_fitbit_notification_per_user: dict[str, datetime.datetime] = {}
-last_processed_fitbit_notification_lock = Lock()
-
+JOB_KIND = "fitbit"
+DEDUPE_NAMESPACE = "fitbit"
 DEBOUNCE_NOTIFICATION_DELAY_S = 10
 
 
-def _is_fitbit_notification_processed(notification: FitbitNotification):
+async def _claim_fitbit_notification(
+    notification: FitbitNotification,
+    dedupe_repo: LocalDedupeRepository,
+) -> str | None:
+    """
+    :return: the claimed dedupe value, or None if the notification is a duplicate.
+    """
     # Fitbit often calls multiple times for the same event.
     # Ignore this notification if we just processed one recently.
     now = datetime.datetime.now()
-    last_fitbit_notification_datetime = last_processed_fitbit_notification_per_user.get(
-        notification.ownerId
-    )
-    already_processed = (
-        last_fitbit_notification_datetime
-        and (now - last_fitbit_notification_datetime).seconds
-        < DEBOUNCE_NOTIFICATION_DELAY_S
+
+    def is_duplicate(last_fitbit_notification: str) -> bool:
+        last_fitbit_notification_datetime = datetime.datetime.fromisoformat(
+            last_fitbit_notification
+        )
+        return (
+            now - last_fitbit_notification_datetime
+        ).seconds < DEBOUNCE_NOTIFICATION_DELAY_S
+
+    claimed = await dedupe_repo.claim(
+        namespace=DEDUPE_NAMESPACE,
+        key=notification.ownerId,
+        value=now.isoformat(),
+        ttl=datetime.timedelta(seconds=DEBOUNCE_NOTIFICATION_DELAY_S),
+        is_duplicate=is_duplicate,
     )
-    return already_processed
+    return now.isoformat() if claimed else None
 
 
-def _mark_fitbit_notification_processed(notification: FitbitNotification):
-    now = datetime.datetime.now()
-    last_processed_fitbit_notification_per_user[notification.ownerId] = now
+@job_handler(JOB_KIND)
+@inject
+async def _process_user_notifications(
+    payload: dict,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+):
+    """
+    Process the notifications of a single user, in order.
+
+    The job queue guarantees that this isn't executed concurrently
+    for the same user.
+    """
+    notifications = [
+        FitbitNotification.model_validate(notification)
+        for notification in payload["notifications"]
+    ]
+    async with session_scope(session_factory):
+        await _process_user_notifications_in_session(notifications)
+
+
+@inject
+async def _process_user_notifications_in_session(
+    notifications: list[FitbitNotification],
+    dedupe_repo: LocalDedupeRepository = Provide[Container.dedupe_repository],
+):
+    for notification in notifications:
+        dedupe_value = await _claim_fitbit_notification(notification, dedupe_repo)
+        if not dedupe_value:
+            logging.info("fitbit_notification_webhook: skipping duplicate notification")
+            continue
+
+        processed = False
+        try:
+            if notification.collectionType == "sleep":
+                new_sleep_data = await usecase_process_new_sleep.do(
+                    user_lookup=FitbitUserLookup(user_id=notification.ownerId),
+                    when=notification.date,
+                )
+                processed = bool(new_sleep_data)
+            elif notification.collectionType == "activities":
+                activity_history = await usecase_process_new_activity.do(
+                    user_lookup=FitbitUserLookup(user_id=notification.ownerId),
+                    when=notification.date or datetime.date.today(),
+                )
+                processed = bool(activity_history)
+        except UserLoggedOutException:
+            await usecase_post_user_logged_out.do(
+                FitbitUserLookup(user_id=notification.ownerId),
+            )
+            break
+        except UnknownUserException:
+            logging.info("fitbit_notification_webhook: unknown user")
+            break
+        finally:
+            if not processed:
+                # No new data, or an error: let the next notification be processed.
+                await dedupe_repo.release(
+                    namespace=DEDUPE_NAMESPACE,
+                    key=notification.ownerId,
+                    value=dedupe_value,
+                )
 
 
 @router.post("/fitbit-notification-webhook/")
+@inject
 async def fitbit_notification_webhook(
     notifications: list[FitbitNotification],
+    job_queue: JobQueue = Depends(Provide[Container.job_queue]),
 ):
     logging.info(f"fitbit_notification_webhook: {notifications}")
+    # Fitbit expects a response within a few seconds: process the notifications
+    # in the background.
+    notifications_per_user: dict[str, list[FitbitNotification]] = {}
     for notification in notifications:
-        async with last_processed_fitbit_notification_lock:
-            if _is_fitbit_notification_processed(notification):
-                logging.info(
-                    "fitbit_notificaiton_webhook: skipping duplicate notification"
-                )
-                continue
-
-            try:
-                if notification.collectionType == "sleep":
-                    new_sleep_data = await usecase_process_new_sleep.do(
-                        user_lookup=FitbitUserLookup(user_id=notification.ownerId),
-                        when=notification.date,
-                    )
-                    if new_sleep_data:
-                        _mark_fitbit_notification_processed(notification)
-                elif notification.collectionType == "activities":
-                    activity_history = await usecase_process_new_activity.do(
-                        user_lookup=FitbitUserLookup(user_id=notification.ownerId),
-                        when=notification.date or datetime.date.today(),
-                    )
-                    if activity_history:
-                        _mark_fitbit_notification_processed(notification)
-            except UserLoggedOutException:
-                await usecase_post_user_logged_out.do(
-                    FitbitUserLookup(user_id=notification.ownerId),
-                )
-                break
-            except UnknownUserException:
-                logging.info("fitbit_notification_webhook: unknown user")
-                return Response(status_code=status.HTTP_404_NOT_FOUND)
+        notifications_per_user.setdefault(notification.ownerId, []).append(notification)
+    for owner_id, user_notifications in notifications_per_user.items():
+        await job_queue.enqueue(
+            kind=JOB_KIND,
+            key=owner_id,
+            payload={
+                "notifications": [
+                    notification.model_dump(mode="json")
+                    for notification in user_notifications
+                ]
+            },
+        )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -6,7 +6,6 @@ from typing import Annotated, Literal
 from dependency_injector.wiring import Provide, inject
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
     HTTPException,
     Request,
@@ -15,8 +14,11 @@ from fastapi import (
 )
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, ConfigDict
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.jobqueue import JobQueue, job_handler
+from slackhealthbot.data.database.connection import session_scope
 from slackhealthbot.domain.models.users import HealthUserLookup
 from slackhealthbot.domain.usecases.google import (
     usecase_login_user,
@@ -125,13 +127,38 @@ async def google_oauth_webhook(
     )
 
 
+JOB_KIND = "google"
+
+
+def _merge_jobs(payload: dict, other_payload: dict) -> dict:
+    return {
+        **payload,
+        "dates": sorted(set(payload["dates"]) | set(other_payload["dates"])),
+    }
+
+
+@job_handler(JOB_KIND, merge=_merge_jobs)
+@inject
+async def _process_new_data(
+    payload: dict,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+):
+    async with session_scope(session_factory):
+        await usecase_process_new_data.do(
+            usecase_process_new_data.DataType[payload["data_type"]],
+            HealthUserLookup(user_id=payload["health_user_id"]),
+            {dt.date.fromisoformat(date) for date in payload["dates"]},
+        )
+
+
 @router.post("/google-notification-webhook/")
 @inject
 async def google_notification_webhook(
     notification: Notification,
-    background_tasks: BackgroundTasks,
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     secret_settings: SecretSettings = Depends(Provide[Container.secret_settings]),
+    settings: Settings = Depends(Provide[Container.settings]),
+    job_queue: JobQueue = Depends(Provide[Container.job_queue]),
 ):
     """
     https://developers.google.com/health/webhooks
@@ -168,22 +195,33 @@ async def google_notification_webhook(
     ):
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-    # Fetch the data for this notification in a background task, so
+    data_type = (
+        usecase_process_new_data.DataType.SLEEP
+        if data_notification.data.dataType == NotificationDataType.sleep
+        # If it's not sleep, it's either distance or exercise google data types.
+        # Changes to distance require refreshing exercise data.
+        else usecase_process_new_data.DataType.EXERCISE
+    )
+    health_user_id = data_notification.data.healthUserId
+
+    # Fetch the data for this notification in a background job, so
     # we can return the http response immediately.
     # https://developers.google.com/health/webhooks#respond_to_a_notification
-    background_tasks.add_task(
-        usecase_process_new_data.do,
-        data_type=(
-            usecase_process_new_data.DataType.SLEEP
-            if data_notification.data.dataType == NotificationDataType.sleep
-            # If it's not sleep, it's either distance or exercise google data types.
-            # Changes to distance require refreshing exercise data.
-            else usecase_process_new_data.DataType.EXERCISE
-        ),
-        user_lookup=HealthUserLookup(user_id=data_notification.data.healthUserId),
-        dates={
-            x.civilIso8601TimeInterval.startTime.date()
-            for x in data_notification.data.intervals
+    # Notifications for the same user and data type arriving shortly after
+    # this one are merged into a single fetch.
+    await job_queue.enqueue(
+        kind=JOB_KIND,
+        key=f"{health_user_id}:{data_type.name}",
+        payload={
+            "data_type": data_type.name,
+            "health_user_id": health_user_id,
+            "dates": sorted(
+                {
+                    x.civilIso8601TimeInterval.startTime.date().isoformat()
+                    for x in data_notification.data.intervals
+                }
+            ),
         },
+        coalesce_window_s=settings.app_settings.google.coalescing_window_s,
     )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
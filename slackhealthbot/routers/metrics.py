@@ -0,0 +1,92 @@
+import time
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from slackhealthbot.admin.auth import verify_credentials
+from slackhealthbot.containers import Container
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.tracing import tracer
+from slackhealthbot.settings import Settings
+
+router = APIRouter()
+
+http_request_duration_histogram = registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of the http requests, by method, route and status code.",
+    labelnames=("method", "route", "status"),
+)
+
+basic_auth = HTTPBasic(auto_error=False)
+
+
+@router.get("/metrics")
+@inject
+def get_metrics(
+    request: Request,
+    credentials: HTTPBasicCredentials | None = Depends(basic_auth),
+    settings: Settings = Provide[Container.settings],
+):
+    """
+    The metrics in the Prometheus text format, for the admin: either logged in
+    to the admin interface, or with the admin credentials in basic auth.
+
+    This endpoint isn't async: checking the password hash takes a while,
+    and mustn't block the event loop.
+    """
+    if not request.session.get("admin", False) and not (
+        credentials
+        and verify_credentials(credentials.username, credentials.password, settings)
+    ):
+        return Response(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+class HttpMetricsMiddleware:
+    """
+    Record the duration of the http requests, and the root span of their trace.
+
+    The requests are labelled with the path template of their route, not their
+    actual path: the slack aliases or ids in the paths would create a series
+    per user. The requests which don't match a route of the app, including
+    the pages of the admin interface, are labelled "other".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.monotonic()
+        with tracer.span(f"http {scope['method']}") as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # The router sets the matched route in the scope.
+                route = getattr(scope.get("route"), "path", "other")
+                http_request_duration_histogram.observe(
+                    time.monotonic() - start,
+                    method=scope["method"],
+                    route=route,
+                    status=str(status_code),
+                )
+                if span is not None:
+                    span.attributes.update(route=route, status=status_code)
@@ -1,12 +1,18 @@
+import datetime
 import logging
-from asyncio import Lock
 
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from slackhealthbot.containers import Container
 from slackhealthbot.core.exceptions import UnknownUserException, UserLoggedOutException
+from slackhealthbot.core.jobqueue import JobQueue, job_handler
+from slackhealthbot.data.database.connection import session_scope
+from slackhealthbot.domain.localrepository.localdeduperepository import (
+    LocalDedupeRepository,
+)
 from slackhealthbot.domain.usecases.withings import (
     usecase_login_user,
     usecase_post_user_logged_out,
@@ -67,8 +73,9 @@ async def get_withings_authorization(
     )
 
 
-last_processed_withings_notification_per_user = {}
-last_processed_withings_notification_lock = Lock()
+JOB_KIND = "withings"
+DEDUPE_NAMESPACE = "withings"
+DEDUPE_TTL = datetime.timedelta(days=1)
 
 
 class WithingsNotification(BaseModel):
@@ -81,40 +88,75 @@ async def parse_notification(request: Request):
     return WithingsNotification(**(await request.form()))
 
 
+@job_handler(JOB_KIND)
+@inject
+async def _process_notification(
+    payload: dict,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+):
+    """
+    The job queue guarantees that this isn't executed concurrently
+    for the same user.
+    """
+    async with session_scope(session_factory):
+        await _process_notification_in_session(
+            WithingsNotification.model_validate(payload)
+        )
+
+
+@inject
+async def _process_notification_in_session(
+    notification: WithingsNotification,
+    dedupe_repo: LocalDedupeRepository = Provide[Container.dedupe_repository],
+):
+    notification_dates = f"{notification.startdate}:{notification.enddate}"
+    if not await dedupe_repo.claim(
+        namespace=DEDUPE_NAMESPACE,
+        key=notification.userid,
+        value=notification_dates,
+        ttl=DEDUPE_TTL,
+    ):
+        logging.info("Ignoring duplicate withings notification")
+        return
+    processed = False
+    try:
+        await usecase_process_new_weight.do(
+            new_weight_parameters=NewWeightParameters(
+                withings_userid=notification.userid,
+                startdate=notification.startdate,
+                enddate=notification.enddate,
+            ),
+        )
+        processed = True
+    except UserLoggedOutException:
+        await usecase_post_user_logged_out.do(
+            withings_userid=notification.userid,
+        )
+    except UnknownUserException:
+        logging.info("withings_notification_webhook: unknown user")
+    finally:
+        if not processed:
+            # Let the notification be processed again if withings resends it.
+            await dedupe_repo.release(
+                namespace=DEDUPE_NAMESPACE,
+                key=notification.userid,
+                value=notification_dates,
+            )
+
+
 @router.post("/withings-notification-webhook/")
+@inject
 async def withings_notification_webhook(
     notification: WithingsNotification = Depends(parse_notification),
+    job_queue: JobQueue = Depends(Provide[Container.job_queue]),
 ):
     logging.info(
         "withings_notification_webhook: "
         + f"userid={notification.userid}, startdate={notification.startdate}, enddate={notification.enddate}"
     )
-    async with last_processed_withings_notification_lock:
-        if last_processed_withings_notification_per_user.get(
-            notification.userid, None
-        ) != (
-            notification.startdate,
-            notification.enddate,
-        ):
-            try:
-                await usecase_process_new_weight.do(
-                    new_weight_parameters=NewWeightParameters(
-                        withings_userid=notification.userid,
-                        startdate=notification.startdate,
-                        enddate=notification.enddate,
-                    ),
-                )
-                last_processed_withings_notification_per_user[notification.userid] = (
-                    notification.startdate,
-                    notification.enddate,
-                )
-            except UserLoggedOutException:
-                await usecase_post_user_logged_out.do(
-                    withings_userid=notification.userid,
-                )
-            except UnknownUserException:
-                logging.info("withings_notification_webhook: unknown user")
-                return Response(status_code=status.HTTP_404_NOT_FOUND)
-        else:
-            logging.info("Ignoring duplicate withings notification")
+    await job_queue.enqueue(
+        kind=JOB_KIND,
+        key=notification.userid,
+        payload=notification.model_dump(mode="json"),
+    )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
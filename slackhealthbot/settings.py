@@ -4,19 +4,25 @@ import enum
 import os
 import random
 import string
-from copy import deepcopy
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional, Self
 
 import yaml
-from pydantic import AnyHttpUrl, BaseModel, HttpUrl
+from pydantic import (
+    AnyHttpUrl,
+    BaseModel,
+    ConfigDict,
+    HttpUrl,
+    PrivateAttr,
+    model_validator,
+)
 from pydantic.v1.utils import deep_update
 from pydantic_settings import (
     BaseSettings,
+    InitSettingsSource,
     PydanticBaseSettingsSource,
     SettingsConfigDict,
-    YamlConfigSettingsSource,
 )
 
 
@@ -46,9 +52,24 @@ class GoogleOAuthSettings:
     redirect_uri: str
 
 
+class Retry(BaseModel):
+    max_attempts: int = 3
+    backoff_base_s: float = 0.5
+    backoff_max_s: float = 8.0
+    total_budget_s: float = 15.0
+    retry_status_codes: list[int] = [429, 500, 502, 503, 504]
+
+
+class Workers(BaseModel):
+    worker_count: int = 4
+    max_queue_size: int = 0
+    retry_after_s: int = 30
+
+
 class Poll(BaseModel):
     enabled: bool = True
     interval_seconds: int = 3600
+    sharded: bool = False
 
 
 class ReportField(enum.StrEnum):
@@ -63,6 +84,7 @@ class ReportField(enum.StrEnum):
 
 
 class Goals(BaseModel):
+    model_config = ConfigDict(frozen=True)
     distance_km: float | None = None
 
 
@@ -72,27 +94,35 @@ class StreakMode(enum.StrEnum):
 
 
 class Streak(BaseModel):
+    model_config = ConfigDict(frozen=True)
     mode: StreakMode = StreakMode.strict
     secondary_activity_type_id: int | None = None
 
 
 class Report(BaseModel):
+    # Immutable, so that the compiled reports can be shared.
+    model_config = ConfigDict(frozen=True)
     daily: bool
     realtime: bool
-    fields: Optional[list[ReportField]] = None
+    fields: Optional[tuple[ReportField, ...]] = None
     daily_goals: Goals | None = None
     streak: Streak = Streak()
     ai_motivational_message_frequency_days: int = 10
 
 
 class ActivityType(BaseModel):
+    model_config = ConfigDict(frozen=True)
     name: str
     id: int
     report: Report | None = None
 
 
 class Activities(BaseModel):
+    # The activity types are compiled again when they're assigned.
+    model_config = ConfigDict(validate_assignment=True)
     daily_report_time: dt.time = dt.time(hour=23, second=50)
+    daily_report_concurrency: int = 8
+    daily_report_lead_time_s: float = 600
     history_days: int = 180
     activity_types: list[ActivityType]
     default_report: Report = Report(
@@ -100,13 +130,40 @@ class Activities(BaseModel):
         realtime=True,
         fields=[x for x in ReportField],
     )
+    _activity_types_by_id: Mapping[int, ActivityType] = PrivateAttr()
+    _reports_by_id: Mapping[int, Report] = PrivateAttr()
+    _daily_activity_type_ids: tuple[int, ...] = PrivateAttr()
 
-    def get_activity_type(self, id: int) -> ActivityType | None:
-        return next((x for x in self.activity_types if x.id == id), None)
+    @model_validator(mode="after")
+    def _compile(self) -> Self:
+        """
+        Index the activity types and their reports by id, with the reports
+        already merged with the default report, so that the lookups done for
+        each activity don't scan or copy the configuration.
+        """
+        activity_types_by_id: dict[int, ActivityType] = {}
+        for activity_type in self.activity_types:
+            # Like a scan of the list, the first activity type with an id wins.
+            activity_types_by_id.setdefault(activity_type.id, activity_type)
+        self._activity_types_by_id = MappingProxyType(activity_types_by_id)
+        self._reports_by_id = MappingProxyType(
+            {
+                activity_type_id: self._merge_default_report(activity_type.report)
+                for activity_type_id, activity_type in activity_types_by_id.items()
+            }
+        )
+        self._daily_activity_type_ids = tuple(
+            x.id
+            for x in self.activity_types
+            if (
+                (x.report and x.report.daily)
+                or (x.report is None and self.default_report.daily)
+            )
+        )
+        return self
 
-    def get_report(self, activity_type_id: int) -> Report | None:
+    def _merge_default_report(self, report: Report | None) -> Report:
         """
-        Get the report configuration for the given activity type.
         If the activity type doesn't have an explicit report configuration,
         fallback to the default report configuration.
 
@@ -114,45 +171,51 @@ class Activities(BaseModel):
         fill them in with the default report configuration. This applies to the
         following attributes:
         - fields
-
-        :return None: If the activity type id is unknown
         """
-        activity_type = self.get_activity_type(id=activity_type_id)
-        if not activity_type:
-            return None
-
-        if activity_type.report is None:
+        if report is None:
             return self.default_report
-
-        report = deepcopy(activity_type.report)
         if not report.fields:
-            report.fields = self.default_report.fields
-
+            return report.model_copy(update={"fields": self.default_report.fields})
         return report
 
+    def get_activity_type(self, id: int) -> ActivityType | None:
+        return self._activity_types_by_id.get(id)
+
+    def get_report(self, activity_type_id: int) -> Report | None:
+        """
+        Get the report configuration for the given activity type, merged with
+        the default report configuration.
+
+        :return None: If the activity type id is unknown
+        """
+        return self._reports_by_id.get(activity_type_id)
+
     @property
-    def daily_activity_type_ids(self) -> list[int]:
-        return [
-            x.id
-            for x in self.activity_types
-            if (
-                (x.report and x.report.daily)
-                or (x.report is None and self.default_report.daily)
-            )
-        ]
+    def daily_activity_type_ids(self) -> tuple[int, ...]:
+        return self._daily_activity_type_ids
+
+
+class UserCache(BaseModel):
+    ttl_s: float = 30.0
+    max_entries: int = 1024
 
 
 class Fitbit(BaseModel):
     poll: Poll
     activities: Activities
+    user_cache: UserCache = UserCache()
     base_url: str = "https://api.fitbit.com/"
     oauth_scopes: list[str] = ["sleep", "activity"]
+    retry: Retry = Retry()
+    workers: Workers = Workers()
 
 
 class Withings(BaseModel):
     callback_url: AnyHttpUrl
     base_url: str = "https://wbsapi.withings.net/"
     oauth_scopes: list[str] = ["user.metrics", "user.activity"]
+    retry: Retry = Retry()
+    workers: Workers = Workers()
 
 
 class Google(BaseModel):
@@ -164,14 +227,105 @@ class Google(BaseModel):
         "https://www.googleapis.com/auth/googlehealth.activity_and_fitness",
         "https://www.googleapis.com/auth/googlehealth.sleep",
     ]
+    retry: Retry = Retry()
+    coalescing_window_s: float = 5.0
+    workers: Workers = Workers(max_queue_size=100)
+
+
+class Slack(BaseModel):
+    retry: Retry = Retry()
+
+
+class MotivationalMessages(BaseModel):
+    pregeneration_interval_s: float = 3600.0
+    ttl_s: float = 172800.0
+    timeout_s: float = 120.0
 
 
 class OpenAi(BaseModel):
     model: str
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    latency_budget_s: float = 60.0
+    motivational_messages: MotivationalMessages = MotivationalMessages()
+
+
+class ResponseCache(BaseModel):
+    ttl_s: float = 5.0
+    max_entries: int = 256
+
+
+class StorageBackend(enum.StrEnum):
+    memory = enum.auto()
+    database = enum.auto()
+
+
+class Dedupe(BaseModel):
+    backend: StorageBackend = StorageBackend.memory
+    max_entries: int = 10000
+
+
+class InboundQueue(BaseModel):
+    backend: StorageBackend = StorageBackend.database
+    worker_count: int = 4
+    poll_interval_s: float = 1.0
+    visibility_timeout_s: float = 300.0
+    max_attempts: int = 5
+    retry_backoff_s: float = 10.0
+    max_pending_jobs: int = 0
+    retry_after_s: int = 30
+
+
+class LeaderElection(BaseModel):
+    enabled: bool = False
+    lease_ttl_s: float = 30.0
+    heartbeat_interval_s: float = 10.0
+
+
+class ConfigReload(BaseModel):
+    enabled: bool = False
+    poll_interval_s: float = 10.0
+
+
+class EventLoopWatchdog(BaseModel):
+    enabled: bool = False
+    threshold_s: float = 0.25
+
+
+class Metrics(BaseModel):
+    event_loop_lag_interval_s: float = 1.0
+    event_loop_watchdog: EventLoopWatchdog = EventLoopWatchdog()
+    slow_statement_threshold_s: float = 0.1
+    max_slow_statements: int = 50
+
+
+class TraceFormat(enum.StrEnum):
+    jsonl = enum.auto()
+    otlp = enum.auto()
+
+
+class Tracing(BaseModel):
+    enabled: bool = False
+    path: Path = "/tmp/data/traces.jsonl"
+    format: TraceFormat = TraceFormat.jsonl
+    flush_interval_s: float = 5.0
+    max_buffered_spans: int = 10000
+
+
+class Profiling(BaseModel):
+    max_duration_s: float = 300.0
+    sampling_interval_s: float = 0.005
+
+
+class LogFormat(enum.StrEnum):
+    text = enum.auto()
+    json = enum.auto()
 
 
 class Logging(BaseModel):
     sql_log_level: str = "WARNING"
+    format: LogFormat = LogFormat.text
+    queue_size: int = 10000
 
 
 class AppSettings(BaseSettings):
@@ -179,10 +333,19 @@ class AppSettings(BaseSettings):
     request_timeout_s: float
     request_retries: int
     database_path: Path = "/tmp/data/slackhealthbot.db"
+    response_cache: ResponseCache = ResponseCache()
+    dedupe: Dedupe = Dedupe()
+    inbound_queue: InboundQueue = InboundQueue()
+    leader_election: LeaderElection = LeaderElection()
+    config_reload: ConfigReload = ConfigReload()
+    metrics: Metrics = Metrics()
+    tracing: Tracing = Tracing()
+    profiling: Profiling = Profiling()
     logging: Logging
     withings: Withings
     fitbit: Fitbit
     google: Google
+    slack: Slack = Slack()
     openai: OpenAi
     model_config = SettingsConfigDict(
         env_nested_delimiter="__",
@@ -203,12 +366,20 @@ class AppSettings(BaseSettings):
             return {}
 
     @classmethod
-    def _load_merged_config(cls) -> dict:
-        default_config = cls._load_yaml_file("config/app-default.yaml", required=True)
-        custom_config = cls._load_yaml_file(
+    def config_paths(cls) -> tuple[str, str]:
+        """
+        :return: the paths of the default and the custom configuration files.
+        """
+        return (
+            "config/app-default.yaml",
             os.environ.get("SHB_CUSTOM_CONFIG_PATH", "config/app-custom.yaml"),
-            required=False,
         )
+
+    @classmethod
+    def _load_merged_config(cls) -> dict:
+        default_config_path, custom_config_path = cls.config_paths()
+        default_config = cls._load_yaml_file(default_config_path, required=True)
+        custom_config = cls._load_yaml_file(custom_config_path, required=False)
         return deep_update(default_config, custom_config)
 
     @classmethod
@@ -219,13 +390,10 @@ class AppSettings(BaseSettings):
         env_settings: PydanticBaseSettingsSource,
         **kwargs,
     ) -> tuple[PydanticBaseSettingsSource, ...]:
-        merged_config = cls._load_merged_config()
-        with NamedTemporaryFile(mode="w") as file:
-            yaml.safe_dump(merged_config, file.file)
-            yaml_settings_source = YamlConfigSettingsSource(
-                settings_cls,
-                yaml_file=file.name,
-            )
+        yaml_settings_source = InitSettingsSource(
+            settings_cls,
+            init_kwargs=cls._load_merged_config(),
+        )
         return (env_settings, yaml_settings_source)
 
 
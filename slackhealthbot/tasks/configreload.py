@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import signal
+
+import yaml
+from dependency_injector import providers
+from dependency_injector.wiring import Provide, inject
+from pydantic import ValidationError
+
+from slackhealthbot.containers import Container
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.settings import AppSettings, SecretSettings, Settings
+
+logger = logging.getLogger(__name__)
+
+reloads_counter = registry.counter(
+    "config_reloads_total",
+    "Number of reloads of the configuration, by outcome: success or failure.",
+    labelnames=("outcome",),
+)
+
+
+@inject
+def reload_settings(
+    settings_provider: providers.Singleton = Provide[Container.settings.provider],
+) -> bool:
+    """
+    Load the configuration again and, if it's valid, replace the settings
+    of the container: the code getting its settings from the container uses
+    the reloaded settings from then on.
+
+    The activity types are compiled when the settings are loaded. No cache
+    of the container depends on them: the motivational messages are cached
+    by prompt, which includes the goal and the streak.
+
+    :return: True if the configuration was reloaded.
+    """
+    try:
+        Settings(app_settings=AppSettings(), secret_settings=SecretSettings())
+    except (OSError, yaml.YAMLError, ValidationError) as e:
+        logger.error(f"Invalid configuration, not reloaded: {e}")
+        reloads_counter.inc(outcome="failure")
+        return False
+    settings_provider.reset()
+    settings_provider()
+    logger.info("Configuration reloaded")
+    reloads_counter.inc(outcome="success")
+    return True
+
+
+def _get_config_mtimes() -> tuple[int | None, ...]:
+    mtimes = []
+    for path in AppSettings.config_paths():
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+async def watch_config(poll_interval_s: float):
+    """
+    Reload the configuration when the process receives SIGHUP, or when
+    the modification time of a configuration file changes.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, reload_settings)
+        handles_sighup = True
+    except (NotImplementedError, RuntimeError, ValueError):
+        # Signal handlers can only be installed in the main thread, on unix.
+        logger.warning("The configuration isn't reloaded on SIGHUP")
+        handles_sighup = False
+    try:
+        mtimes = _get_config_mtimes()
+        while True:
+            await asyncio.sleep(poll_interval_s)
+            new_mtimes = _get_config_mtimes()
+            if new_mtimes != mtimes:
+                mtimes = new_mtimes
+                reload_settings()
+    finally:
+        if handles_sighup:
+            loop.remove_signal_handler(signal.SIGHUP)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+
+from slackhealthbot.core.metrics import registry
+
+lag_gauge = registry.gauge(
+    "event_loop_lag_seconds",
+    "Latest delay of the event loop in running a task which was ready to run.",
+)
+lag_histogram = registry.histogram(
+    "event_loop_lag_distribution_seconds",
+    "Delays of the event loop in running a task which was ready to run.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+blocked_counter = registry.counter(
+    "event_loop_blocked_total",
+    "Number of times the event loop was blocked longer than the threshold,"
+    " by the location of the blocking code.",
+    labelnames=("location",),
+)
+
+
+def _get_location(frame: FrameType) -> str:
+    """
+    :return: the innermost function of the app in the stack, or else the innermost
+        function, like file.py:function.
+    """
+    innermost_frame = frame
+    while frame is not None:
+        if f"{os.sep}slackhealthbot{os.sep}" in frame.f_code.co_filename:
+            break
+        frame = frame.f_back
+    frame = frame or innermost_frame
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_qualname}"
+
+
+class BlockingWatchdog:
+    """
+    Watches the event loop from another thread: when the loop is late
+    by more than the threshold in waking up the lag monitor, the code blocking
+    the loop is still running, and its stack is logged.
+    """
+
+    def __init__(self, loop_thread_id: int, threshold_s: float):
+        self.loop_thread_id = loop_thread_id
+        self.threshold_s = threshold_s
+        self._deadline: float | None = None
+        self._reported_deadline: float | None = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="event-loop-watchdog", daemon=True
+        )
+
+    def expect_wakeup(self, deadline: float):
+        """
+        :param deadline: when the loop should wake up the monitor,
+            on the monotonic clock.
+        """
+        self._deadline = deadline
+
+    def check(self, now: float) -> bool:
+        """
+        :return: True if the loop was found blocked, for the first time
+            since its latest expected wakeup.
+        """
+        deadline = self._deadline
+        if (
+            deadline is None
+            or deadline == self._reported_deadline
+            or now - deadline <= self.threshold_s
+        ):
+            return False
+        self._reported_deadline = deadline
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return False
+        location = _get_location(frame)
+        blocked_counter.inc(location=location)
+        logging.warning(
+            f"Event loop blocked for {now - deadline:.3f}s by {location}:\n"
+            + "".join(traceback.format_stack(frame))
+        )
+        return True
+
+    def _run(self):
+        check_interval_s = max(0.01, self.threshold_s / 2)
+        while not self._stopped.wait(check_interval_s):
+            self.check(time.monotonic())
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+async def monitor_event_loop_lag(
+    interval_s: float,
+    blocking_threshold_s: float | None = None,
+):
+    """
+    Measure how late the event loop wakes up from a sleep: a task which blocks
+    the loop, like a cpu-bound computation or a synchronous i/o, delays all
+    the other tasks by as much.
+
+    :param blocking_threshold_s: if set, log the stack of the code blocking
+        the loop for longer than this, while it's still blocking.
+    """
+    loop = asyncio.get_running_loop()
+    watchdog: BlockingWatchdog | None = None
+    if blocking_threshold_s is not None:
+        watchdog = BlockingWatchdog(
+            loop_thread_id=threading.get_ident(),
+            threshold_s=blocking_threshold_s,
+        )
+        watchdog.start()
+    try:
+        while True:
+            start = loop.time()
+            if watchdog:
+                # The default clock of the event loop is the monotonic clock.
+                watchdog.expect_wakeup(start + interval_s)
+            await asyncio.sleep(interval_s)
+            lag_s = max(0.0, loop.time() - start - interval_s)
+            lag_gauge.set(lag_s)
+            lag_histogram.observe(lag_s)
+            if watchdog and lag_s > watchdog.threshold_s:
+                logging.warning(f"Event loop unblocked after {lag_s:.3f}s")
+    finally:
+        if watchdog:
+            watchdog.stop()
@@ -2,11 +2,15 @@ import asyncio
 import dataclasses
 import datetime
 import logging
+import time
 
 from dependency_injector.wiring import Provide, inject
 
 from slackhealthbot.containers import Container
+from slackhealthbot.core.consistenthash import ShardAssignment
 from slackhealthbot.core.exceptions import UserLoggedOutException
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.schedules import IntervalSchedule
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
     UserIdentity,
@@ -18,6 +22,20 @@ from slackhealthbot.domain.usecases.fitbit import (
 )
 from slackhealthbot.domain.usecases.slack import usecase_post_user_logged_out
 from slackhealthbot.settings import Settings
+from slackhealthbot.tasks import leaderelection, scheduler
+
+SHARD_GROUP = "fitbit-poll"
+
+poll_duration_histogram = registry.histogram(
+    "fitbit_poll_duration_seconds",
+    "Duration of the poll cycles.",
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+user_lag_gauge = registry.gauge(
+    "fitbit_poll_user_lag_seconds",
+    "Time from the start of the latest poll cycle until the user was polled.",
+    labelnames=("user",),
+)
 
 
 @dataclasses.dataclass
@@ -55,16 +73,23 @@ async def handle_fail_poll(
         cache.cache_fail[user_lookup] = when
 
 
+def shard_key(user_lookup: UserLookup) -> str:
+    return f"{type(user_lookup).__name__}:{user_lookup.user_id}"
+
+
 async def fitbit_poll(
     cache: Cache,
+    shard: ShardAssignment | None = None,
 ):
     logging.info("fitbit poll")
     today = datetime.date.today()
     try:
-        await do_poll(
-            cache=cache,
-            when=today,
-        )
+        with poll_duration_histogram.time():
+            await do_poll(
+                cache=cache,
+                when=today,
+                shard=shard,
+            )
     except Exception:
         logging.error("Error polling fitbit", exc_info=True)
 
@@ -73,13 +98,24 @@ async def fitbit_poll(
 async def do_poll(
     cache: Cache,
     when: datetime.date,
+    shard: ShardAssignment | None = None,
     local_fitbit_repo: LocalFitbitRepository = Provide[
         Container.local_fitbit_repository
     ],
 ):
+    """
+    :param shard: if set, only poll the users in the share of this process.
+    """
+    start = time.monotonic()
     user_identities: list[UserIdentity] = (
         await local_fitbit_repo.get_all_user_identities()
     )
+    if shard is not None:
+        user_identities = [
+            user_identity
+            for user_identity in user_identities
+            if shard.owns(shard_key(user_identity.user_lookup))
+        ]
     for user_identity in user_identities:
         await fitbit_poll_sleep(
             cache=cache,
@@ -95,6 +131,10 @@ async def do_poll(
                 user_identity=user_identity,
             ),
         )
+        user_lag_gauge.set(
+            time.monotonic() - start,
+            user=user_identity.slack_alias,
+        )
 
 
 @dataclasses.dataclass
@@ -161,12 +201,46 @@ async def schedule_fitbit_poll(  # noqa: PLR0913 deal with it later
     if initial_delay_s is None:
         initial_delay_s = settings.app_settings.fitbit.poll.interval_seconds
 
+    poll_settings = settings.app_settings.fitbit.poll
+
     async def run_with_delay():
-        await asyncio.sleep(initial_delay_s)
-        while True:
+        shard: ShardAssignment | None = None
+        membership_task: asyncio.Task | None = None
+        if poll_settings.sharded:
+
+            def on_rebalanced(assignment: ShardAssignment):
+                nonlocal shard
+                shard = assignment
+
+            membership_task = leaderelection.run_shard_membership(
+                group=SHARD_GROUP,
+                on_rebalanced=on_rebalanced,
+            )
+
+        async def poll(_scheduled_at: datetime.datetime):
+            if membership_task and shard is None:
+                logging.warning("fitbit poll: skipped, no shard assigned yet")
+                return
             await fitbit_poll(
                 cache=cache,
+                shard=shard,
+            )
+
+        try:
+            await scheduler.run_on_schedule(
+                name="fitbit-poll",
+                schedule=IntervalSchedule(
+                    datetime.timedelta(seconds=poll_settings.interval_seconds)
+                ),
+                job=poll,
+                initial_delay_s=initial_delay_s,
+                # Each process polls its own share of the users: their runs
+                # can't be recorded under the same name.
+                persistent=not poll_settings.sharded,
             )
-            await asyncio.sleep(settings.app_settings.fitbit.poll.interval_seconds)
+        finally:
+            if membership_task:
+                membership_task.cancel()
+                await asyncio.gather(membership_task, return_exceptions=True)
 
     return asyncio.create_task(run_with_delay())
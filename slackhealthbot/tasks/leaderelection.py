@@ -0,0 +1,208 @@
+import asyncio
+import datetime
+import hashlib
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable
+
+from dependency_injector.wiring import Provide, inject
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from slackhealthbot.containers import Container
+from slackhealthbot.core.consistenthash import ConsistentHashRing, ShardAssignment
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.data.database.connection import session_scope
+from slackhealthbot.domain.localrepository.localleaserepository import (
+    LocalLeaseRepository,
+)
+from slackhealthbot.settings import Settings
+
+# Identifies this process among all the processes sharing the database.
+HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+leader_gauge = registry.gauge(
+    "leader",
+    "1 if the holder holds the lease, 0 otherwise.",
+    labelnames=("lease", "holder"),
+)
+shard_members_gauge = registry.gauge(
+    "shard_members",
+    "Number of processes sharing the work of the group.",
+    labelnames=("group",),
+)
+
+
+@inject
+async def _try_acquire_lease(
+    name: str,
+    holder: str,
+    ttl: datetime.timedelta,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+) -> bool:
+    async with session_scope(session_factory):
+        return await _try_acquire_lease_in_session(name, holder, ttl)
+
+
+@inject
+async def _try_acquire_lease_in_session(
+    name: str,
+    holder: str,
+    ttl: datetime.timedelta,
+    lease_repository: LocalLeaseRepository = Provide[Container.lease_repository],
+) -> bool:
+    return await lease_repository.try_acquire(name=name, holder=holder, ttl=ttl)
+
+
+@inject
+async def _renew_membership(
+    group: str,
+    holder: str,
+    ttl: datetime.timedelta,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+) -> list[str]:
+    async with session_scope(session_factory):
+        return await _renew_membership_in_session(group, holder, ttl)
+
+
+@inject
+async def _renew_membership_in_session(
+    group: str,
+    holder: str,
+    ttl: datetime.timedelta,
+    lease_repository: LocalLeaseRepository = Provide[Container.lease_repository],
+) -> list[str]:
+    await lease_repository.try_acquire(
+        name=_membership_lease_name(group, holder), holder=holder, ttl=ttl
+    )
+    return await lease_repository.get_holders(name_prefix=f"{group}/")
+
+
+def _membership_lease_name(group: str, holder: str) -> str:
+    # Lease names are short: identify the holder by a hash.
+    return f"{group}/{hashlib.sha1(holder.encode()).hexdigest()[:16]}"
+
+
+@inject
+async def _release_lease(
+    name: str,
+    holder: str,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+):
+    async with session_scope(session_factory):
+        await _release_lease_in_session(name, holder)
+
+
+@inject
+async def _release_lease_in_session(
+    name: str,
+    holder: str,
+    lease_repository: LocalLeaseRepository = Provide[Container.lease_repository],
+):
+    await lease_repository.release(name=name, holder=holder)
+
+
+@inject
+def run_leader_election(
+    name: str,
+    on_elected: Callable[[], Awaitable[None]],
+    on_demoted: Callable[[], Awaitable[None]],
+    holder: str = HOLDER,
+    settings: Settings = Provide[Container.settings],
+) -> asyncio.Task:
+    """
+    Compete with the other processes of the application for the given lease.
+
+    on_elected is called when this process acquires the lease, and on_demoted
+    when it loses it, or when the returned task is cancelled.
+    """
+    leader_election_settings = settings.app_settings.leader_election
+    ttl = datetime.timedelta(seconds=leader_election_settings.lease_ttl_s)
+
+    async def task():
+        is_leader = False
+        try:
+            while True:
+                try:
+                    has_lease = await _try_acquire_lease(name, holder, ttl)
+                except Exception:
+                    # We can't tell if another process took over the lease:
+                    # behave as if it did.
+                    logging.error(f"Error renewing the {name} lease", exc_info=True)
+                    has_lease = False
+                if has_lease and not is_leader:
+                    logging.info(f"{holder} acquired the {name} lease")
+                    is_leader = True
+                    await on_elected()
+                elif is_leader and not has_lease:
+                    logging.warning(f"{holder} lost the {name} lease")
+                    is_leader = False
+                    await on_demoted()
+                leader_gauge.set(1 if is_leader else 0, lease=name, holder=holder)
+                await asyncio.sleep(leader_election_settings.heartbeat_interval_s)
+        finally:
+            if is_leader:
+                await on_demoted()
+                leader_gauge.set(0, lease=name, holder=holder)
+                try:
+                    await _release_lease(name, holder)
+                except Exception:
+                    logging.error(f"Error releasing the {name} lease", exc_info=True)
+
+    return asyncio.create_task(task())
+
+
+@inject
+def run_shard_membership(
+    group: str,
+    on_rebalanced: Callable[[ShardAssignment], None],
+    holder: str = HOLDER,
+    settings: Settings = Provide[Container.settings],
+) -> asyncio.Task:
+    """
+    Share the work of the given group with the other processes of the application
+    which run it.
+
+    Each process holds a lease as long as it runs, and the processes holding
+    a lease split the keys of the work with consistent hashing.
+    on_rebalanced is called with the share of this process when it starts,
+    then when processes join or leave the group.
+    """
+    leader_election_settings = settings.app_settings.leader_election
+    ttl = datetime.timedelta(seconds=leader_election_settings.lease_ttl_s)
+    name = _membership_lease_name(group, holder)
+
+    async def task():
+        members: frozenset[str] = frozenset()
+        try:
+            while True:
+                try:
+                    # This process is a member, even if it can't tell the others.
+                    current_members = frozenset(
+                        await _renew_membership(group, holder, ttl)
+                    ) | {holder}
+                except Exception:
+                    # Keep the current share: the other processes keep theirs
+                    # until the lease of this process expires.
+                    logging.error(
+                        f"Error renewing the {group} membership", exc_info=True
+                    )
+                    current_members = members or frozenset({holder})
+                if current_members != members:
+                    logging.info(f"{holder}: {len(current_members)} members in {group}")
+                    members = current_members
+                    on_rebalanced(
+                        ShardAssignment(ring=ConsistentHashRing(members), node=holder)
+                    )
+                shard_members_gauge.set(len(members), group=group)
+                await asyncio.sleep(leader_election_settings.heartbeat_interval_s)
+        finally:
+            # Let the other processes take over our share without waiting for
+            # the lease to expire.
+            try:
+                await _release_lease(name, holder)
+            except Exception:
+                logging.error(f"Error leaving the {group} group", exc_info=True)
+
+    return asyncio.create_task(task())
@@ -0,0 +1,60 @@
+import asyncio
+import datetime as dt
+import logging
+
+from dependency_injector.wiring import Provide, inject
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from slackhealthbot.containers import Container
+from slackhealthbot.core.schedules import DailySchedule, IntervalSchedule
+from slackhealthbot.data.database.connection import session_scope
+from slackhealthbot.domain.usecases.fitbit import (
+    usecase_pregenerate_motivational_messages,
+)
+from slackhealthbot.settings import Settings
+from slackhealthbot.tasks import scheduler
+
+logger = logging.getLogger(__name__)
+
+
+@inject
+async def pregenerate_motivational_messages(
+    activity_type_ids: set[int],
+    post_time: dt.time,
+    initial_delay_s: float = 0,
+    settings: Settings = Provide[Container.settings],
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+) -> asyncio.Task:
+    """
+    Generate the motivational messages of the next daily reports
+    in the background, at regular intervals.
+
+    :param initial_delay_s: see scheduler.run_on_schedule.
+    """
+    report_schedule = DailySchedule(post_time)
+
+    async def generate(scheduled_at: dt.datetime):
+        # The messages are for the next daily reports.
+        when = (
+            report_schedule.next_after(scheduled_at).astimezone(dt.timezone.utc).date()
+        )
+        logger.info(f"Generating motivational messages for {when}")
+        # This runs alongside the other scheduled tasks: use a dedicated session.
+        async with session_scope(session_factory):
+            await usecase_pregenerate_motivational_messages.do(
+                type_ids=activity_type_ids,
+                when=when,
+            )
+
+    return asyncio.create_task(
+        scheduler.run_on_schedule(
+            name="motivational-messages",
+            schedule=IntervalSchedule(
+                dt.timedelta(
+                    seconds=settings.app_settings.openai.motivational_messages.pregeneration_interval_s
+                )
+            ),
+            job=generate,
+            initial_delay_s=initial_delay_s,
+        )
+    )
@@ -3,55 +3,65 @@ import datetime as dt
 import logging
 from typing import Coroutine
 
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.schedules import DailySchedule
 from slackhealthbot.domain.usecases.fitbit import usecase_process_daily_activities
+from slackhealthbot.tasks import scheduler
 
 logger = logging.getLogger(__name__)
 
+report_duration_histogram = registry.histogram(
+    "daily_report_duration_seconds",
+    "Duration of the daily reports, by phase: prepare ahead of the post time,"
+    " or post.",
+    labelnames=("phase",),
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+
 
 async def post_daily_activities(
     activity_type_ids: set[int],
     post_time: dt.time,
+    lead_time_s: float = 0,
+    initial_delay_s: float = 0,
 ) -> Coroutine[None, None, asyncio.Task]:
+    """
+    :param lead_time_s: if positive, prepare the reports this long before
+        the post time, so that only the reports of the activities logged
+        in the meantime are created at the post time.
+    :param initial_delay_s: see scheduler.run_on_schedule.
+    """
+    lead_time = dt.timedelta(seconds=lead_time_s)
+    # The job starts when the reports are prepared.
+    start_time = (dt.datetime.combine(dt.date.today(), post_time) - lead_time).time()
 
-    async def task():
-        while True:
-            try:
-                logger.info("Processing daily activities")
-                now = dt.datetime.now()
-
-                next_task_datetime = now.replace(
-                    hour=post_time.hour,
-                    minute=post_time.minute,
-                    second=post_time.second,
-                    microsecond=post_time.microsecond,
-                )
-                if next_task_datetime < now:
-                    next_task_datetime += dt.timedelta(days=1)
-                time_until_next_task_datetime_s = (next_task_datetime - now).seconds
-                logger.info(
-                    f"Sleeping {time_until_next_task_datetime_s} seconds until next daily summary at {next_task_datetime}"
-                )
-                # Add a few seconds to the sleep duration.
-                # This will avoid the following error where our loop was called
-                # just before (<500ms before) the scheduled time of 21:00, at 20:59:59,549.
-                # We finished the processing quickly (before 20:59:59,778), and
-                # scheduled it for the "next 21:00", which was just a few milliseconds in the future.
-                # Logs:
-                """
-    2024-08-18 14:26:08,928 Sleeping 23631 seconds until next daily summary at 2024-08-18 21:00:00
-
-    2024-08-18 21:00:00,195 Sleeping 86399 seconds until next daily summary at 2024-08-19 21:00:00
-
-    2024-08-19 20:59:59,549 Sleeping 0 seconds until next daily summary at 2024-08-19 21:00:00
-    2024-08-19 20:59:59,778 Sleeping 0 seconds until next daily summary at 2024-08-19 21:00:00
-    2024-08-19 21:00:00,025 Sleeping 86399 seconds until next daily summary at 2024-08-20 21:00:00
-                """
-                await asyncio.sleep(time_until_next_task_datetime_s + 3)
-
-                await usecase_process_daily_activities.do(
+    async def process_daily_activities(scheduled_at: dt.datetime):
+        post_at = scheduled_at + lead_time
+        # The day of the reports is the day of the post time, even if this run
+        # was missed and catches up later.
+        when = post_at.astimezone(dt.timezone.utc).date()
+        prepared_reports = None
+        if lead_time_s > 0:
+            logger.info("Preparing daily activities")
+            with report_duration_histogram.time(phase="prepare"):
+                prepared_reports = await usecase_process_daily_activities.prepare(
                     type_ids=activity_type_ids,
+                    when=when,
                 )
-            except Exception:
-                logging.error("Error processing daily activities", exc_info=True)
+            await scheduler.sleep_until(post_at)
+        logger.info("Processing daily activities")
+        with report_duration_histogram.time(phase="post"):
+            await usecase_process_daily_activities.do(
+                type_ids=activity_type_ids,
+                when=when,
+                prepared_reports=prepared_reports,
+            )
 
-    return asyncio.create_task(task())
+    return asyncio.create_task(
+        scheduler.run_on_schedule(
+            name="daily-activities",
+            schedule=DailySchedule(start_time),
+            job=process_daily_activities,
+            initial_delay_s=initial_delay_s,
+        )
+    )
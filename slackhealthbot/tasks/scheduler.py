@@ -0,0 +1,161 @@
+import asyncio
+import datetime
+import logging
+from typing import Awaitable, Callable
+
+from dependency_injector.wiring import Provide, inject
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from slackhealthbot.containers import Container
+from slackhealthbot.core.metrics import registry
+from slackhealthbot.core.profiling import Profiler
+from slackhealthbot.core.schedules import Schedule
+from slackhealthbot.core.tracing import new_correlation_id, tracer
+from slackhealthbot.data.database.connection import session_scope
+from slackhealthbot.domain.localrepository.localschedulerepository import (
+    LocalScheduleRepository,
+)
+
+ScheduledJob = Callable[[datetime.datetime], Awaitable[None]]
+
+runs_counter = registry.counter(
+    "scheduled_job_runs_total",
+    "Number of runs of the scheduled jobs, by outcome: success or failure.",
+    labelnames=("job", "outcome"),
+)
+missed_runs_counter = registry.counter(
+    "scheduled_job_missed_runs_total",
+    "Number of runs of the scheduled jobs skipped, because a later run was due.",
+    labelnames=("job",),
+)
+
+
+def now() -> datetime.datetime:
+    return datetime.datetime.now().astimezone()
+
+
+async def sleep_until(when: datetime.datetime):
+    """
+    The wait itself uses the monotonic clock of the event loop: it isn't cut
+    short or stretched by adjustments of the wall clock.
+    """
+    await asyncio.sleep(max(0.0, (when - now()).total_seconds()))
+
+
+@inject
+async def _get_last_run(
+    name: str,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+) -> datetime.datetime | None:
+    async with session_scope(session_factory):
+        return await _get_last_run_in_session(name)
+
+
+@inject
+async def _get_last_run_in_session(
+    name: str,
+    schedule_repository: LocalScheduleRepository = Provide[
+        Container.schedule_repository
+    ],
+) -> datetime.datetime | None:
+    return await schedule_repository.get_last_run(name=name)
+
+
+@inject
+async def _record_run(
+    name: str,
+    scheduled_at: datetime.datetime,
+    session_factory: async_sessionmaker = Provide[Container.session_factory],
+):
+    async with session_scope(session_factory):
+        await _record_run_in_session(name, scheduled_at)
+
+
+@inject
+async def _record_run_in_session(
+    name: str,
+    scheduled_at: datetime.datetime,
+    schedule_repository: LocalScheduleRepository = Provide[
+        Container.schedule_repository
+    ],
+):
+    await schedule_repository.record_run(name=name, scheduled_at=scheduled_at)
+
+
+def _next_run(
+    name: str,
+    schedule: Schedule,
+    last_run: datetime.datetime,
+    current_time: datetime.datetime,
+) -> datetime.datetime:
+    next_run = schedule.next_after(last_run)
+    # Of the runs missed in the meantime, only run the latest one.
+    missed_run_count = 0
+    while (following_run := schedule.next_after(next_run)) <= current_time:
+        next_run = following_run
+        missed_run_count += 1
+    if missed_run_count:
+        logging.warning(f"{name}: skipping {missed_run_count} missed runs")
+        missed_runs_counter.inc(missed_run_count, job=name)
+    return next_run
+
+
+@inject
+async def run_on_schedule(  # noqa: PLR0913
+    name: str,
+    schedule: Schedule,
+    job: ScheduledJob,
+    initial_delay_s: float = 0,
+    persistent: bool = True,
+    profiler: Profiler = Provide[Container.profiler],
+):
+    """
+    Run the job on the given schedule, until cancelled.
+
+    The job is called with the time its run was scheduled at, which may be
+    in the past if the run is late.
+
+    :param name: identifies the job in the database.
+    :param initial_delay_s: wait this long before looking for the first run,
+        to let the application start.
+    :param persistent: if True, the completed runs are recorded in the database.
+        After a restart, the job then resumes on its schedule, and if runs
+        were missed while the application was stopped, the latest of them
+        runs right away.
+    :param profiler: profiles the next run of the job, when requested
+        from the admin interface.
+    """
+    profiler.add_job(name)
+    await asyncio.sleep(initial_delay_s)
+    start = now()
+    last_run: datetime.datetime | None = None
+    if persistent:
+        try:
+            last_run = await _get_last_run(name)
+        except Exception:
+            logging.error(f"Error getting the last run of {name}", exc_info=True)
+    if last_run is None:
+        next_run = schedule.first_run(start)
+    else:
+        next_run = _next_run(name, schedule, last_run, start)
+    while True:
+        logging.info(f"{name}: next run at {next_run}")
+        await sleep_until(next_run)
+        # The logs and spans of each run share a correlation id, as for a request.
+        new_correlation_id()
+        try:
+            with tracer.span(f"scheduled {name}"), profiler.profile_run(name):
+                await job(next_run)
+        except Exception:
+            logging.error(f"Error running {name}", exc_info=True)
+            runs_counter.inc(job=name, outcome="failure")
+        else:
+            runs_counter.inc(job=name, outcome="success")
+            if persistent:
+                try:
+                    await _record_run(name, next_run)
+                except Exception:
+                    logging.error(f"Error recording the run of {name}", exc_info=True)
+        # Compute the next run from the scheduled time, not from the wall clock:
+        # a run which completes before its scheduled time isn't repeated.
+        next_run = _next_run(name, schedule, next_run, now())
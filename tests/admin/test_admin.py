@@ -5,13 +5,19 @@ The purpose isn't to test the SQLAdmin package, but rather to test that
 we have correctly configured it.
 """
 
+import pstats
 import re
+from pathlib import Path
 
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from passlib.hash import pbkdf2_sha256
+from sqlalchemy import select
 
 from slackhealthbot.admin.hash_password import main as hash_password_main
+from slackhealthbot.core.profiling import ProfileMode
+from slackhealthbot.data.database import models
 from slackhealthbot.main import app, lifespan
 from slackhealthbot.settings import Settings
 
@@ -175,3 +181,115 @@ async def test_login_wrong_password(
         )
         assert response.status_code == status.HTTP_302_FOUND
         assert response.next_request.url.path == "/admin/login"
+
+
+@pytest.mark.asyncio
+async def test_statements_page(
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+    client: TestClient,
+):
+    """
+    Given a logged in admin
+    And statements slower than the threshold
+    When the admin opens the database statements page
+    Then the statements are listed, with their query plan.
+    """
+    # Given a logged in admin
+    settings.secret_settings.admin_password_hash = pbkdf2_sha256.hash("azerty")
+    # And statements slower than the threshold
+    monkeypatch.setattr(app.container.statement_log(), "slow_threshold_s", 0)
+    async with lifespan(app):
+        client.post(
+            "/admin/login",
+            headers={"content-type": "application/x-www-form-urlencoded"},
+            data={
+                "username": "admin",
+                "password": "azerty",
+            },
+        )
+        async with app.container.db_scope() as db:
+            await db.execute(select(models.User))
+
+        # When the admin opens the database statements page
+        response = client.get("/admin/statements")
+
+    # Then the statements are listed, with their query plan.
+    assert response.status_code == status.HTTP_200_OK
+    assert "FROM users" in response.text
+    assert "SCAN users" in response.text
+
+
+@pytest.mark.asyncio
+async def test_profiling_pages(
+    tmp_path: Path,
+    settings: Settings,
+    client: TestClient,
+):
+    """
+    Given a logged in admin
+    When the admin profiles the process
+    Then a pstats file is downloaded
+
+    ---
+
+    When the admin profiles the next run of a scheduled job
+    Then the job is armed for profiling.
+
+    ---
+
+    When the admin logs out
+    And tries to profile the process
+    Then they are redirected to the login page.
+    """
+    # Given a logged in admin
+    settings.secret_settings.admin_password_hash = pbkdf2_sha256.hash("azerty")
+    profiler = app.container.profiler()
+    profiler.add_job("somejob")
+    async with lifespan(app):
+        client.post(
+            "/admin/login",
+            headers={"content-type": "application/x-www-form-urlencoded"},
+            data={
+                "username": "admin",
+                "password": "azerty",
+            },
+        )
+
+        # When the admin profiles the process
+        response = client.get(
+            "/admin/profiling/process",
+            params={"duration_s": 0.1, "mode": "cprofile"},
+        )
+
+        # Then a pstats file is downloaded
+        assert response.status_code == status.HTTP_200_OK
+        assert "attachment" in response.headers["content-disposition"]
+        path = tmp_path / "profile.prof"
+        path.write_bytes(response.content)
+        assert pstats.Stats(str(path)).total_calls > 0
+
+        # When the admin profiles the next run of a scheduled job
+        response = client.post(
+            "/admin/profiling/runs/somejob",
+            headers={"content-type": "application/x-www-form-urlencoded"},
+            data={"mode": "sampling"},
+        )
+
+        # Then the job is armed for profiling.
+        assert response.status_code == status.HTTP_200_OK
+        assert "profiled with sampling" in response.text
+        assert profiler.armed_jobs()["somejob"] == ProfileMode.sampling
+
+        # When the admin logs out
+        client.get("/admin/logout")
+        # And tries to profile the process
+        response = client.get(
+            "/admin/profiling/process",
+            params={"duration_s": 0.1},
+            follow_redirects=False,
+        )
+
+    # Then they are redirected to the login page.
+    assert response.status_code == status.HTTP_302_FOUND
+    assert response.next_request.url.path == "/admin/login"
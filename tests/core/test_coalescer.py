@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from slackhealthbot.core.coalescer import Coalescer
+
+
+@pytest.mark.asyncio
+async def test_coalescing():
+    """
+    Given a coalescer
+    When we submit items for the same key within the window
+    Then the merged items are processed once
+    And items for other keys are processed separately.
+    """
+    coalescer = Coalescer(name="test_coalescing", window_s=0.05)
+    processed: list[tuple[str, set[int]]] = []
+
+    def merge(items: set[int], other_items: set[int]) -> set[int]:
+        return items | other_items
+
+    def create_process(key: str):
+        async def process(items: set[int]):
+            processed.append((key, items))
+
+        return process
+
+    await asyncio.gather(
+        coalescer.submit(
+            key="a", payload={1}, merge=merge, process=create_process("a")
+        ),
+        coalescer.submit(
+            key="a", payload={2, 3}, merge=merge, process=create_process("a")
+        ),
+        coalescer.submit(
+            key="b", payload={1}, merge=merge, process=create_process("b")
+        ),
+        coalescer.submit(
+            key="a", payload={1}, merge=merge, process=create_process("a")
+        ),
+    )
+
+    assert sorted(processed) == [("a", {1, 2, 3}), ("b", {1})]
+    assert coalescer.ratio == 2  # noqa: PLR2004
+
+    # After the window, submissions are processed again.
+    await coalescer.submit(
+        key="a", payload={4}, merge=merge, process=create_process("a")
+    )
+    assert processed[-1] == ("a", {4})
+    assert coalescer.ratio == 5 / 3
+
+
+@pytest.mark.asyncio
+async def test_submission_during_processing():
+    """
+    Given a coalescer processing a merged payload
+    When we submit items for the same key during the processing
+    Then they are processed in a follow-up run, once the processing completes.
+    """
+    coalescer = Coalescer(name="test_submission_during_processing", window_s=0.01)
+    processing_started = asyncio.Event()
+    processing_can_complete = asyncio.Event()
+    running = 0
+    max_running = 0
+    processed: list[set[int]] = []
+
+    def merge(items: set[int], other_items: set[int]) -> set[int]:
+        return items | other_items
+
+    async def process(items: set[int]):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        processing_started.set()
+        await asyncio.wait_for(processing_can_complete.wait(), timeout=5)
+        processed.append(items)
+        running -= 1
+
+    first_submission = asyncio.create_task(
+        coalescer.submit(key="a", payload={1}, merge=merge, process=process)
+    )
+    await asyncio.wait_for(processing_started.wait(), timeout=5)
+    await coalescer.submit(key="a", payload={2}, merge=merge, process=process)
+    await coalescer.submit(key="a", payload={3}, merge=merge, process=process)
+    processing_can_complete.set()
+    await first_submission
+
+    assert processed == [{1}, {2, 3}]
+    assert max_running == 1
+
+
+@pytest.mark.asyncio
+async def test_ratio_over_recent_runs():
+    """
+    Given a coalescer which merged submissions some time ago
+    When the ratio window elapses
+    Then the ratio only reflects the recent runs.
+    """
+    now = 0.0
+    coalescer = Coalescer(
+        name="test_ratio_over_recent_runs",
+        window_s=0,
+        ratio_window_s=60,
+        clock=lambda: now,
+    )
+
+    async def process(items: set[int]):
+        pass
+
+    await asyncio.gather(
+        *[
+            coalescer.submit(key="a", payload={index}, merge=set.union, process=process)
+            for index in range(4)
+        ]
+    )
+    assert coalescer.ratio == 4  # noqa: PLR2004
+
+    now += 61
+    assert coalescer.ratio == 0
+    await coalescer.submit(key="a", payload={1}, merge=set.union, process=process)
+    assert coalescer.ratio == 1
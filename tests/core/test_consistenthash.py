@@ -0,0 +1,68 @@
+import pytest
+
+from slackhealthbot.core.consistenthash import ConsistentHashRing, ShardAssignment
+
+KEYS = [f"user{index}" for index in range(1000)]
+
+
+def get_assignments(ring: ConsistentHashRing) -> dict[str, str]:
+    return {key: ring.get_node(key) for key in KEYS}
+
+
+def test_keys_spread_among_nodes():
+    """
+    Given a ring with several nodes
+    When we assign keys to the nodes
+    Then each node gets a similar share of the keys.
+    """
+    ring = ConsistentHashRing(["a", "b", "c", "d"])
+
+    assignments = get_assignments(ring)
+
+    for node in ring.nodes:
+        share = list(assignments.values()).count(node) / len(KEYS)
+        assert 0.15 < share < 0.35  # noqa: PLR2004
+
+
+def test_only_keys_of_joining_node_move():
+    """
+    Given a ring with several nodes
+    When a node joins the ring
+    Then only the keys assigned to the new node move.
+    """
+    before = get_assignments(ConsistentHashRing(["a", "b", "c"]))
+    after = get_assignments(ConsistentHashRing(["a", "b", "c", "d"]))
+
+    moved = {key for key in KEYS if before[key] != after[key]}
+    assert moved
+    assert {after[key] for key in moved} == {"d"}
+
+
+def test_only_keys_of_leaving_node_move():
+    """
+    Given a ring with several nodes
+    When a node leaves the ring
+    Then only the keys which were assigned to that node move.
+    """
+    before = get_assignments(ConsistentHashRing(["a", "b", "c"]))
+    after = get_assignments(ConsistentHashRing(["a", "b"]))
+
+    moved = {key for key in KEYS if before[key] != after[key]}
+    assert moved == {key for key in KEYS if before[key] == "c"}
+
+
+def test_shards_partition_keys():
+    """
+    Given the shard assignments of all the nodes of a ring
+    Then each key is owned by exactly one node.
+    """
+    ring = ConsistentHashRing(["a", "b", "c"])
+    shards = [ShardAssignment(ring=ring, node=node) for node in ring.nodes]
+
+    for key in KEYS:
+        assert sum(shard.owns(key) for shard in shards) == 1
+
+
+def test_empty_ring():
+    with pytest.raises(ValueError):
+        ConsistentHashRing([])
@@ -0,0 +1,110 @@
+import pytest
+
+from slackhealthbot.core import jobqueue
+from slackhealthbot.core.exceptions import QueueFullException
+from slackhealthbot.core.jobqueue import InMemoryJobQueue, JobType
+from slackhealthbot.core.workerpool import WorkerPool
+
+
+def merge(payload: dict, other_payload: dict) -> dict:
+    return {"items": payload["items"] + other_payload["items"]}
+
+
+@pytest.fixture
+def executed(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    executed_payloads: list[dict] = []
+
+    async def handler(payload: dict):
+        executed_payloads.append(payload)
+
+    monkeypatch.setitem(
+        jobqueue.job_types, "test", JobType(handler=handler, merge=merge)
+    )
+    return executed_payloads
+
+
+@pytest.mark.asyncio
+async def test_in_memory_queue(executed: list[dict]):
+    """
+    Given a started in-memory job queue
+    When we enqueue jobs
+    Then the jobs are executed in order
+    And the metrics are updated.
+    """
+    processed_before = jobqueue.processed_counter.get(kind="test", outcome="success")
+    queue = InMemoryJobQueue(pools={"test": WorkerPool(name="test", worker_count=2)})
+    queue.start()
+
+    for index in range(3):
+        await queue.enqueue(kind="test", key="someuser", payload={"items": [index]})
+    await queue.stop()
+
+    assert executed == [{"items": [0]}, {"items": [1]}, {"items": [2]}]
+    assert (
+        jobqueue.processed_counter.get(kind="test", outcome="success")
+        == processed_before + 3
+    )
+    assert jobqueue.depth_gauge.get(kind="test") == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_queue_coalescing(executed: list[dict]):
+    """
+    Given a started in-memory job queue
+    When we enqueue jobs for the same key within the coalescing window
+    Then their payloads are merged and executed once.
+    """
+    queue = InMemoryJobQueue(pools={"test": WorkerPool(name="test", worker_count=2)})
+    queue.start()
+
+    for index in range(3):
+        await queue.enqueue(
+            kind="test",
+            key="someuser",
+            payload={"items": [index]},
+            coalesce_window_s=0.05,
+        )
+    await queue.enqueue(
+        kind="test",
+        key="otheruser",
+        payload={"items": [10]},
+        coalesce_window_s=0.05,
+    )
+    await queue.stop()
+
+    assert sorted(executed, key=lambda x: x["items"]) == [
+        {"items": [0, 1, 2]},
+        {"items": [10]},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_in_memory_queue_reserves_room_for_coalesced_jobs(
+    executed: list[dict],
+):
+    """
+    Given a started in-memory job queue with a bounded queue
+    When we enqueue coalesced jobs for as many keys as the queue can hold
+    Then jobs for other keys are rejected
+    And jobs merged into the pending ones are accepted
+    And all the accepted jobs are executed once the window elapses.
+    """
+    queue = InMemoryJobQueue(
+        pools={"test": WorkerPool(name="test", worker_count=1, max_queue_size=2)}
+    )
+    queue.start()
+
+    for key, items in [("a", [1]), ("b", [2]), ("a", [3])]:
+        await queue.enqueue(
+            kind="test", key=key, payload={"items": items}, coalesce_window_s=0.05
+        )
+    with pytest.raises(QueueFullException):
+        await queue.enqueue(
+            kind="test", key="c", payload={"items": [4]}, coalesce_window_s=0.05
+        )
+    await queue.stop()
+
+    assert sorted(executed, key=lambda x: x["items"]) == [
+        {"items": [1, 3]},
+        {"items": [2]},
+    ]
@@ -0,0 +1,72 @@
+import pytest
+
+from slackhealthbot.core.metrics import MetricsRegistry
+
+
+def test_render():
+    """
+    Given a registry with a counter, a gauge and a histogram
+    When we render the metrics
+    Then they're in the Prometheus text format
+    And the histogram buckets are cumulative.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter(
+        "requests_total", "Number of requests.", labelnames=("route",)
+    )
+    gauge = registry.gauge("queue_depth", "Depth of the queue.")
+    histogram = registry.histogram(
+        "request_duration_seconds",
+        "Duration of the requests.",
+        buckets=(0.1, 1.0),
+    )
+    counter.inc(route='/say "hi"')
+    counter.inc(2, route='/say "hi"')
+    gauge.set(0.5)
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(3)
+
+    assert registry.render() == (
+        "# HELP queue_depth Depth of the queue.\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 0.5\n"
+        "# HELP request_duration_seconds Duration of the requests.\n"
+        "# TYPE request_duration_seconds histogram\n"
+        'request_duration_seconds_bucket{le="0.1"} 2\n'
+        'request_duration_seconds_bucket{le="1"} 2\n'
+        'request_duration_seconds_bucket{le="+Inf"} 3\n'
+        "request_duration_seconds_sum 3.15\n"
+        "request_duration_seconds_count 3\n"
+        "# HELP requests_total Number of requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/say \\"hi\\""} 3\n'
+    )
+
+
+def test_histogram_time():
+    """
+    Given a histogram
+    When we time a block which raises
+    Then its duration is still observed.
+    """
+    histogram = MetricsRegistry().histogram("duration_seconds", "Duration.")
+
+    with pytest.raises(ValueError), histogram.time():
+        raise ValueError
+
+    assert histogram.get() == 1
+    assert histogram.get_sum() >= 0
+
+
+def test_histogram_buckets_mismatch():
+    """
+    Given a registered histogram
+    When we register it again with other buckets
+    Then a ValueError is raised.
+    """
+    registry = MetricsRegistry()
+    registry.histogram("duration_seconds", "Duration.", buckets=(1.0,))
+
+    with pytest.raises(ValueError):
+        registry.histogram("duration_seconds", "Duration.", buckets=(2.0,))
@@ -0,0 +1,104 @@
+import asyncio
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+
+from slackhealthbot.core.profiling import ProfileMode, Profiler, ProfilerBusyException
+
+
+def busy_wait(duration_s: float):
+    end = time.monotonic() + duration_s
+    while time.monotonic() < end:
+        pass
+
+
+async def busy_task():
+    for _ in range(10):
+        busy_wait(0.01)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_cprofile(tmp_path: Path):
+    """
+    Given a coroutine busy on the event loop
+    When we profile the process with cprofile
+    Then the profile is a pstats file, with the calls of the coroutine.
+    """
+    profiler = Profiler(sampling_interval_s=0.001)
+    task = asyncio.create_task(busy_task())
+
+    profile = await profiler.profile_for(0.2, ProfileMode.cprofile)
+    await task
+
+    path = tmp_path / profile.filename
+    path.write_bytes(profile.content)
+    stats = pstats.Stats(str(path))
+    assert any(function == "busy_wait" for _, _, function in stats.stats)
+    assert profile.filename.endswith(".prof")
+
+
+@pytest.mark.asyncio
+async def test_sampling():
+    """
+    Given a coroutine busy on the event loop
+    When we profile the process by sampling
+    Then the profile has the collapsed stacks of the coroutine, with their count.
+    """
+    profiler = Profiler(sampling_interval_s=0.001)
+    task = asyncio.create_task(busy_task())
+
+    profile = await profiler.profile_for(0.2, ProfileMode.sampling)
+    await task
+
+    lines = profile.content.decode().splitlines()
+    busy_lines = [line for line in lines if "busy_wait (test_profiling.py:" in line]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    assert stack.split(";")[-2].startswith("busy_task")
+    assert int(count) > 0
+    assert profile.filename.endswith(".collapsed")
+
+
+@pytest.mark.asyncio
+async def test_busy():
+    """
+    Given a profile being captured
+    When another profile is requested
+    Then it's rejected.
+    """
+    profiler = Profiler(sampling_interval_s=0.001)
+    task = asyncio.create_task(profiler.profile_for(0.1, ProfileMode.sampling))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ProfilerBusyException):
+        await profiler.profile_for(0.1, ProfileMode.cprofile)
+    await task
+
+
+def test_profile_run():
+    """
+    Given a job armed for profiling
+    When the job runs twice, failing the first time
+    Then only its first run is profiled.
+    """
+    profiler = Profiler(sampling_interval_s=0.001)
+    profiler.add_job("job")
+
+    with profiler.profile_run("job"):
+        busy_wait(0.01)
+    assert profiler.get_run_profile("job") is None
+
+    profiler.arm("job", ProfileMode.cprofile)
+    assert profiler.armed_jobs() == {"job": ProfileMode.cprofile}
+    with pytest.raises(ValueError), profiler.profile_run("job"):
+        raise ValueError
+    first_profile = profiler.get_run_profile("job")
+    with profiler.profile_run("job"):
+        busy_wait(0.01)
+
+    assert first_profile is not None
+    assert profiler.get_run_profile("job") is first_profile
+    assert profiler.armed_jobs() == {}
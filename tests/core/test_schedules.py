@@ -0,0 +1,38 @@
+import datetime
+
+from slackhealthbot.core.schedules import DailySchedule, IntervalSchedule
+
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+
+
+def local(*args) -> datetime.datetime:
+    return datetime.datetime(*args).astimezone()
+
+
+def test_daily_schedule():
+    schedule = DailySchedule(datetime.time(hour=23, minute=50))
+
+    assert schedule.next_after(local(2024, 8, 2, 10)) == local(2024, 8, 2, 23, 50)
+    assert schedule.next_after(local(2024, 8, 2, 23, 55)) == local(2024, 8, 3, 23, 50)
+    # Strictly after:
+    assert schedule.next_after(local(2024, 8, 2, 23, 50)) == local(2024, 8, 3, 23, 50)
+    assert schedule.first_run(local(2024, 8, 2, 10)) == local(2024, 8, 2, 23, 50)
+
+
+def test_daily_schedule_other_timezone():
+    """
+    Given a time in another timezone than the local one
+    Then the next run is at the local time of the schedule.
+    """
+    schedule = DailySchedule(datetime.time(hour=23, minute=50))
+    when = local(2024, 8, 2, 10)
+
+    assert schedule.next_after(when.astimezone(TIMEZONE)) == local(2024, 8, 2, 23, 50)
+
+
+def test_interval_schedule():
+    schedule = IntervalSchedule(datetime.timedelta(hours=1))
+    start = local(2024, 8, 2, 10)
+
+    assert schedule.first_run(start) == start
+    assert schedule.next_after(start) == local(2024, 8, 2, 11)
@@ -0,0 +1,164 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from asgi_correlation_id import correlation_id
+
+from slackhealthbot.core.tracing import (
+    FileSpanExporter,
+    SpanStatus,
+    Tracer,
+    dropped_spans_counter,
+    traced,
+    tracer,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_correlation_id():
+    token = correlation_id.set(None)
+    yield
+    correlation_id.reset(token)
+
+
+@pytest.fixture
+def exporter(tmp_path: Path) -> FileSpanExporter:
+    return FileSpanExporter(
+        path=tmp_path / "traces.jsonl",
+        trace_format="jsonl",
+        max_buffered_spans=100,
+    )
+
+
+def read_records(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_tracing_disabled():
+    """
+    Given a tracer without an exporter
+    When we record spans
+    Then no span is created.
+    """
+    disabled_tracer = Tracer()
+
+    with disabled_tracer.span("request") as span:
+        disabled_tracer.record_span("db select", 0.01)
+
+    assert span is None
+
+
+def test_spans(exporter: FileSpanExporter):
+    """
+    Given a tracer with an exporter
+    When we record nested spans during a request
+    Then the spans have the correlation id of the request as trace id
+    And the nested spans have their enclosing span as parent
+    And the span of a block which raises has the error status.
+    """
+    test_tracer = Tracer()
+    test_tracer.configure(exporter)
+    correlation_id.set("somecorrelationid")
+
+    with test_tracer.span("request", route="/v1/fitbit-notification") as root:
+        with pytest.raises(ValueError), test_tracer.span("usecase"):
+            test_tracer.record_span("db select", 0.01, rows=2)
+            raise ValueError
+    exporter.flush()
+
+    db_record, usecase_record, root_record = read_records(exporter.path)
+    assert {x["trace_id"] for x in (db_record, usecase_record, root_record)} == {
+        "somecorrelationid"
+    }
+    assert root_record["span_id"] == root.span_id
+    assert root_record["parent_id"] is None
+    assert root_record["attributes"] == {"route": "/v1/fitbit-notification"}
+    assert usecase_record["parent_id"] == root.span_id
+    assert usecase_record["status"] == SpanStatus.error
+    assert db_record["parent_id"] == usecase_record["span_id"]
+    assert db_record["attributes"] == {"rows": 2}
+    assert db_record["duration_ms"] == pytest.approx(10, abs=0.01)
+
+
+def test_otlp_format(exporter: FileSpanExporter):
+    """
+    Given a tracer with an exporter in the otlp format
+    When we record a span
+    Then an OTLP/JSON export request is written
+    And the correlation id is converted to a valid trace id.
+    """
+    exporter.trace_format = "otlp"
+    test_tracer = Tracer()
+    test_tracer.configure(exporter)
+    correlation_id.set("not-a-trace-id")
+
+    with test_tracer.span("request", attempts=2, cached=False):
+        pass
+    exporter.flush()
+
+    [record] = read_records(exporter.path)
+    [resource_spans] = record["resourceSpans"]
+    [scope_spans] = resource_spans["scopeSpans"]
+    [span] = scope_spans["spans"]
+    assert len(span["traceId"]) == 32  # noqa: PLR2004
+    assert len(span["spanId"]) == 16  # noqa: PLR2004
+    assert span["parentSpanId"] == ""
+    assert span["attributes"] == [
+        {"key": "attempts", "value": {"intValue": "2"}},
+        {"key": "cached", "value": {"boolValue": False}},
+    ]
+    assert span["status"] == {"code": 1}
+
+
+def test_dropped_spans(exporter: FileSpanExporter):
+    """
+    Given an exporter with a full buffer
+    When another span is exported
+    Then the oldest span is dropped and counted.
+    """
+    small_exporter = FileSpanExporter(
+        path=exporter.path, trace_format="jsonl", max_buffered_spans=1
+    )
+    test_tracer = Tracer()
+    test_tracer.configure(small_exporter)
+    dropped_count = dropped_spans_counter.get()
+
+    test_tracer.record_span("first", 0.01)
+    test_tracer.record_span("second", 0.01)
+    small_exporter.flush()
+
+    assert [x["name"] for x in read_records(exporter.path)] == ["second"]
+    assert dropped_spans_counter.get() == dropped_count + 1
+
+
+@pytest.mark.asyncio
+async def test_traced(
+    monkeypatch: pytest.MonkeyPatch,
+    exporter: FileSpanExporter,
+):
+    """
+    Given a traced coroutine function
+    When it's called in concurrent tasks
+    Then each call records a span, named after the function by default
+    And the tasks don't share their current span.
+    """
+    monkeypatch.setattr(tracer, "exporter", exporter)
+
+    @traced()
+    async def do():
+        await asyncio.sleep(0.01)
+
+    @traced("parent")
+    async def parent():
+        await asyncio.gather(do(), do())
+
+    await parent()
+    exporter.flush()
+
+    *child_records, parent_record = read_records(exporter.path)
+    assert parent_record["name"] == "parent"
+    assert [x["name"] for x in child_records] == [
+        "test_tracing.test_traced.<locals>.do"
+    ] * 2
+    assert {x["parent_id"] for x in child_records} == {parent_record["span_id"]}
@@ -0,0 +1,90 @@
+from slackhealthbot.core.ttlcache import MISSING, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_put():
+    cache = TTLCache(max_entries=10, ttl_s=5.0)
+    assert cache.get("key") is None
+    assert cache.get("key", default=MISSING) is MISSING
+
+    cache.put("key", "value")
+    assert cache.get("key") == "value"
+    assert "key" in cache
+
+
+def test_none_value_cached():
+    cache = TTLCache(max_entries=10, ttl_s=5.0)
+    cache.put("key", None)
+    assert cache.get("key", default=MISSING) is None
+    assert "key" in cache
+
+
+def test_expiry():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl_s=5.0, clock=clock)
+    cache.put("key", "value")
+
+    clock.now = 4.9
+    assert cache.get("key") == "value"
+
+    clock.now = 5.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_entries=2, ttl_s=5.0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # Use "a", so that "b" is the least recently used entry.
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_version_invalidation():
+    cache = TTLCache(max_entries=10, ttl_s=5.0)
+    cache.put("key", "value", version=100)
+
+    assert cache.get("key", min_version=90) == "value"
+    assert cache.get("key", min_version=100) == "value"
+    assert cache.get("key", min_version=101) is None
+    # The stale entry was removed
+    assert cache.get("key") is None
+
+
+def test_explicit_invalidation():
+    cache = TTLCache(max_entries=10, ttl_s=5.0)
+    cache.put("key", "value")
+    cache.invalidate("key")
+    assert "key" not in cache
+    cache.invalidate("key")
+
+
+def test_invalidation_by_value():
+    cache = TTLCache(max_entries=10, ttl_s=5.0)
+    cache.put("a", "value")
+    cache.put("b", "other value")
+    cache.put("c", "value")
+
+    cache.invalidate_if(lambda value: value == "value")
+
+    assert "a" not in cache
+    assert cache.get("b") == "other value"
+    assert "c" not in cache
+
+
+def test_disabled():
+    cache = TTLCache(max_entries=10, ttl_s=0)
+    cache.put("key", "value")
+    assert "key" not in cache
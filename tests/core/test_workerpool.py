@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from slackhealthbot.core.exceptions import QueueFullException
+from slackhealthbot.core.workerpool import WorkerPool
+
+some_context_var: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "some_context_var", default=None
+)
+
+
+@pytest.mark.asyncio
+async def test_same_key_serialized_in_order():
+    """
+    Given a started worker pool
+    When we submit multiple jobs for the same key
+    Then the jobs are executed one at a time, in the submission order.
+    """
+    pool = WorkerPool(name="test", worker_count=4)
+    pool.start()
+    running = 0
+    max_running = 0
+    executed: list[int] = []
+
+    def create_job(index: int):
+        async def job():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            executed.append(index)
+            running -= 1
+
+        return job
+
+    for index in range(5):
+        pool.submit(key="someuser", job=create_job(index))
+    await pool.stop()
+
+    assert executed == list(range(5))
+    assert max_running == 1
+    assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_in_parallel():
+    """
+    Given a started worker pool
+    When we submit jobs for different keys
+    Then the jobs are executed in parallel.
+    """
+    worker_count = 4
+    pool = WorkerPool(name="test", worker_count=worker_count)
+    pool.start()
+    all_started = asyncio.Event()
+    started_count = 0
+
+    async def job():
+        nonlocal started_count
+        started_count += 1
+        if started_count == worker_count:
+            all_started.set()
+        # Each job only completes once all jobs have started.
+        await asyncio.wait_for(all_started.wait(), timeout=5)
+
+    for index in range(worker_count):
+        pool.submit(key=f"user{index}", job=job)
+    await pool.stop()
+
+    assert all_started.is_set()
+
+
+@pytest.mark.asyncio
+async def test_busy_key_doesnt_block_workers():
+    """
+    Given a started worker pool with 2 workers
+    When we submit several jobs for one key, then a job for another key
+    Then the job for the other key is executed by the idle worker,
+    without waiting for the jobs of the first key.
+    """
+    pool = WorkerPool(name="test", worker_count=2)
+    pool.start()
+    other_key_done = asyncio.Event()
+    executed: list[str] = []
+
+    def create_job(name: str):
+        async def job():
+            if name.startswith("a"):
+                # Only completes once the job for the other key completed.
+                await asyncio.wait_for(other_key_done.wait(), timeout=5)
+            else:
+                other_key_done.set()
+            executed.append(name)
+
+        return job
+
+    for name in ["a1", "a2", "a3", "b1"]:
+        pool.submit(key=name[0], job=create_job(name))
+    await pool.stop()
+
+    assert executed == ["b1", "a1", "a2", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_job_error_and_context():
+    """
+    Given a started worker pool
+    When a job fails
+    Then the next jobs are still executed
+    And they are executed in the context in which they were submitted.
+    """
+    pool = WorkerPool(name="test", worker_count=1)
+    pool.start()
+    context_values: list[str | None] = []
+
+    async def failing_job():
+        raise ValueError("oops")
+
+    async def job():
+        context_values.append(some_context_var.get())
+
+    pool.submit(key="someuser", job=failing_job)
+    some_context_var.set("somevalue")
+    pool.submit(key="someuser", job=job)
+    await pool.stop()
+
+    assert context_values == ["somevalue"]
+
+
+@pytest.mark.asyncio
+async def test_submit_not_started():
+    pool = WorkerPool(name="test", worker_count=1)
+
+    async def job():
+        pass
+
+    with pytest.raises(RuntimeError):
+        pool.submit(key="someuser", job=job)
+
+
+@pytest.mark.asyncio
+async def test_submit_queue_full():
+    """
+    Given a started worker pool with a bounded queue
+    When we submit more jobs than the queue can hold
+    Then a QueueFullException is raised, with the configured retry delay.
+    """
+    pool = WorkerPool(name="test", worker_count=1, max_queue_size=2, retry_after_s=12)
+    pool.start()
+
+    async def job():
+        await asyncio.sleep(0.01)
+
+    pool.submit(key="someuser", job=job)
+    pool.submit(key="someuser", job=job)
+    assert pool.full()
+    with pytest.raises(QueueFullException) as exc_info:
+        pool.submit(key="someuser", job=job)
+    assert exc_info.value.retry_after_s == 12  # noqa: PLR2004
+    await pool.stop()
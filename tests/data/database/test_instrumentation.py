@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from slackhealthbot.core.tracing import FileSpanExporter, tracer
+from slackhealthbot.data.database import models
+from slackhealthbot.data.database.instrumentation import (
+    StatementLog,
+    get_fingerprint,
+    instrument_engine,
+    slow_statements_counter,
+    statement_rows_counter,
+)
+from tests.testsupport.factories.factories import UserFactory
+
+
+def test_fingerprint():
+    """
+    Given statements which only differ by their literals and list sizes
+    When we get their fingerprints
+    Then they're the same.
+    """
+    fingerprint = get_fingerprint(
+        "SELECT users.id FROM users\n"
+        "WHERE users.slack_alias = 'jdoe' AND users.id IN (?, ?) LIMIT 10"
+    )
+    other_fingerprint = get_fingerprint(
+        "SELECT users.id FROM users "
+        "WHERE users.slack_alias = 'o''brien' AND users.id IN (?) LIMIT 5"
+    )
+
+    assert fingerprint == other_fingerprint
+    assert fingerprint.operation == "select"
+    assert fingerprint.normalized_statement == (
+        "SELECT users.id FROM users "
+        "WHERE users.slack_alias = ? AND users.id IN (...) LIMIT ?"
+    )
+    assert get_fingerprint("INSERT INTO t (a) VALUES (?), (?), (?)") == (
+        get_fingerprint("INSERT INTO t (a) VALUES (?)")
+    )
+
+
+@pytest.mark.asyncio
+async def test_statements_recorded(
+    async_connection_url: str,
+    user_factory: UserFactory,
+):
+    """
+    Given an instrumented engine, with a threshold flagging every statement as slow
+    When we execute a query
+    Then its duration and rows are recorded under its fingerprint
+    And it's flagged as slow, with its query plan.
+    """
+    user_factory.create_batch(3)
+    engine = create_async_engine(async_connection_url)
+    statement_log = StatementLog(slow_threshold_s=0, max_slow_statements=10)
+    instrument_engine(engine.sync_engine, statement_log)
+
+    async with engine.connect() as conn:
+        users = (
+            await conn.execute(
+                select(models.User).where(models.User.slack_alias.like("%"))
+            )
+        ).all()
+        await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    [stats] = [
+        x
+        for x in statement_log.stats()
+        if "FROM users" in x.fingerprint.normalized_statement
+    ]
+    assert stats.count == 1
+    assert stats.rows == len(users) == 3  # noqa: PLR2004
+    assert statement_rows_counter.get(
+        operation="select", fingerprint=stats.fingerprint.id
+    ) >= len(users)
+    assert slow_statements_counter.get(fingerprint=stats.fingerprint.id) >= 1
+    slow_statement = next(
+        x for x in statement_log.slow_statements() if x.fingerprint == stats.fingerprint
+    )
+    assert any("users" in line for line in slow_statement.query_plan)
+
+
+@pytest.mark.asyncio
+async def test_statement_spans(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    async_connection_url: str,
+):
+    """
+    Given an instrumented engine, and tracing enabled
+    When we execute a query in a span
+    Then the statement is recorded as a child span.
+    """
+    exporter = FileSpanExporter(
+        path=tmp_path / "traces.jsonl",
+        trace_format="jsonl",
+        max_buffered_spans=100,
+    )
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    engine = create_async_engine(async_connection_url)
+    instrument_engine(
+        engine.sync_engine,
+        StatementLog(slow_threshold_s=1, max_slow_statements=10),
+    )
+
+    with tracer.span("usecase") as usecase_span:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    assert any(
+        span.name == "db select" and span.parent_id == usecase_span.span_id
+        for span in exporter._spans
+    )
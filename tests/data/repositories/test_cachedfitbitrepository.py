@@ -0,0 +1,145 @@
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.core.ttlcache import TTLCache
+from slackhealthbot.data.database import models
+from slackhealthbot.data.repositories import cachedfitbitrepository
+from slackhealthbot.data.repositories.cachedfitbitrepository import (
+    CachedFitbitRepository,
+)
+from slackhealthbot.data.repositories.sqlalchemyfitbitrepository import (
+    SQLAlchemyFitbitRepository,
+)
+from slackhealthbot.domain.models.users import FitbitUserLookup
+from tests.testsupport.factories.factories import (
+    FitbitActivityFactory,
+    FitbitUserFactory,
+    UserFactory,
+)
+
+
+@pytest.fixture
+def repo(mocked_async_session: AsyncSession) -> CachedFitbitRepository:
+    return CachedFitbitRepository(
+        db=mocked_async_session,
+        cache=TTLCache(max_entries=10, ttl_s=60),
+    )
+
+
+@pytest.fixture
+def user(
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+) -> models.User:
+    user_factory, _, _ = fitbit_factories
+    return user_factory.create(slack_alias="jdoe")
+
+
+@pytest.fixture
+def user_queries(monkeypatch: pytest.MonkeyPatch) -> list[FitbitUserLookup]:
+    queried_lookups: list[FitbitUserLookup] = []
+    get_user_by_lookup = SQLAlchemyFitbitRepository.get_user_by_lookup
+
+    async def spy_get_user_by_lookup(self, user_lookup: FitbitUserLookup):
+        queried_lookups.append(user_lookup)
+        return await get_user_by_lookup(self, user_lookup)
+
+    monkeypatch.setattr(
+        SQLAlchemyFitbitRepository, "get_user_by_lookup", spy_get_user_by_lookup
+    )
+    return queried_lookups
+
+
+@pytest.mark.asyncio
+async def test_user_queried_once(
+    repo: CachedFitbitRepository,
+    user: models.User,
+    user_queries: list[FitbitUserLookup],
+):
+    """
+    Given a user
+    When we get their identity, oauth data and user
+    Then the user is queried once
+    And the hits are counted.
+    """
+    user_lookup = FitbitUserLookup(user.fitbit.fitbit_user_id)
+    hits_before = cachedfitbitrepository.lookups_counter.get(result="hit")
+
+    identity = await repo.get_user_identity(user_lookup)
+    oauth_data = await repo.get_oauth_data_by_user_lookup(user_lookup)
+    domain_user = await repo.get_user_by_lookup(user_lookup)
+
+    assert identity.slack_alias == "jdoe"
+    assert oauth_data.oauth_access_token == user.fitbit.oauth_access_token
+    assert domain_user.identity == identity
+    assert user_queries == [user_lookup]
+    assert (
+        cachedfitbitrepository.lookups_counter.get(result="hit")
+        == hits_before + 2  # noqa: PLR2004
+    )
+    assert 0 < cachedfitbitrepository.hit_ratio_gauge.get() <= 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_not_cached(
+    repo: CachedFitbitRepository,
+    user_queries: list[FitbitUserLookup],
+):
+    """
+    Given no user
+    When we get the identity of an unknown user twice
+    Then None is returned, and the user is queried each time.
+    """
+    user_lookup = FitbitUserLookup("unknown")
+
+    assert await repo.get_user_identity(user_lookup) is None
+    assert await repo.get_user_identity(user_lookup) is None
+    assert user_queries == [user_lookup, user_lookup]
+
+
+@pytest.mark.asyncio
+async def test_invalidated_on_token_update(
+    repo: CachedFitbitRepository,
+    user: models.User,
+):
+    """
+    Given a user in the cache
+    When their token is refreshed
+    Then the new token is returned.
+    """
+    user_lookup = FitbitUserLookup(user.fitbit.fitbit_user_id)
+    oauth_data = await repo.get_oauth_data_by_user_lookup(user_lookup)
+
+    await repo.update_token_by_refresh_token(
+        refresh_token=oauth_data.oauth_refresh_token,
+        new_access_token="new access token",
+        new_expiration_date=datetime.datetime(2024, 8, 2, 10, 44, 55),
+    )
+
+    new_oauth_data = await repo.get_oauth_data_by_user_lookup(user_lookup)
+    assert new_oauth_data.oauth_access_token == "new access token"
+
+
+@pytest.mark.asyncio
+async def test_invalidated_on_user_ids_update(
+    repo: CachedFitbitRepository,
+    user: models.User,
+):
+    """
+    Given a user in the cache
+    When their ids are updated
+    Then the user is found by their new id, and not by their previous id.
+    """
+    previous_lookup = FitbitUserLookup(user.fitbit.fitbit_user_id)
+    assert await repo.get_user_identity(previous_lookup) is not None
+
+    await repo.update_user_ids(
+        oauth_userid=user.fitbit.oauth_userid,
+        fitbit_user_id="new fitbit user id",
+        health_user_id=None,
+    )
+
+    assert await repo.get_user_identity(previous_lookup) is None
+    identity = await repo.get_user_identity(FitbitUserLookup("new fitbit user id"))
+    assert identity.slack_alias == "jdoe"
@@ -0,0 +1,133 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from slackhealthbot.data.repositories.inmemorydeduperepository import (
+    InMemoryDedupeRepository,
+)
+from slackhealthbot.data.repositories.sqlalchemydeduperepository import (
+    SQLAlchemyDedupeRepository,
+)
+from slackhealthbot.domain.localrepository.localdeduperepository import (
+    LocalDedupeRepository,
+)
+
+
+@pytest.fixture(params=["memory", "database"])
+def dedupe_repository(
+    request: pytest.FixtureRequest,
+    mocked_async_session: AsyncSession,
+) -> LocalDedupeRepository:
+    if request.param == "memory":
+        return InMemoryDedupeRepository(max_entries=10)
+    return SQLAlchemyDedupeRepository(db=mocked_async_session)
+
+
+@pytest.mark.asyncio
+async def test_claim_release(dedupe_repository: LocalDedupeRepository):
+    ttl = datetime.timedelta(minutes=1)
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user1", value="a", ttl=ttl
+    )
+    assert await dedupe_repository.claim(
+        namespace="other", key="user1", value="a", ttl=ttl
+    )
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user2", value="a", ttl=ttl
+    )
+    # Duplicate
+    assert not await dedupe_repository.claim(
+        namespace="ns", key="user1", value="a", ttl=ttl
+    )
+
+    # A new value replaces the previous one
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user1", value="b", ttl=ttl
+    )
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user1", value="a", ttl=ttl
+    )
+
+    # Releasing another value is a no-op
+    await dedupe_repository.release(namespace="ns", key="user1", value="b")
+    assert not await dedupe_repository.claim(
+        namespace="ns", key="user1", value="a", ttl=ttl
+    )
+
+    await dedupe_repository.release(namespace="ns", key="user1", value="a")
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user1", value="a", ttl=ttl
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_is_duplicate(dedupe_repository: LocalDedupeRepository):
+    ttl = datetime.timedelta(minutes=1)
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user1", value="1", ttl=ttl
+    )
+
+    def is_duplicate(current_value: str) -> bool:
+        return int(current_value) >= 2  # noqa: PLR2004
+
+    assert await dedupe_repository.claim(
+        namespace="ns", key="user1", value="2", ttl=ttl, is_duplicate=is_duplicate
+    )
+    assert not await dedupe_repository.claim(
+        namespace="ns", key="user1", value="3", ttl=ttl, is_duplicate=is_duplicate
+    )
+
+
+@pytest.mark.asyncio
+async def test_expired(dedupe_repository: LocalDedupeRepository):
+    await dedupe_repository.claim(
+        namespace="ns",
+        key="user1",
+        value="a",
+        ttl=datetime.timedelta(seconds=-1),
+    )
+    assert await dedupe_repository.claim(
+        namespace="ns",
+        key="user1",
+        value="a",
+        ttl=datetime.timedelta(minutes=1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims(async_connection_url: str):
+    """
+    Given multiple processes sharing the database dedupe store
+    When they claim the same notification at the same time
+    Then only one of them claims it.
+    """
+    session_factory = async_sessionmaker(bind=create_async_engine(async_connection_url))
+    sessions = [session_factory() for _ in range(5)]
+
+    results = await asyncio.gather(
+        *[
+            SQLAlchemyDedupeRepository(db=session).claim(
+                namespace="ns",
+                key="user1",
+                value="a",
+                ttl=datetime.timedelta(minutes=1),
+            )
+            for session in sessions
+        ]
+    )
+    for session in sessions:
+        await session.close()
+
+    assert sorted(results) == [False, False, False, False, True]
+
+
+@pytest.mark.asyncio
+async def test_memory_bounded():
+    repo = InMemoryDedupeRepository(max_entries=2)
+    ttl = datetime.timedelta(minutes=1)
+    for index in range(3):
+        await repo.claim(namespace="ns", key=f"user{index}", value="a", ttl=ttl)
+    assert len(repo.cache) == 2  # noqa: PLR2004
+    assert await repo.claim(namespace="ns", key="user0", value="a", ttl=ttl)
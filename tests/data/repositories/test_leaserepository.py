@@ -0,0 +1,70 @@
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.repositories.sqlalchemyleaserepository import (
+    SQLAlchemyLeaseRepository,
+)
+
+
+@pytest.mark.asyncio
+async def test_try_acquire(mocked_async_session: AsyncSession):
+    """
+    Given a lease held by a holder
+    When other holders try to acquire it
+    Then only the current holder holds it, until it is released.
+    """
+    repo = SQLAlchemyLeaseRepository(db=mocked_async_session)
+    ttl = datetime.timedelta(minutes=1)
+
+    assert await repo.try_acquire(name="lease", holder="a", ttl=ttl)
+    assert not await repo.try_acquire(name="lease", holder="b", ttl=ttl)
+    assert await repo.try_acquire(name="other", holder="b", ttl=ttl)
+    # Renew:
+    assert await repo.try_acquire(name="lease", holder="a", ttl=ttl)
+
+    # Only the holder can release the lease.
+    await repo.release(name="lease", holder="b")
+    assert not await repo.try_acquire(name="lease", holder="b", ttl=ttl)
+    await repo.release(name="lease", holder="a")
+    assert await repo.try_acquire(name="lease", holder="b", ttl=ttl)
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_taken_over(mocked_async_session: AsyncSession):
+    """
+    Given a lease held by a holder which didn't renew it
+    When the lease expires
+    Then another holder can acquire it.
+    """
+    repo = SQLAlchemyLeaseRepository(db=mocked_async_session)
+
+    assert await repo.try_acquire(
+        name="lease", holder="a", ttl=datetime.timedelta(seconds=-1)
+    )
+    assert await repo.try_acquire(
+        name="lease", holder="b", ttl=datetime.timedelta(minutes=1)
+    )
+    assert not await repo.try_acquire(
+        name="lease", holder="a", ttl=datetime.timedelta(minutes=1)
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_holders(mocked_async_session: AsyncSession):
+    """
+    Given leases held by several holders, some expired
+    When we get the holders of the leases with a given prefix
+    Then the holders of the unexpired leases with that prefix are returned.
+    """
+    repo = SQLAlchemyLeaseRepository(db=mocked_async_session)
+    ttl = datetime.timedelta(minutes=1)
+    await repo.try_acquire(name="group/a", holder="a", ttl=ttl)
+    await repo.try_acquire(name="group/b", holder="b", ttl=ttl)
+    await repo.try_acquire(
+        name="group/c", holder="c", ttl=datetime.timedelta(seconds=-1)
+    )
+    await repo.try_acquire(name="other/d", holder="d", ttl=ttl)
+
+    assert await repo.get_holders(name_prefix="group/") == ["a", "b"]
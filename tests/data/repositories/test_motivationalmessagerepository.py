@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.repositories.sqlalchemymotivationalmessagerepository import (
+    SQLAlchemyMotivationalMessageRepository,
+)
+
+
+@pytest.mark.asyncio
+async def test_put_message(mocked_async_session: AsyncSession):
+    """
+    Given a motivational message stored for a prompt
+    When we get the message of the prompt
+    Then the message is returned until it expires.
+    """
+    repo = SQLAlchemyMotivationalMessageRepository(db=mocked_async_session)
+
+    assert await repo.get_message(prompt="prompt") is None
+
+    await repo.put_message(
+        prompt="prompt", message="Keep going!", ttl=datetime.timedelta(hours=1)
+    )
+    assert await repo.get_message(prompt="prompt") == "Keep going!"
+    assert await repo.get_message(prompt="other prompt") is None
+
+    await repo.put_message(
+        prompt="prompt", message="Well done!", ttl=datetime.timedelta(hours=-1)
+    )
+    assert await repo.get_message(prompt="prompt") is None
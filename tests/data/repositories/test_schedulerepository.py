@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.data.repositories.sqlalchemyschedulerepository import (
+    SQLAlchemyScheduleRepository,
+)
+
+
+@pytest.mark.asyncio
+async def test_record_run(mocked_async_session: AsyncSession):
+    """
+    Given a scheduled job
+    When we record its runs
+    Then the last run is the time the last recorded run was scheduled at.
+    """
+    repo = SQLAlchemyScheduleRepository(db=mocked_async_session)
+    timezone = datetime.timezone(datetime.timedelta(hours=2))
+    first_run = datetime.datetime(2024, 8, 2, 23, 50, tzinfo=timezone)
+
+    assert await repo.get_last_run(name="job") is None
+
+    await repo.record_run(name="job", scheduled_at=first_run)
+    assert await repo.get_last_run(name="job") == first_run
+
+    await repo.record_run(
+        name="job", scheduled_at=first_run + datetime.timedelta(days=1)
+    )
+    assert await repo.get_last_run(name="job") == first_run + datetime.timedelta(days=1)
+    assert await repo.get_last_run(name="other") is None
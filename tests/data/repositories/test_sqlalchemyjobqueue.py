@@ -0,0 +1,303 @@
+import asyncio
+
+import pytest
+from asgi_correlation_id import correlation_id
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from slackhealthbot.core import jobqueue
+from slackhealthbot.core.coalescer import ratio_gauge
+from slackhealthbot.core.exceptions import QueueFullException
+from slackhealthbot.core.jobqueue import JobType
+from slackhealthbot.data.database import models
+from slackhealthbot.data.repositories.sqlalchemyjobqueue import (
+    STATUS_DEAD,
+    SQLAlchemyJobQueue,
+)
+from slackhealthbot.settings import InboundQueue
+
+
+def merge(payload: dict, other_payload: dict) -> dict:
+    return {"items": payload["items"] + other_payload["items"]}
+
+
+@pytest.fixture
+def session_factory(async_connection_url: str) -> async_sessionmaker:
+    return async_sessionmaker(bind=create_async_engine(async_connection_url))
+
+
+@pytest.fixture
+def queue(session_factory: async_sessionmaker) -> SQLAlchemyJobQueue:
+    return SQLAlchemyJobQueue(
+        session_factory=session_factory,
+        settings=InboundQueue(
+            worker_count=2,
+            poll_interval_s=0.01,
+            visibility_timeout_s=60,
+            max_attempts=2,
+            retry_backoff_s=0,
+        ),
+    )
+
+
+@pytest.fixture
+def executed(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    executed_payloads: list[dict] = []
+
+    async def handler(payload: dict):
+        if payload.get("fail"):
+            raise ValueError("failed")
+        executed_payloads.append(payload)
+
+    monkeypatch.setitem(
+        jobqueue.job_types, "test", JobType(handler=handler, merge=merge)
+    )
+    return executed_payloads
+
+
+async def get_jobs(session_factory: async_sessionmaker) -> list[models.InboundJob]:
+    async with session_factory() as db:
+        return list((await db.scalars(select(models.InboundJob))).all())
+
+
+@pytest.mark.asyncio
+async def test_workers_execute_jobs(
+    queue: SQLAlchemyJobQueue,
+    session_factory: async_sessionmaker,
+    executed: list[dict],
+):
+    """
+    Given a started database job queue
+    When we enqueue jobs
+    Then the workers execute them in order
+    And the completed jobs are removed from the database.
+    """
+    queue.start()
+    for index in range(3):
+        await queue.enqueue(kind="test", key="someuser", payload={"items": [index]})
+    for _ in range(100):
+        if len(executed) == 3:  # noqa: PLR2004
+            break
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    assert executed == [{"items": [0]}, {"items": [1]}, {"items": [2]}]
+    assert await get_jobs(session_factory) == []
+
+
+@pytest.mark.asyncio
+async def test_same_key_claimed_in_order(
+    queue: SQLAlchemyJobQueue,
+    executed: list[dict],
+):
+    """
+    Given jobs for two keys in the database job queue
+    When we claim jobs
+    Then a job isn't claimed while a previous job for the same key is pending.
+    """
+    await queue.enqueue(kind="test", key="a", payload={"items": [1]})
+    await queue.enqueue(kind="test", key="a", payload={"items": [2]})
+    await queue.enqueue(kind="test", key="b", payload={"items": [3]})
+
+    first_job = await queue.claim()
+    second_job = await queue.claim()
+    assert first_job.payload == {"items": [1]}
+    assert second_job.payload == {"items": [3]}
+    assert await queue.claim() is None
+
+    await queue.complete(first_job)
+    third_job = await queue.claim()
+    assert third_job.payload == {"items": [2]}
+
+
+@pytest.mark.asyncio
+async def test_failed_job_retried(
+    queue: SQLAlchemyJobQueue,
+    session_factory: async_sessionmaker,
+    executed: list[dict],
+):
+    """
+    Given a job which fails in the database job queue
+    When the job fails more than the max attempts
+    Then the job is retried, then kept in the database with the dead status.
+    """
+    await queue.enqueue(kind="test", key="a", payload={"fail": True})
+
+    await queue.execute(await queue.claim())
+    [job] = await get_jobs(session_factory)
+    assert job.attempts == 1
+    assert job.claimed_until is None
+    assert "ValueError" in job.last_error
+
+    await queue.execute(await queue.claim())
+    [job] = await get_jobs(session_factory)
+    assert job.attempts == 2  # noqa: PLR2004
+    assert job.status == STATUS_DEAD
+    assert await queue.claim() is None
+
+
+@pytest.mark.asyncio
+async def test_visibility_timeout(
+    queue: SQLAlchemyJobQueue,
+    executed: list[dict],
+):
+    """
+    Given a job claimed by a worker which didn't complete it
+    When the visibility timeout expires
+    Then the job is claimed again.
+    """
+    queue.settings.visibility_timeout_s = -1
+    await queue.enqueue(kind="test", key="a", payload={"items": [1]})
+
+    first_claim = await queue.claim()
+    second_claim = await queue.claim()
+
+    assert second_claim.id == first_claim.id
+    assert second_claim.attempts == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_coalescing(
+    queue: SQLAlchemyJobQueue,
+    session_factory: async_sessionmaker,
+    executed: list[dict],
+):
+    """
+    Given a job enqueued with a coalescing window
+    When we enqueue other jobs for the same key within the window
+    Then their payloads are merged into the first job.
+    """
+    for index in range(3):
+        await queue.enqueue(
+            kind="test",
+            key="a",
+            payload={"items": [index]},
+            coalesce_window_s=60,
+        )
+
+    [job] = await get_jobs(session_factory)
+    assert job.payload == '{"items": [0, 1, 2]}'
+    # The job isn't available before the end of the window.
+    assert await queue.claim() is None
+
+
+@pytest.mark.asyncio
+async def test_correlation_id(
+    monkeypatch: pytest.MonkeyPatch,
+    queue: SQLAlchemyJobQueue,
+):
+    """
+    Given a job enqueued during a request
+    When a worker executes the job
+    Then the job runs with the correlation id of the request.
+    """
+    job_correlation_ids: list[str | None] = []
+
+    async def handler(_payload: dict):
+        job_correlation_ids.append(correlation_id.get())
+
+    monkeypatch.setitem(
+        jobqueue.job_types, "test", JobType(handler=handler, merge=merge)
+    )
+    correlation_id.set("somecorrelationid")
+    await queue.enqueue(kind="test", key="a", payload={"items": [1]})
+    correlation_id.set(None)
+
+    await asyncio.create_task(queue.execute(await queue.claim()))
+
+    assert job_correlation_ids == ["somecorrelationid"]
+
+
+@pytest.mark.asyncio
+async def test_metrics(
+    queue: SQLAlchemyJobQueue,
+    executed: list[dict],
+):
+    await queue.enqueue(kind="test", key="a", payload={"items": [1]})
+    await queue.enqueue(kind="test", key="b", payload={"items": [2]})
+
+    await queue.update_metrics()
+
+    assert jobqueue.depth_gauge.get(kind="test") == 2  # noqa: PLR2004
+    assert jobqueue.oldest_age_gauge.get(kind="test") >= 0
+
+
+@pytest.mark.asyncio
+async def test_queue_full(
+    queue: SQLAlchemyJobQueue,
+    executed: list[dict],
+):
+    """
+    Given a database job queue with a maximum number of pending jobs
+    When we enqueue more jobs than that
+    Then a QueueFullException is raised.
+    """
+    queue.settings.max_pending_jobs = 2
+    await queue.enqueue(kind="test", key="a", payload={"items": [1]})
+    await queue.enqueue(kind="test", key="b", payload={"items": [2]})
+
+    with pytest.raises(QueueFullException):
+        await queue.enqueue(kind="test", key="c", payload={"items": [3]})
+
+
+@pytest.mark.asyncio
+async def test_visibility_timeout_extended(
+    queue: SQLAlchemyJobQueue,
+    session_factory: async_sessionmaker,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    Given a job which takes longer than the visibility timeout
+    When a worker executes the job
+    Then the job isn't claimed by another worker in the meantime
+    And the job is executed once.
+    """
+    queue.settings.visibility_timeout_s = 0.3
+    handler_started = asyncio.Event()
+    executed_count = 0
+
+    async def slow_handler(payload: dict):
+        nonlocal executed_count
+        handler_started.set()
+        await asyncio.sleep(0.6)
+        executed_count += 1
+
+    monkeypatch.setitem(jobqueue.job_types, "test", JobType(handler=slow_handler))
+    await queue.enqueue(kind="test", key="a", payload={})
+
+    execution = asyncio.create_task(queue.execute(await queue.claim()))
+    await asyncio.wait_for(handler_started.wait(), timeout=5)
+    for _ in range(6):
+        await asyncio.sleep(0.1)
+        assert await queue.claim() is None
+    await execution
+
+    assert executed_count == 1
+    assert await get_jobs(session_factory) == []
+
+
+@pytest.mark.asyncio
+async def test_coalescing_ratio(
+    queue: SQLAlchemyJobQueue,
+    executed: list[dict],
+):
+    """
+    Given a database job queue
+    When we enqueue jobs which are coalesced
+    Then the coalescing ratio is updated.
+    """
+    for index in range(3):
+        await queue.enqueue(
+            kind="test",
+            key="a",
+            payload={"items": [index]},
+            coalesce_window_s=60,
+        )
+    await queue.enqueue(
+        kind="test",
+        key="b",
+        payload={"items": [3]},
+        coalesce_window_s=60,
+    )
+
+    assert ratio_gauge.get(coalescer="test") == 2  # noqa: PLR2004
@@ -0,0 +1,168 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.domain.remoterepository.remoteopenairepository import (
+    RemoteOpenAiRepository,
+)
+from slackhealthbot.domain.usecases.fitbit import (
+    usecase_pregenerate_motivational_messages,
+)
+from slackhealthbot.domain.usecases.slack.usecase_post_daily_activity import (
+    create_motivational_prompt,
+)
+from slackhealthbot.main import app
+from slackhealthbot.settings import Goals, Settings
+from tests.testsupport.factories.factories import (
+    FitbitActivityFactory,
+    FitbitUserFactory,
+    UserFactory,
+)
+
+
+class FakeOpenAiRepository(RemoteOpenAiRepository):
+    def __init__(self, latency_s: float = 0):
+        self.latency_s = latency_s
+        self.prompts: list[str] = []
+
+    async def create_response(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.latency_s)
+        return "Keep going!"
+
+
+@pytest.fixture
+def report_settings(monkeypatch: pytest.MonkeyPatch, settings: Settings):
+    activities = settings.app_settings.fitbit.activities
+    activity_type = activities.get_activity_type(123)
+    report = activity_type.report.model_copy(
+        update={
+            "daily_goals": Goals(distance_km=1.0),
+            "ai_motivational_message_frequency_days": 3,
+        }
+    )
+    monkeypatch.setattr(
+        activities,
+        "activity_types",
+        [
+            activity_type.model_copy(update={"report": report}),
+            *(x for x in activities.activity_types if x.id != activity_type.id),
+        ],
+    )
+
+
+def _create_streak(
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+    slack_alias: str,
+    days: list[dt.date],
+):
+    user_factory, _, fitbit_activity_factory = fitbit_factories
+    user = user_factory.create(slack_alias=slack_alias)
+    for day in days:
+        fitbit_activity_factory.create(
+            fitbit_user_id=user.fitbit.id,
+            type_id=123,
+            distance_km=5.0,
+            logged_at=dt.datetime.combine(day, dt.time(hour=10)),
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("report_settings")
+async def test_upcoming_milestones_generated(
+    mocked_async_session: AsyncSession,
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+):
+    """
+    Given a user whose streak reaches a milestone if they meet their goal today
+    And a user whose streak doesn't
+    When we generate the motivational messages of today's reports
+    Then only the message of the first user is generated and cached
+    And it isn't generated again.
+    """
+    today = dt.date(2024, 8, 2)
+    _create_streak(
+        fitbit_factories,
+        slack_alias="jdoe",
+        days=[today - dt.timedelta(days=2), today - dt.timedelta(days=1)],
+    )
+    _create_streak(
+        fitbit_factories,
+        slack_alias="jsmith",
+        days=[today - dt.timedelta(days=1)],
+    )
+    openai_repository = FakeOpenAiRepository()
+    prompt = create_motivational_prompt(
+        slack_alias="jdoe",
+        activity_name="Dancing",
+        streak_days=3,
+        distance_km=1.0,
+    )
+
+    with app.container.openai_repository.override(openai_repository):
+        await usecase_pregenerate_motivational_messages.do(
+            type_ids={123},
+            when=today,
+        )
+        await usecase_pregenerate_motivational_messages.do(
+            type_ids={123},
+            when=today,
+        )
+
+    assert openai_repository.prompts == [prompt]
+    message_repository = app.container.motivational_message_repository()
+    assert await message_repository.get_message(prompt) == "Keep going!"
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("report_settings")
+async def test_generation_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+    mocked_async_session: AsyncSession,
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+    settings: Settings,
+):
+    """
+    Given a user whose streak reaches a milestone if they meet their goal today
+    When the generation of their motivational message times out
+    Then no message is cached, so that the report uses a local template.
+    """
+    today = dt.date(2024, 8, 2)
+    _create_streak(
+        fitbit_factories,
+        slack_alias="jdoe",
+        days=[today - dt.timedelta(days=2), today - dt.timedelta(days=1)],
+    )
+    monkeypatch.setattr(
+        settings.app_settings.openai.motivational_messages, "timeout_s", 0.01
+    )
+    timeouts_before = usecase_pregenerate_motivational_messages.generations_counter.get(
+        outcome="timeout"
+    )
+
+    with app.container.openai_repository.override(FakeOpenAiRepository(latency_s=5)):
+        await usecase_pregenerate_motivational_messages.do(
+            type_ids={123},
+            when=today,
+        )
+
+    message_repository = app.container.motivational_message_repository()
+    assert (
+        await message_repository.get_message(
+            create_motivational_prompt(
+                slack_alias="jdoe",
+                activity_name="Dancing",
+                streak_days=3,
+                distance_km=1.0,
+            )
+        )
+        is None
+    )
+    assert (
+        usecase_pregenerate_motivational_messages.generations_counter.get(
+            outcome="timeout"
+        )
+        == timeouts_before + 1
+    )
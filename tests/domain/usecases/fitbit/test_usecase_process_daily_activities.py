@@ -14,7 +14,12 @@ from slackhealthbot.data.repositories.sqlalchemyfitbitrepository import (
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
 )
-from slackhealthbot.domain.usecases.fitbit import usecase_process_daily_activities
+from slackhealthbot.domain.models.activity import DailyActivityStats
+from slackhealthbot.domain.usecases.fitbit import (
+    usecase_pregenerate_motivational_messages,
+    usecase_process_daily_activities,
+    usecase_process_daily_activity,
+)
 from slackhealthbot.main import app
 from slackhealthbot.settings import AppSettings, SecretSettings, Settings
 from tests.testsupport.factories.factories import (
@@ -23,22 +28,10 @@ from tests.testsupport.factories.factories import (
     UserFactory,
 )
 from tests.testsupport.mock.builtins import freeze_time
+from tests.testsupport.mock.openai import streamed_response
 
-OPENAI_SUCCESS_RESPONSE = Response(
-    status_code=200,
-    json={
-        "output": [
-            {
-                "type": "message",
-                "content": [
-                    {
-                        "type": "output_text",
-                        "text": "Here is your nice motivational message",
-                    }
-                ],
-            }
-        ],
-    },
+OPENAI_SUCCESS_RESPONSE = streamed_response(
+    deltas=["Here is your nice motivational message"],
 )
 
 OPENAI_ERROR_RESPONSE = Response(status_code=503)
@@ -173,7 +166,7 @@ fitbit:
 Here is your nice motivational message""",
     ),
     DailyActivityScenario(
-        id="distance only, met goal today, yesterday, and goal prior date, lax streak, no motivational message because openai not working",
+        id="distance only, met goal today, yesterday, and goal prior date, lax streak, template motivational message because openai not working",
         custom_conf="""
 fitbit:
   activities:
@@ -193,7 +186,8 @@ fitbit:
 """,
         mock_openai_response=OPENAI_ERROR_RESPONSE,
         expected_activity_message="""New daily Treadmill activity from <@jdoe>:
-    • Distance: 15.000 km ⬆️ New record (last 180 days)! 🏆 Goal reached! 👍 3 day streak! 👏""",
+    • Distance: 15.000 km ⬆️ New record (last 180 days)! 🏆 Goal reached! 👍 3 day streak! 👏
+🎉 3 days of Treadmill in a row, over 2.0 km every day. Keep it up! 💪""",
     ),
     DailyActivityScenario(
         id="no goal, lax streak",
@@ -473,6 +467,12 @@ async def test_process_daily_activities(  # noqa: PLR0913
             frozen_datetime_args=(2024, 8, 2, 10, 44, 55),
         )
         with app.container.settings.override(settings):
+            # The motivational messages are generated ahead of the reports.
+            await usecase_pregenerate_motivational_messages.do(
+                local_fitbit_repo=local_fitbit_repository,
+                type_ids={activity_type},
+                when=today.date(),
+            )
             await usecase_process_daily_activities.do(
                 local_fitbit_repo=local_fitbit_repository,
                 type_ids={activity_type},
@@ -484,3 +484,81 @@ async def test_process_daily_activities(  # noqa: PLR0913
     ]
 
     assert actual_activity_message == scenario.expected_activity_message
+
+
+@pytest.mark.asyncio
+async def test_prepared_reports(
+    monkeypatch: pytest.MonkeyPatch,
+    respx_mock: MockRouter,
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+    settings: Settings,
+):
+    """
+    Given the daily reports of two users prepared ahead of the post time
+    When one user logs another activity before the post time
+    Then only the report of that user is created again at the post time
+    And the reports are posted in order, with the new activity.
+    """
+    user_factory, _, fitbit_activity_factory = fitbit_factories
+    today = dt.datetime(2024, 8, 2, 10, 44, 55)
+    activity_type = 90019
+    users: list[models.User] = [
+        user_factory.create(slack_alias=slack_alias)
+        for slack_alias in ("jdoe", "jsmith")
+    ]
+    for user in users:
+        fitbit_activity_factory.create(
+            fitbit_user_id=user.fitbit.id,
+            type_id=activity_type,
+            logged_at=today,
+        )
+    slack_request = respx_mock.post(
+        f"{settings.secret_settings.slack_webhook_url}"
+    ).mock(return_value=Response(200))
+    created_reports: list[str] = []
+    create_message = usecase_process_daily_activity.create_message
+
+    async def spy_create_message(daily_activity: DailyActivityStats) -> str:
+        created_reports.append(daily_activity.slack_alias)
+        return await create_message(daily_activity=daily_activity)
+
+    monkeypatch.setattr(
+        usecase_process_daily_activity, "create_message", spy_create_message
+    )
+    freeze_time(
+        monkeypatch,
+        dt_module_to_freeze=dt_to_freeze,
+        frozen_datetime_args=(2024, 8, 2, 23, 40),
+    )
+
+    # Given the daily reports of two users prepared ahead of the post time
+    async with app.container.db_scope():
+        prepared_reports = await usecase_process_daily_activities.prepare(
+            type_ids={activity_type},
+        )
+    assert created_reports == ["jdoe", "jsmith"]
+
+    # When one user logs another activity before the post time
+    fitbit_activity_factory.create(
+        fitbit_user_id=users[1].fitbit.id,
+        type_id=activity_type,
+        logged_at=today + dt.timedelta(hours=1),
+    )
+    created_reports.clear()
+    async with app.container.db_scope():
+        await usecase_process_daily_activities.do(
+            type_ids={activity_type},
+            prepared_reports=prepared_reports,
+        )
+
+    # Then only the report of that user is created again at the post time
+    assert created_reports == ["jsmith"]
+    # And the reports are posted in order, with the new activity.
+    messages = [
+        json.loads(call.request.content)["text"] for call in slack_request.calls
+    ]
+    assert len(messages) == 2  # noqa: PLR2004
+    assert "<@jdoe>" in messages[0]
+    assert "Activity count: 1" in messages[0]
+    assert "<@jsmith>" in messages[1]
+    assert "Activity count: 2" in messages[1]
@@ -0,0 +1,178 @@
+"""
+Benchmark of the daily reports: the reports of different users are created
+in parallel, with simulated database and slack latencies, and posted in order.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import time
+
+import pytest
+
+from slackhealthbot.data.repositories.sqlalchemyfitbitrepository import (
+    datetime as dt_to_freeze,
+)
+from slackhealthbot.domain.localrepository.localmotivationalmessagerepository import (
+    LocalMotivationalMessageRepository,
+)
+from slackhealthbot.domain.remoterepository.remoteslackrepository import (
+    RemoteSlackRepository,
+)
+from slackhealthbot.domain.usecases.fitbit import usecase_process_daily_activities
+from slackhealthbot.main import app
+from slackhealthbot.settings import Goals, Settings
+from tests.testsupport.factories.factories import (
+    FitbitActivityFactory,
+    FitbitUserFactory,
+    UserFactory,
+)
+from tests.testsupport.mock.builtins import freeze_time
+
+MESSAGE_LATENCY_S = 0.05
+SLACK_LATENCY_S = 0.01
+
+
+class SlowMotivationalMessageRepository(LocalMotivationalMessageRepository):
+    """
+    Records how many motivational messages are read concurrently.
+    """
+
+    def __init__(self, wait_for_running_count: int | None = None):
+        """
+        :param wait_for_running_count: if set, the read of a message
+            only completes once that many messages were read concurrently.
+        """
+        self.wait_for_running_count = wait_for_running_count
+        self.running_count = 0
+        self.max_running_count = 0
+        self._enough_running = asyncio.Event()
+
+    async def get_message(self, prompt: str) -> str | None:
+        self.running_count += 1
+        self.max_running_count = max(self.max_running_count, self.running_count)
+        if self.running_count == self.wait_for_running_count:
+            self._enough_running.set()
+        try:
+            await asyncio.sleep(MESSAGE_LATENCY_S)
+            if self.wait_for_running_count is not None:
+                await asyncio.wait_for(self._enough_running.wait(), timeout=5)
+        finally:
+            self.running_count -= 1
+        return "Keep going!"
+
+    async def put_message(
+        self,
+        prompt: str,
+        message: str,
+        ttl: dt.timedelta,
+    ):
+        pass
+
+
+class SlowSlackRepository(RemoteSlackRepository):
+    def __init__(self):
+        self.messages: list[str] = []
+
+    async def post_message(self, message: str):
+        await asyncio.sleep(SLACK_LATENCY_S)
+        self.messages.append(message)
+
+
+async def _post_daily_reports(
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+    concurrency: int,
+    message_repository: SlowMotivationalMessageRepository,
+) -> tuple[list[str], float]:
+    """
+    :return: the messages posted to slack, and the duration of the daily job.
+    """
+    monkeypatch.setattr(
+        settings.app_settings.fitbit.activities, "daily_report_concurrency", concurrency
+    )
+    slack_repository = SlowSlackRepository()
+    with (
+        app.container.slack_repository.override(slack_repository),
+        app.container.motivational_message_repository.override(message_repository),
+    ):
+        start = time.monotonic()
+        async with app.container.db_scope():
+            await usecase_process_daily_activities.do(type_ids={123})
+        duration_s = time.monotonic() - start
+    return slack_repository.messages, duration_s
+
+
+@pytest.mark.asyncio
+async def test_daily_reports_created_in_parallel(
+    monkeypatch: pytest.MonkeyPatch,
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+    settings: Settings,
+):
+    """
+    Given many users with an activity today, each reaching a goal which
+      triggers a motivational message
+    When we post the daily reports in parallel
+    Then as many reports as allowed are created at the same time
+    And they're posted in the same order as one at a time.
+    """
+    user_count = 20
+    user_factory, _, fitbit_activity_factory = fitbit_factories
+    today = dt.datetime(2024, 8, 2, 10, 44, 55)
+    for index in range(user_count):
+        user = user_factory.create(slack_alias=f"user{index}")
+        fitbit_activity_factory.create(
+            fitbit_user_id=user.fitbit.id,
+            type_id=123,
+            distance_km=5.0,
+            logged_at=today,
+        )
+    activities = settings.app_settings.fitbit.activities
+    activity_type = activities.get_activity_type(123)
+    report = activity_type.report.model_copy(
+        update={
+            "daily_goals": Goals(distance_km=1.0),
+            "ai_motivational_message_frequency_days": 1,
+        }
+    )
+    monkeypatch.setattr(
+        activities,
+        "activity_types",
+        [
+            activity_type.model_copy(update={"report": report}),
+            *(x for x in activities.activity_types if x.id != activity_type.id),
+        ],
+    )
+    freeze_time(
+        monkeypatch,
+        dt_module_to_freeze=dt_to_freeze,
+        frozen_datetime_args=(2024, 8, 2, 23, 50),
+    )
+
+    concurrency = 8
+    sequential_message_repository = SlowMotivationalMessageRepository()
+    sequential_messages, sequential_duration_s = await _post_daily_reports(
+        monkeypatch,
+        settings,
+        concurrency=1,
+        message_repository=sequential_message_repository,
+    )
+    parallel_message_repository = SlowMotivationalMessageRepository(
+        wait_for_running_count=concurrency
+    )
+    parallel_messages, parallel_duration_s = await _post_daily_reports(
+        monkeypatch,
+        settings,
+        concurrency=concurrency,
+        message_repository=parallel_message_repository,
+    )
+
+    logging.info(
+        f"{user_count} daily reports: {sequential_duration_s:.2f}s one at a time, "
+        f"{parallel_duration_s:.2f}s in parallel"
+    )
+    assert len(parallel_messages) == user_count
+    assert all("Keep going!" in message for message in parallel_messages)
+    assert parallel_messages == sequential_messages
+    assert sequential_message_repository.max_running_count == 1
+    assert parallel_message_repository.max_running_count == concurrency
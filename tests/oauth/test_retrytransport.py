@@ -0,0 +1,215 @@
+import datetime as dt
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from slackhealthbot.oauth.retrytransport import (
+    IDEMPOTENT_EXTENSION,
+    RetryTransport,
+    parse_retry_after_s,
+    remote_request_duration_histogram,
+    remote_request_retries_counter,
+)
+from slackhealthbot.settings import Retry
+
+FAST_POLICY = Retry(
+    max_attempts=3,
+    backoff_base_s=0.001,
+    backoff_max_s=0.001,
+    total_budget_s=5.0,
+)
+
+
+def _create_client(
+    responses: list[httpx.Response],
+    requests: list[httpx.Request],
+    policy: Retry = FAST_POLICY,
+) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses.pop(0)
+
+    return httpx.AsyncClient(
+        transport=RetryTransport(
+            provider="test",
+            policy=policy,
+            transport=httpx.MockTransport(handler),
+        )
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    argnames="status_code",
+    argvalues=[429, 500, 502, 503, 504],
+)
+async def test_get_retried(status_code: int):
+    """
+    Given a server which fails once with a retryable status code
+    When we execute a GET request
+    Then the request is retried
+    And the successful response is returned.
+    """
+    requests = []
+    async with _create_client(
+        responses=[httpx.Response(status_code), httpx.Response(200)],
+        requests=requests,
+    ) as client:
+        response = await client.get("https://example.com/data")
+
+    assert len(requests) == 2  # noqa: PLR2004
+    assert response.status_code == 200  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    """
+    Given a server which fails once with a retryable status code
+    When we execute a GET request
+    Then each attempt is timed with its status code
+    And the retry is counted.
+    """
+    remote_request_duration_histogram.clear()
+    remote_request_retries_counter.clear()
+    async with _create_client(
+        responses=[httpx.Response(503), httpx.Response(200)],
+        requests=[],
+    ) as client:
+        await client.get("https://example.com/data")
+
+    assert remote_request_duration_histogram.get(provider="test", status="503") == 1
+    assert remote_request_duration_histogram.get(provider="test", status="200") == 1
+    assert remote_request_retries_counter.get(provider="test") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    argnames="status_code",
+    argvalues=[400, 401, 404],
+)
+async def test_get_not_retried(status_code: int):
+    """
+    Given a server which fails with a non-retryable status code
+    When we execute a GET request
+    Then the request is not retried.
+    """
+    requests = []
+    async with _create_client(
+        responses=[httpx.Response(status_code), httpx.Response(200)],
+        requests=requests,
+    ) as client:
+        response = await client.get("https://example.com/data")
+
+    assert len(requests) == 1
+    assert response.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_max_attempts():
+    """
+    Given a server which always fails with a retryable status code
+    When we execute a GET request
+    Then the request is attempted max_attempts times
+    And the last failed response is returned.
+    """
+    requests = []
+    async with _create_client(
+        responses=[httpx.Response(503) for _ in range(5)],
+        requests=requests,
+    ) as client:
+        response = await client.get("https://example.com/data")
+
+    assert len(requests) == FAST_POLICY.max_attempts
+    assert response.status_code == 503  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    argnames=["status_code", "extensions", "expected_request_count"],
+    argvalues=[
+        (503, {}, 1),
+        (503, {IDEMPOTENT_EXTENSION: True}, 2),
+        (429, {}, 2),
+    ],
+)
+async def test_post(
+    status_code: int,
+    extensions: dict,
+    expected_request_count: int,
+):
+    """
+    Given a server which fails once with a retryable status code
+    When we execute a POST request
+    Then the request is retried only if it's a 429
+      or if the request is explicitly marked as idempotent.
+    """
+    requests = []
+    async with _create_client(
+        responses=[httpx.Response(status_code), httpx.Response(200)],
+        requests=requests,
+    ) as client:
+        await client.post(
+            "https://example.com/data",
+            data={"some": "data"},
+            extensions=extensions,
+        )
+
+    assert len(requests) == expected_request_count
+    assert all(request.content == b"some=data" for request in requests)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    argnames=["retry_after", "expected_request_count"],
+    argvalues=[
+        ("0", 2),
+        ("60", 1),
+    ],
+)
+async def test_retry_after_budget(
+    retry_after: str,
+    expected_request_count: int,
+):
+    """
+    Given a server which responds with a 429 and a Retry-After header
+    When we execute a GET request
+    Then the request is retried only if the Retry-After delay
+      fits in the retry budget.
+    """
+    requests = []
+    async with _create_client(
+        responses=[
+            httpx.Response(429, headers={"Retry-After": retry_after}),
+            httpx.Response(200),
+        ],
+        requests=requests,
+    ) as client:
+        await client.get("https://example.com/data")
+
+    assert len(requests) == expected_request_count
+
+
+@pytest.mark.parametrize(
+    argnames=["value", "expected_delay_s"],
+    argvalues=[
+        (None, None),
+        ("", None),
+        ("garbage", None),
+        ("12", 12.0),
+        ("-3", 0.0),
+        (
+            format_datetime(dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc), True),
+            0.0,
+        ),
+    ],
+)
+def test_parse_retry_after(value: str | None, expected_delay_s: float | None):
+    assert parse_retry_after_s(value) == expected_delay_s
+
+
+def test_parse_retry_after_date():
+    value = format_datetime(
+        dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=30), True
+    )
+    assert 25 < parse_retry_after_s(value) <= 30  # noqa: PLR2004
@@ -0,0 +1,159 @@
+import datetime
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from httpx import Response
+from respx import MockRouter
+
+from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.core.ttlcache import TTLCache
+from slackhealthbot.main import app, lifespan
+from slackhealthbot.remoteservices.repositories.webapifitbitrepository import (
+    WebApiFitbitRepository,
+)
+from slackhealthbot.settings import Settings
+from tests.testsupport.testdata.fitbit_scenarios import (
+    activity_scenarios,
+    sleep_scenarios,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest_asyncio.fixture
+async def repo(
+    settings: Settings, clock: FakeClock
+) -> AsyncGenerator[WebApiFitbitRepository, None]:
+    async with lifespan(app):
+        yield WebApiFitbitRepository(
+            settings=settings,
+            response_cache=TTLCache(max_entries=10, ttl_s=5, clock=clock),
+        )
+
+
+@pytest.fixture
+def oauth_fields() -> OAuthFields:
+    return OAuthFields(
+        oauth_userid="someuser",
+        oauth_access_token="some access token",
+        oauth_refresh_token="some refresh token",
+        oauth_expiration_date=datetime.datetime.now(datetime.timezone.utc)
+        + datetime.timedelta(days=1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_sleep_cache(
+    respx_mock: MockRouter,
+    settings: Settings,
+    repo: WebApiFitbitRepository,
+    oauth_fields: OAuthFields,
+    clock: FakeClock,
+):
+    """
+    Given a fitbit user
+    When we fetch the sleep multiple times within the time to live
+    Then the sleep is only fetched once from fitbit
+    When the time to live expires
+    Then the sleep is fetched again from fitbit.
+    """
+    scenario = sleep_scenarios["No previous sleep data"]
+    sleep_request = respx_mock.get(
+        url=f"{settings.fitbit_oauth_settings.base_url}1.2/user/-/sleep/date/2023-05-13.json",
+    ).mock(Response(status_code=200, json=scenario.input_mock_fitbit_response))
+
+    for _ in range(3):
+        sleep_data = await repo.get_sleep(
+            oauth_fields=oauth_fields, when=datetime.date(2023, 5, 13)
+        )
+        assert sleep_data == scenario.expected_new_last_sleep_data
+    assert sleep_request.call_count == 1
+
+    clock.now += 5
+    await repo.get_sleep(oauth_fields=oauth_fields, when=datetime.date(2023, 5, 13))
+    assert sleep_request.call_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_activities_cache(
+    respx_mock: MockRouter,
+    settings: Settings,
+    repo: WebApiFitbitRepository,
+    oauth_fields: OAuthFields,
+    clock: FakeClock,
+):
+    """
+    Given a fitbit user
+    When we fetch the activities multiple times within the time to live
+    Then the activities are only fetched once from fitbit
+    When the time to live expires
+    Then the activities are fetched again from fitbit.
+    """
+    scenario = activity_scenarios["No previous activity data, new Spinning activity"]
+    activities_request = respx_mock.get(
+        url=f"{settings.fitbit_oauth_settings.base_url}1/user/-/activities/list.json",
+    ).mock(Response(status_code=200, json=scenario.input_mock_fitbit_response))
+
+    for _ in range(3):
+        activities = await repo.get_activities_for_date(
+            oauth_fields=oauth_fields, when=datetime.date(2023, 1, 23)
+        )
+        assert [data.log_id for _, data in activities] == [
+            scenario.expected_new_last_activity_log_id
+        ]
+    assert activities_request.call_count == 1
+
+    clock.now += 5
+    await repo.get_activities_for_date(
+        oauth_fields=oauth_fields, when=datetime.date(2023, 1, 23)
+    )
+    assert activities_request.call_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_empty_results_not_cached(
+    respx_mock: MockRouter,
+    settings: Settings,
+    repo: WebApiFitbitRepository,
+    oauth_fields: OAuthFields,
+):
+    """
+    Given a fitbit user without sleep or activities yet
+    When we fetch the sleep and activities multiple times
+    Then they are fetched from fitbit every time.
+    """
+    sleep_request = respx_mock.get(
+        url=f"{settings.fitbit_oauth_settings.base_url}1.2/user/-/sleep/date/2023-05-13.json",
+    ).mock(Response(status_code=200, json={"sleep": []}))
+    activities_request = respx_mock.get(
+        url=f"{settings.fitbit_oauth_settings.base_url}1/user/-/activities/list.json",
+    ).mock(Response(status_code=200, json={"activities": []}))
+
+    for _ in range(2):
+        assert (
+            await repo.get_sleep(
+                oauth_fields=oauth_fields, when=datetime.date(2023, 5, 13)
+            )
+            is None
+        )
+        assert (
+            await repo.get_activities_for_date(
+                oauth_fields=oauth_fields, when=datetime.date(2023, 5, 13)
+            )
+            == []
+        )
+
+    assert sleep_request.call_count == 2  # noqa: PLR2004
+    assert activities_request.call_count == 2  # noqa: PLR2004
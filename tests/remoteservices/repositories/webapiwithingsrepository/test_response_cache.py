@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+from httpx import Response
+from respx import MockRouter
+
+from slackhealthbot.core.models import OAuthFields
+from slackhealthbot.main import app, lifespan
+from slackhealthbot.settings import Settings
+
+
+@pytest.mark.asyncio
+async def test_response_cache(
+    respx_mock: MockRouter,
+    settings: Settings,
+):
+    """
+    Given a withings user
+    When we fetch the last weight multiple times for the same notification
+    Then the weight is only fetched once from withings
+    When we fetch the last weight for a newer notification
+    Then the weight is fetched again from withings.
+    """
+    # Given a withings user
+    oauth_fields = OAuthFields(
+        oauth_userid="someuser",
+        oauth_access_token="some access token",
+        oauth_refresh_token="some refresh token",
+        oauth_expiration_date=datetime.datetime.now(datetime.timezone.utc)
+        + datetime.timedelta(days=1),
+    )
+    weight_request = respx_mock.post(
+        url=f"{settings.app_settings.withings.base_url}measure",
+    ).mock(
+        return_value=Response(
+            status_code=200,
+            json={
+                "status": 0,
+                "body": {"measuregrps": [{"measures": [{"value": 50, "unit": 0}]}]},
+            },
+        )
+    )
+
+    async with lifespan(app):
+        repo = app.container.remote_withings_repository()
+
+        # When we fetch the last weight multiple times for the same notification
+        for _ in range(3):
+            weight_kg = await repo.get_last_weight_kg(
+                oauth_fields=oauth_fields,
+                startdate=1683894606,
+                enddate=1686570821,
+            )
+            assert weight_kg == 50  # noqa: PLR2004
+
+        # Then the weight is only fetched once from withings
+        assert weight_request.call_count == 1
+
+        # When we fetch the last weight for a newer notification
+        await repo.get_last_weight_kg(
+            oauth_fields=oauth_fields,
+            startdate=1683894606,
+            enddate=1686570822,
+        )
+
+        # Then the weight is fetched again from withings.
+        assert weight_request.call_count == 2  # noqa: PLR2004
@@ -1,14 +1,19 @@
+import asyncio
 import dataclasses
+from typing import AsyncIterator
 
 import pytest
 from httpx import Response
 from respx import MockRouter
 
 from slackhealthbot.main import app
+from slackhealthbot.remoteservices.repositories import webopenairepository
 from slackhealthbot.remoteservices.repositories.webopenairepository import (
     WebOpenAiRepository,
+    create_openai_client,
 )
 from slackhealthbot.settings import SecretSettings, Settings
+from tests.testsupport.mock.openai import streamed_response
 
 
 def _create_web_openai_repository(api_key: str | None) -> WebOpenAiRepository:
@@ -17,7 +22,7 @@ def _create_web_openai_repository(api_key: str | None) -> WebOpenAiRepository:
         app_settings=orig_settings.app_settings,
         secret_settings=SecretSettings(openai_api_key=api_key),
     )
-    return WebOpenAiRepository(mock_settings)
+    return WebOpenAiRepository(mock_settings, create_openai_client(mock_settings))
 
 
 @pytest.mark.asyncio
@@ -92,25 +97,13 @@ async def test_openai_ok(
 
     # And OpenAI returns with a motivational message
     # Mock an openai response
-    # https://platform.openai.com/docs/api-reference/responses/create
+    # https://platform.openai.com/docs/api-reference/responses-streaming
     mock_openai = respx_mock.post("https://api.openai.com/v1/responses").mock(
-        return_value=Response(
-            status_code=200,
-            json={
-                "output": [
-                    {
-                        "type": "message",
-                        "content": [
-                            {
-                                "type": "output_text",
-                                "text": "Here is your nice motivational message",
-                            }
-                        ],
-                    }
-                ],
-            },
+        return_value=streamed_response(
+            deltas=["Here is your nice ", "motivational message"],
         )
     )
+    input_tokens_before = webopenairepository.tokens_counter.get(kind="input")
 
     # When the method to create a motivational message is called
     actual_message = await repo.create_response("some prompt")
@@ -120,6 +113,10 @@ async def test_openai_ok(
 
     # And the motivational message is returned.
     assert actual_message == "Here is your nice motivational message"
+    assert (
+        webopenairepository.tokens_counter.get(kind="input")
+        == input_tokens_before + 42  # noqa: PLR2004
+    )
 
 
 @pytest.mark.asyncio
@@ -207,3 +204,62 @@ async def test_openai_unparseable_result(
 
     # And None is returned
     assert actual_message is None
+
+
+@pytest.mark.asyncio
+async def test_openai_latency_budget(
+    monkeypatch: pytest.MonkeyPatch,
+    respx_mock: MockRouter,
+):
+    """
+    Given the settings with a good api key configured.
+    And OpenAI stops streaming its response after the first part
+    When the method to create a motivational message is called
+    Then the response is cut off at the latency budget
+    And the part received until then is returned.
+    """
+    # Given the settings with a good api key configured.
+    repo = _create_web_openai_repository("good key")
+    # The test expires the budget once the first part is received, instead
+    # of waiting for it: the time it takes to receive the first part
+    # depends on the load of the machine.
+    budgets: list[asyncio.Timeout] = []
+    create_timeout = asyncio.timeout
+
+    def create_budget(delay: float | None) -> asyncio.Timeout:
+        budget = create_timeout(delay)
+        budgets.append(budget)
+        return budget
+
+    monkeypatch.setattr(webopenairepository.asyncio, "timeout", create_budget)
+
+    # And OpenAI stops streaming its response after the first part
+    first_part = streamed_response(deltas=["Keep going! "], completed=False).content
+
+    async def stalled_stream() -> AsyncIterator[bytes]:
+        yield first_part
+        # The client asks for more once it has processed the first part.
+        [budget] = budgets
+        budget.reschedule(asyncio.get_running_loop().time())
+        await asyncio.sleep(30)
+
+    respx_mock.post("https://api.openai.com/v1/responses").mock(
+        return_value=Response(
+            status_code=200,
+            headers={"content-type": "text/event-stream"},
+            content=stalled_stream(),
+        )
+    )
+    truncated_before = webopenairepository.requests_counter.get(outcome="truncated")
+
+    # When the method to create a motivational message is called
+    actual_message = await repo.create_response("some prompt")
+
+    # Then the response is cut off at the latency budget
+    assert (
+        webopenairepository.requests_counter.get(outcome="truncated")
+        == truncated_before + 1
+    )
+
+    # And the part received until then is returned.
+    assert actual_message == "Keep going!"
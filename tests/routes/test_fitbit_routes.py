@@ -1,6 +1,7 @@
 import datetime
 import json
 import re
+from contextlib import asynccontextmanager
 from operator import attrgetter
 
 import pytest
@@ -8,12 +9,18 @@ from fastapi import status
 from fastapi.testclient import TestClient
 from httpx import Response
 from respx import MockRouter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from slackhealthbot.data.database.connection import session_scope
 from slackhealthbot.data.database.models import FitbitUser, User
+from slackhealthbot.data.repositories.sqlalchemyfitbitrepository import (
+    SQLAlchemyFitbitRepository,
+)
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
 )
 from slackhealthbot.domain.models.activity import ActivityData, ActivityZone
+from slackhealthbot.routers import fitbit as fitbit_router
 from slackhealthbot.routers.fitbit import datetime as dt_to_freeze
 from slackhealthbot.settings import Settings
 from tests.testsupport.factories.factories import (
@@ -223,13 +230,20 @@ async def test_activity_notification(  # noqa PLR0913
 )
 def test_notification_unknown_user(
     client: TestClient,
+    respx_mock: MockRouter,
+    settings: Settings,
     collectionType: str,
 ):
     """
     Given some data in the db
     When we receive a fitbit notification for an unknown user
-    Then the webhook returns the expected error.
+    Then the webhook returns immediately with a success
+    And nothing is posted to slack.
     """
+    slack_request = respx_mock.post(
+        f"{settings.secret_settings.slack_webhook_url}"
+    ).mock(return_value=Response(200))
+
     # When we receive a fitbit notification for an unknown user
     with client:
         response = client.post(
@@ -245,8 +259,11 @@ def test_notification_unknown_user(
             ),
         )
 
-    # Then the webhook returns the expected error.
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    # Then the webhook returns immediately with a success
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    # And nothing is posted to slack.
+    assert not slack_request.called
 
 
 @pytest.mark.asyncio
@@ -351,3 +368,79 @@ async def test_activity_notification_upserts_all_activities(
     zone_minutes = {x.zone: x.minutes for x in activity_2.zone_minutes}
     assert zone_minutes.get(ActivityZone.FAT_BURN) == 8  # noqa: PLR2004
     assert zone_minutes.get(ActivityZone.CARDIO) == 4  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_notifications_in_session_scope(  # noqa: PLR0913
+    async_connection_url: str,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    respx_mock: MockRouter,
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+    settings: Settings,
+):
+    """
+    Given two users, and the database session not overridden by the test
+    When we receive a sleep notification for each user
+    Then each notification is processed in its own session
+    And the last sleep of each user is saved in the database.
+    """
+    scenario = sleep_scenarios["No previous sleep data"]
+    user_factory, fitbit_user_factory, _ = fitbit_factories
+    fitbit_users: list[FitbitUser] = []
+    for _ in range(2):
+        user: User = user_factory.create(fitbit=None)
+        fitbit_users.append(
+            fitbit_user_factory.create(
+                user_id=user.id,
+                **scenario.input_initial_sleep_data,
+                oauth_expiration_date=datetime.datetime.now(datetime.timezone.utc)
+                + datetime.timedelta(days=1),
+            )
+        )
+
+    sessions: list[AsyncSession] = []
+
+    @asynccontextmanager
+    async def spy_session_scope(session_factory: async_sessionmaker):
+        async with session_scope(session_factory) as db:
+            sessions.append(db)
+            yield db
+
+    monkeypatch.setattr(fitbit_router, "session_scope", spy_session_scope)
+
+    respx_mock.get(
+        url=f"{settings.fitbit_oauth_settings.base_url}1.2/user/-/sleep/date/2023-05-12.json",
+    ).mock(Response(status_code=200, json=scenario.input_mock_fitbit_response))
+    respx_mock.post(f"{settings.secret_settings.slack_webhook_url}").mock(
+        return_value=Response(200)
+    )
+
+    with client:
+        response = client.post(
+            "/fitbit-notification-webhook/",
+            content=json.dumps(
+                [
+                    {
+                        "ownerId": fitbit_user.oauth_userid,
+                        "date": "2023-05-12",
+                        "collectionType": "sleep",
+                    }
+                    for fitbit_user in fitbit_users
+                ]
+            ),
+        )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert len(sessions) == 2  # noqa: PLR2004
+    assert sessions[0] is not sessions[1]
+
+    async with async_sessionmaker(
+        bind=create_async_engine(async_connection_url)
+    )() as db:
+        repo = SQLAlchemyFitbitRepository(db=db)
+        for fitbit_user in fitbit_users:
+            actual_last_sleep_data = await repo.get_sleep_by_user_lookup(
+                user_lookup=fitbit_user.lookup,
+            )
+            assert actual_last_sleep_data == scenario.expected_new_last_sleep_data
@@ -1,14 +1,17 @@
+import asyncio
 import datetime as dt
 import json
 from typing import Any
 from unittest.mock import patch
 
 import pytest
+from dependency_injector import providers
 from fastapi import status
 from fastapi.testclient import TestClient
 from httpx import Response
 from respx import MockRouter
 
+from slackhealthbot.core.workerpool import WorkerPool
 from slackhealthbot.data.database.models import FitbitUser, User
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
@@ -20,6 +23,7 @@ from slackhealthbot.domain.models.activity import (
 )
 from slackhealthbot.domain.models.sleep import SleepData
 from slackhealthbot.domain.usecases.google import usecase_process_new_data
+from slackhealthbot.main import app
 from slackhealthbot.settings import Settings
 from tests.testsupport.factories.factories import FitbitUserFactory, UserFactory
 
@@ -348,10 +352,10 @@ def test_ignore_unsupported_operation(
         url=f"{settings.google_oauth_settings.base_url}/v4/users/me/dataTypes/exercise/dataPoints",
     ).mock(Response(status_code=200, json={}))
 
-    with client, patch(
+    with patch(
         "slackhealthbot.domain.usecases.google.usecase_process_new_data.do",
         wraps=usecase_process_new_data.do,
-    ) as spy_task:
+    ) as spy_task, client:
         response = client.post(
             "/google-notification-webhook/",
             headers=authorization_headers,
@@ -417,10 +421,10 @@ def test_ignore_unsupported_data_type(
         url=f"{settings.google_oauth_settings.base_url}/v4/users/me/dataTypes/sleep/dataPoints",
     ).mock(Response(status_code=200, json={}))
 
-    with client, patch(
+    with patch(
         "slackhealthbot.domain.usecases.google.usecase_process_new_data.do",
         wraps=usecase_process_new_data.do,
-    ) as spy_task:
+    ) as spy_task, client:
         response = client.post(
             "/google-notification-webhook/",
             headers=authorization_headers,
@@ -484,10 +488,10 @@ def test_unknown_user(
         url=f"{settings.google_oauth_settings.base_url}/v4/users/me/dataTypes/sleep/dataPoints",
     ).mock(Response(status_code=200, json={}))
 
-    with client, patch(
+    with patch(
         "slackhealthbot.domain.usecases.google.usecase_process_new_data.do",
         wraps=usecase_process_new_data.do,
-    ) as spy_task:
+    ) as spy_task, client:
 
         response = client.post(
             "/google-notification-webhook/",
@@ -521,3 +525,55 @@ def test_unknown_user(
 
     # And no message is posted to slack.
     assert not slack_request.called
+
+
+def test_queue_full(
+    client: TestClient,
+    authorization_headers: dict[str, Any],
+):
+    """
+    Given a google worker pool which can only hold one pending notification
+    When google calls our webhook more times than the worker pool can handle
+    Then the webhook responds with a 503 error, asking google to retry later.
+    """
+
+    # Given a google worker pool which can only hold one pending notification
+    app.container.google_worker_pool.override(
+        providers.Singleton(
+            WorkerPool,
+            name="google",
+            worker_count=1,
+            max_queue_size=1,
+            retry_after_s=42,
+        )
+    )
+
+    async def slow_process_new_data(*_args, **_kwargs):
+        await asyncio.sleep(0.5)
+
+    # When google calls our webhook more times than the worker pool can handle
+    try:
+        with patch(
+            "slackhealthbot.domain.usecases.google.usecase_process_new_data.do",
+            side_effect=slow_process_new_data,
+        ), client:
+            responses = [
+                client.post(
+                    "/google-notification-webhook/",
+                    headers=authorization_headers,
+                    json=NOTIFICATION_BODY_SLEEP,
+                )
+                for _ in range(3)
+            ]
+    finally:
+        app.container.google_worker_pool.reset_override()
+
+    # Then the webhook responds with a 503 error, asking google to retry later.
+    assert responses[0].status_code == status.HTTP_204_NO_CONTENT
+    rejected_responses = [
+        response
+        for response in responses
+        if response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    ]
+    assert rejected_responses
+    assert rejected_responses[0].headers["Retry-After"] == "42"
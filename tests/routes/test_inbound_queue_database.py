@@ -0,0 +1,119 @@
+"""
+Tests for the webhook routes with the database job queue.
+"""
+
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from slackhealthbot.data.database import models
+from slackhealthbot.data.repositories.sqlalchemyjobqueue import SQLAlchemyJobQueue
+from slackhealthbot.domain.usecases.fitbit import usecase_process_new_sleep
+from slackhealthbot.domain.usecases.google import usecase_process_new_data
+from slackhealthbot.domain.usecases.withings import usecase_process_new_weight
+from slackhealthbot.main import app, lifespan
+from slackhealthbot.settings import Settings, StorageBackend
+
+
+def post_fitbit_notification(settings: Settings) -> dict[str, Any]:
+    return {
+        "url": "/fitbit-notification-webhook/",
+        "json": [
+            {
+                "ownerId": "someuser",
+                "date": "2023-05-12",
+                "collectionType": "sleep",
+            }
+        ],
+    }
+
+
+def post_withings_notification(settings: Settings) -> dict[str, Any]:
+    return {
+        "url": "/withings-notification-webhook/",
+        "headers": {"content-type": "application/x-www-form-urlencoded"},
+        "data": {"userid": "someuser", "startdate": 1, "enddate": 2},
+    }
+
+
+def post_google_notification(settings: Settings) -> dict[str, Any]:
+    return {
+        "url": "/google-notification-webhook/",
+        "headers": {
+            "authorization": f"Bearer {settings.secret_settings.google_webhook_authorization_token}"
+        },
+        "json": {
+            "data": {
+                "healthUserId": "someuser",
+                "operation": "UPSERT",
+                "dataType": "sleep",
+                "intervals": [
+                    {
+                        "civilIso8601TimeInterval": {
+                            "startTime": "2026-04-11T17:29:00",
+                        },
+                    }
+                ],
+            }
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    ids=["fitbit", "withings", "google"],
+    argnames=["usecase", "create_request"],
+    argvalues=[
+        (usecase_process_new_sleep, post_fitbit_notification),
+        (usecase_process_new_weight, post_withings_notification),
+        (usecase_process_new_data, post_google_notification),
+    ],
+)
+@pytest.mark.asyncio
+async def test_notification_processed(  # noqa: PLR0913
+    async_connection_url: str,
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+    usecase: Any,
+    create_request: Callable[[Settings], dict[str, Any]],
+):
+    """
+    Given the database job queue
+    When we receive a webhook notification
+    Then the notification is queued in the database
+    And it's processed by a worker, then removed from the database.
+    """
+    monkeypatch.setattr(
+        settings.app_settings.inbound_queue, "backend", StorageBackend.database
+    )
+    monkeypatch.setattr(settings.app_settings.inbound_queue, "poll_interval_s", 0.01)
+    processed = asyncio.Event()
+
+    async def process(*args, **kwargs):
+        processed.set()
+
+    monkeypatch.setattr(usecase, "do", process)
+    session_factory = async_sessionmaker(bind=create_async_engine(async_connection_url))
+
+    async with lifespan(app):
+        assert isinstance(app.container.job_queue(), SQLAlchemyJobQueue)
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            response = await ac.post(**create_request(settings))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        await asyncio.wait_for(processed.wait(), timeout=5)
+        async with asyncio.timeout(5):
+            while True:
+                async with session_factory() as db:
+                    job_count = await db.scalar(
+                        select(func.count()).select_from(models.InboundJob)
+                    )
+                if job_count == 0:
+                    break
+                await asyncio.sleep(0.01)
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from passlib.hash import pbkdf2_sha256
+
+from slackhealthbot.main import app, lifespan
+from slackhealthbot.settings import Settings
+
+
+@pytest.fixture
+def admin_password(settings: Settings) -> str:
+    settings.secret_settings.admin_password_hash = pbkdf2_sha256.hash("azerty")
+    return "azerty"
+
+
+def test_metrics_need_admin_credentials(
+    client: TestClient,
+    settings: Settings,
+    admin_password: str,
+):
+    """
+    Given a configured admin password
+    When we get the metrics without credentials, or with a wrong password
+    Then the access is denied.
+    """
+    username = settings.secret_settings.admin_username
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.headers["WWW-Authenticate"] == "Basic"
+
+    response = client.get("/metrics", auth=(username, "wrong"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_metrics(
+    client: TestClient,
+    settings: Settings,
+    admin_password: str,
+):
+    """
+    Given a configured admin password
+    And requests to a route with a path parameter
+    When we get the metrics with the admin credentials
+    Then the requests are timed, labelled with the path template of their route.
+    """
+    async with lifespan(app):
+        client.get("/v1/fitbit-authorization/jdoe", follow_redirects=False)
+
+        response = client.get(
+            "/metrics",
+            auth=(settings.secret_settings.admin_username, admin_password),
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/v1/fitbit-authorization/{slack_alias}"'
+    ) in response.text
+    assert "jdoe" not in response.text
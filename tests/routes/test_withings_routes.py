@@ -129,12 +129,19 @@ async def test_weight_notification(  # noqa: PLR0913
 
 def test_notification_unknown_user(
     client: TestClient,
+    respx_mock: MockRouter,
+    settings: Settings,
 ):
     """
     Given some data in the db
     When we receive a withings notification for an unknown user
-    Then the webhook returns the expected error.
+    Then the webhook returns immediately with a success
+    And nothing is posted to slack.
     """
+    slack_request = respx_mock.post(
+        url=f"{settings.secret_settings.slack_webhook_url}"
+    ).mock(return_value=Response(status_code=200))
+
     # When we receive a withings notification for an unknown user
     with client:
         response = client.post(
@@ -147,5 +154,8 @@ def test_notification_unknown_user(
             },
         )
 
-    # Then the webhook returns the expected error.
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    # Then the webhook returns immediately with a success
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    # And nothing is posted to slack.
+    assert not slack_request.called
@@ -0,0 +1,137 @@
+"""
+Load tests for the withings notification webhook: notifications of different
+users are processed in parallel, notifications of the same user are serialized.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from slackhealthbot.domain.usecases.withings import usecase_process_new_weight
+from slackhealthbot.main import app, lifespan
+from slackhealthbot.settings import Settings
+from tests.testsupport.actions.parallel_requests import execute_parallel_requests
+
+
+class ConcurrencyProbe:
+    """
+    Slow weight processing use case, which records how many notifications
+    are processed concurrently, overall and per user.
+    """
+
+    def __init__(self, wait_for_running_count: int | None = None):
+        """
+        :param wait_for_running_count: if set, the processing of a notification
+            only completes once that many notifications were processed concurrently.
+        """
+        self.wait_for_running_count = wait_for_running_count
+        self.running_count = 0
+        self.max_running_count = 0
+        self.running_count_by_user: dict[str, int] = collections.Counter()
+        self.max_running_count_by_user: dict[str, int] = collections.Counter()
+        self.processed_count = 0
+        self._enough_running = asyncio.Event()
+
+    async def process_new_weight(self, new_weight_parameters):
+        user = new_weight_parameters.withings_userid
+        self.running_count += 1
+        self.running_count_by_user[user] += 1
+        self.max_running_count = max(self.max_running_count, self.running_count)
+        self.max_running_count_by_user[user] = max(
+            self.max_running_count_by_user[user], self.running_count_by_user[user]
+        )
+        if self.running_count == self.wait_for_running_count:
+            self._enough_running.set()
+        try:
+            if self.wait_for_running_count is None:
+                await asyncio.sleep(0.01)
+            else:
+                await asyncio.wait_for(self._enough_running.wait(), timeout=5)
+        finally:
+            self.running_count -= 1
+            self.running_count_by_user[user] -= 1
+            self.processed_count += 1
+
+
+async def _post_notifications(
+    monkeypatch: pytest.MonkeyPatch,
+    probe: ConcurrencyProbe,
+    notifications: list[dict],
+) -> float:
+    """
+    Post the given notifications in parallel, and wait for them to be processed.
+
+    :return: the number of notifications processed per second.
+    """
+    monkeypatch.setattr(usecase_process_new_weight, "do", probe.process_new_weight)
+    notifications_to_post = list(notifications)
+
+    async def post_webhook(ac: AsyncClient):
+        await ac.post(
+            "/withings-notification-webhook/",
+            headers={"content-type": "application/x-www-form-urlencoded"},
+            data=notifications_to_post.pop(),
+        )
+
+    async with lifespan(app):
+        start = time.monotonic()
+        await execute_parallel_requests(
+            app=app,
+            request_count=len(notifications),
+            request_coro=post_webhook,
+        )
+    assert probe.processed_count == len(notifications)
+    return len(notifications) / (time.monotonic() - start)
+
+
+@pytest.mark.asyncio
+async def test_throughput_scales_with_users(
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+):
+    """
+    Given a weight processing which takes some time
+    When we receive notifications for more different users than there are workers
+    Then all the workers process notifications in parallel
+    When we receive many notifications for the same user
+    Then the notifications are processed one at a time.
+    """
+    worker_count = settings.app_settings.withings.workers.worker_count
+    notification_count = 3 * worker_count
+
+    # When we receive notifications for more different users than there are workers
+    multiple_users_probe = ConcurrencyProbe(wait_for_running_count=worker_count)
+    multiple_users_throughput = await _post_notifications(
+        monkeypatch,
+        multiple_users_probe,
+        notifications=[
+            {"userid": f"user{index}", "startdate": 1, "enddate": 2}
+            for index in range(notification_count)
+        ],
+    )
+
+    # When we receive many notifications for the same user
+    single_user_probe = ConcurrencyProbe()
+    single_user_throughput = await _post_notifications(
+        monkeypatch,
+        single_user_probe,
+        notifications=[
+            {"userid": "someuser", "startdate": index, "enddate": index + 1}
+            for index in range(notification_count)
+        ],
+    )
+
+    logging.info(
+        f"{notification_count} notifications: "
+        f"{multiple_users_throughput:.1f}/s for different users, "
+        f"{single_user_throughput:.1f}/s for a single user"
+    )
+    # Then all the workers process notifications in parallel
+    assert multiple_users_probe.max_running_count == worker_count
+    assert set(multiple_users_probe.max_running_count_by_user.values()) == {1}
+    # Then the notifications are processed one at a time.
+    assert single_user_probe.max_running_count == 1
@@ -18,6 +18,10 @@ from slackhealthbot.domain.localrepository.localwithingsrepository import (
     FitnessData,
     LocalWithingsRepository,
 )
+from slackhealthbot.domain.usecases.withings import usecase_process_new_weight
+from slackhealthbot.domain.usecases.withings.usecase_process_new_weight import (
+    NewWeightParameters,
+)
 from slackhealthbot.main import app, lifespan
 from slackhealthbot.settings import Settings
 from tests.testsupport.actions.parallel_requests import (
@@ -350,3 +354,37 @@ async def test_duplicate_weight_parallel_notification(
     assert slack_request.call_count == 1
     actual_message = json.loads(slack_request.calls[0].request.content)["text"]
     assert "↘️" in actual_message
+
+
+def test_failed_notification_processed_again(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    Given a weight processing which fails the first time
+    When we receive the same callback twice from withings
+    Then the notification is processed again after the failure.
+    """
+    processed_notifications: list[NewWeightParameters] = []
+
+    async def process_new_weight(new_weight_parameters: NewWeightParameters):
+        processed_notifications.append(new_weight_parameters)
+        if len(processed_notifications) == 1:
+            raise ValueError("Simulated failure")
+
+    monkeypatch.setattr(usecase_process_new_weight, "do", process_new_weight)
+
+    for _ in range(2):
+        with client:
+            response = client.post(
+                "/withings-notification-webhook/",
+                headers={"content-type": "application/x-www-form-urlencoded"},
+                data={
+                    "userid": "someuser",
+                    "startdate": 1683894606,
+                    "enddate": 1686570821,
+                },
+            )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    assert len(processed_notifications) == 2  # noqa: PLR2004
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from slackhealthbot.main import app
+from slackhealthbot.settings import Settings
+from slackhealthbot.tasks.configreload import (
+    reload_settings,
+    reloads_counter,
+    watch_config,
+)
+
+CUSTOM_CONFIG = """
+fitbit:
+  activities:
+    activity_types:
+      - name: Dancing
+        id: 123
+        report:
+          daily: true
+          realtime: true
+          daily_goals:
+            distance_km: {distance_km}
+"""
+
+
+def write_custom_config(path: Path, content: str):
+    # Bump the modification time, in case the file system's resolution
+    # doesn't tell two quick writes apart.
+    mtime_ns = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+
+
+def get_daily_distance_goal() -> float | None:
+    settings: Settings = app.container.settings()
+    report = settings.app_settings.fitbit.activities.get_report(123)
+    return report.daily_goals.distance_km
+
+
+@pytest.fixture
+def custom_config_path(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    db_path: str,
+) -> Path:
+    path = tmp_path / "app-custom.yaml"
+    write_custom_config(path, CUSTOM_CONFIG.format(distance_km=5))
+    monkeypatch.setenv("SHB_CUSTOM_CONFIG_PATH", str(path))
+    # The reloaded settings keep using the test database.
+    monkeypatch.setenv("DATABASE_PATH", db_path)
+    app.container.settings.reset_override()
+    app.container.settings.reset()
+    return path
+
+
+@pytest.mark.asyncio
+async def test_reload_when_config_changes(custom_config_path: Path):
+    """
+    Given a watched configuration
+    When the custom configuration file changes
+    Then the settings are reloaded
+    And the activity reports are compiled from the new configuration.
+    """
+    assert get_daily_distance_goal() == 5  # noqa: PLR2004
+    task = asyncio.create_task(watch_config(poll_interval_s=0.01))
+    try:
+        await asyncio.sleep(0.05)
+        write_custom_config(custom_config_path, CUSTOM_CONFIG.format(distance_km=8))
+        async with asyncio.timeout(5):
+            while get_daily_distance_goal() != 8:  # noqa: PLR2004
+                await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_invalid_config_not_reloaded(custom_config_path: Path):
+    """
+    Given valid settings
+    When we reload an invalid configuration
+    Then the previous settings are kept.
+    """
+    settings = app.container.settings()
+    failure_count = reloads_counter.get(outcome="failure")
+    write_custom_config(
+        custom_config_path, CUSTOM_CONFIG.format(distance_km="not a distance")
+    )
+
+    assert not reload_settings()
+
+    assert app.container.settings() is settings
+    assert get_daily_distance_goal() == 5  # noqa: PLR2004
+    assert reloads_counter.get(outcome="failure") == failure_count + 1
@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+import pytest
+
+from slackhealthbot.tasks.eventlooplag import (
+    blocked_counter,
+    lag_histogram,
+    monitor_event_loop_lag,
+)
+
+
+def block_the_loop(duration_s: float):
+    time.sleep(duration_s)
+
+
+@pytest.mark.asyncio
+async def test_blocking_code_detected():
+    """
+    Given the lag monitor, with the watchdog enabled
+    When a coroutine blocks the event loop longer than the threshold
+    Then the blocking function is counted while it's blocking
+    And the lag is measured once the loop is unblocked.
+    """
+    location = "test_event_loop_lag.py:block_the_loop"
+    blocked_count = blocked_counter.get(location=location)
+    lag_sum_s = lag_histogram.get_sum()
+    monitor_task = asyncio.create_task(
+        monitor_event_loop_lag(interval_s=0.05, blocking_threshold_s=0.1)
+    )
+    await asyncio.sleep(0.01)
+
+    block_the_loop(0.5)
+    await asyncio.sleep(0.1)
+    monitor_task.cancel()
+    await asyncio.gather(monitor_task, return_exceptions=True)
+
+    assert blocked_counter.get(location=location) == blocked_count + 1
+    assert lag_histogram.get_sum() - lag_sum_s > 0.3  # noqa: PLR2004
@@ -10,11 +10,13 @@ from httpx import Response
 from respx import MockRouter
 
 import slackhealthbot
+from slackhealthbot.core.consistenthash import ConsistentHashRing, ShardAssignment
 from slackhealthbot.data.database.models import FitbitUser, User
 from slackhealthbot.domain.localrepository.localfitbitrepository import (
     LocalFitbitRepository,
 )
 from slackhealthbot.domain.models.activity import ActivityData
+from slackhealthbot.domain.models.users import UserLookup
 from slackhealthbot.domain.usecases.fitbit.usecase_update_user_oauth import (
     UpdateTokenUseCase,
 )
@@ -272,7 +274,10 @@ async def test_schedule_fitbit_poll(  # noqa: PLR0913
     task = await fitbitpoll.schedule_fitbit_poll(
         initial_delay_s=0,
     )
-    await asyncio.sleep(1)
+    # Wait for the first poll to post the sleep and activity messages.
+    async with asyncio.timeout(10):
+        while slack_request.call_count < 2:  # noqa: PLR2004
+            await asyncio.sleep(0.1)
     # Then the last sleep data is updated in the database
     actual_last_sleep_data = await local_fitbit_repository.get_sleep_by_user_lookup(
         user_lookup=fitbit_user.lookup,
@@ -400,3 +405,50 @@ async def test_fitbit_poll_activity_upserts_all_activities(
     assert activity_1.calories == 76  # noqa PLR2004 - literals are ok for tests
     assert activity_1.logged_at == datetime.datetime(2023, 1, 23, 9, 16)
     assert activity_1.total_minutes == 11  # noqa PLR2004 - literals are ok for tests
+
+
+@pytest.mark.asyncio
+async def test_sharded_poll(
+    local_fitbit_repository: LocalFitbitRepository,
+    fitbit_factories: tuple[UserFactory, FitbitUserFactory, FitbitActivityFactory],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    Given several users
+    When two processes poll fitbit, each with its shard assignment
+    Then each user is polled by exactly one process.
+    """
+    user_factory, fitbit_user_factory, _ = fitbit_factories
+    for _ in range(10):
+        user: User = user_factory.create(fitbit=None)
+        fitbit_user_factory.create(user_id=user.id)
+    polled: dict[str, list[UserLookup]] = {"a": [], "b": []}
+    polling_node = None
+
+    async def poll_sleep(cache: Cache, poll_target: fitbitpoll.PollTarget):
+        polled[polling_node].append(poll_target.user_identity.user_lookup)
+
+    async def poll_activity(cache: Cache, poll_target: fitbitpoll.PollTarget):
+        pass
+
+    monkeypatch.setattr(fitbitpoll, "fitbit_poll_sleep", poll_sleep)
+    monkeypatch.setattr(fitbitpoll, "fitbit_poll_activity", poll_activity)
+
+    ring = ConsistentHashRing(["a", "b"])
+    for polling_node in ring.nodes:
+        await do_poll(
+            local_fitbit_repo=local_fitbit_repository,
+            cache=Cache(),
+            when=datetime.date(2023, 1, 23),
+            shard=ShardAssignment(ring=ring, node=polling_node),
+        )
+
+    all_user_lookups = [
+        user_identity.user_lookup
+        for user_identity in await local_fitbit_repository.get_all_user_identities()
+    ]
+    assert sorted(polled["a"] + polled["b"], key=str) == sorted(
+        all_user_lookups, key=str
+    )
+    assert polled["a"]
+    assert polled["b"]
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from slackhealthbot.core.consistenthash import ShardAssignment
+from slackhealthbot.settings import Settings
+from slackhealthbot.tasks.leaderelection import (
+    leader_gauge,
+    run_leader_election,
+    run_shard_membership,
+    shard_members_gauge,
+)
+
+
+async def wait_for(condition, timeout_s: float = 5.0):
+    async with asyncio.timeout(timeout_s):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_single_leader(
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+):
+    """
+    Given two processes competing for the same lease
+    When the leader election runs
+    Then only one process is elected
+    And the other process is elected when the leader stops.
+    """
+    monkeypatch.setattr(
+        settings.app_settings.leader_election, "heartbeat_interval_s", 0.01
+    )
+    leaders: set[str] = set()
+
+    def create_callbacks(holder: str):
+        async def on_elected():
+            leaders.add(holder)
+
+        async def on_demoted():
+            leaders.discard(holder)
+
+        return {"on_elected": on_elected, "on_demoted": on_demoted}
+
+    first_task = run_leader_election(
+        name="test", holder="first", **create_callbacks("first")
+    )
+    await wait_for(lambda: leaders == {"first"})
+    second_task = run_leader_election(
+        name="test", holder="second", **create_callbacks("second")
+    )
+    # Let the second process try to acquire the lease a few times.
+    await asyncio.sleep(0.05)
+    assert leaders == {"first"}
+    assert leader_gauge.get(lease="test", holder="first") == 1
+    assert leader_gauge.get(lease="test", holder="second") == 0
+
+    first_task.cancel()
+    await asyncio.gather(first_task, return_exceptions=True)
+    await wait_for(lambda: leaders == {"second"})
+    assert leaders == {"second"}
+    assert leader_gauge.get(lease="test", holder="first") == 0
+    assert leader_gauge.get(lease="test", holder="second") == 1
+
+    second_task.cancel()
+    await asyncio.gather(second_task, return_exceptions=True)
+    assert leaders == set()
+
+
+@pytest.mark.asyncio
+async def test_shard_membership(
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+):
+    """
+    Given a process sharing the work of a group
+    When another process joins the group
+    Then the work is split between the two processes
+    When the other process leaves the group
+    Then the first process gets all the work again.
+    """
+    monkeypatch.setattr(
+        settings.app_settings.leader_election, "heartbeat_interval_s", 0.01
+    )
+    shards: dict[str, ShardAssignment] = {}
+
+    def on_rebalanced(holder: str):
+        return lambda assignment: shards.__setitem__(holder, assignment)
+
+    first_task = run_shard_membership(
+        group="test", holder="first", on_rebalanced=on_rebalanced("first")
+    )
+    await wait_for(lambda: "first" in shards)
+    assert shards["first"].ring.nodes == {"first"}
+
+    second_task = run_shard_membership(
+        group="test", holder="second", on_rebalanced=on_rebalanced("second")
+    )
+    await wait_for(
+        lambda: all(
+            holder in shards and shards[holder].ring.nodes == {"first", "second"}
+            for holder in ("first", "second")
+        )
+    )
+    keys = [f"user{index}" for index in range(100)]
+    for key in keys:
+        assert shards["first"].owns(key) != shards["second"].owns(key)
+    assert shard_members_gauge.get(group="test") == 2  # noqa: PLR2004
+
+    second_task.cancel()
+    await asyncio.gather(second_task, return_exceptions=True)
+    await wait_for(lambda: shards["first"].ring.nodes == {"first"})
+    assert all(shards["first"].owns(key) for key in keys)
+
+    first_task.cancel()
+    await asyncio.gather(first_task, return_exceptions=True)
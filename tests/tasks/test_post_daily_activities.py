@@ -118,12 +118,15 @@ async def test_post_daily_activities(
     )
 
     # Wait for one iteration of the scheduled task:
-    # A few seconds = 1 iteration, because now is just before the post time.
-    # We expect a timeout because this task runs forever
-    # (after posting to slack, it sleeps until the next time it should post).
-    with pytest.raises(TimeoutError):
-        async with asyncio.timeout(5):
-            await task.get_coro()
+    # now is just before the post time.
+    async with asyncio.timeout(5):
+        while not slack_request.called:
+            await asyncio.sleep(0.1)
+    # After posting to slack, the task sleeps until the next time it should post.
+    await asyncio.sleep(0.5)
+    assert not task.done()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
 
     assert slack_request.call_count == 1
     actual_activity_message = json.loads(slack_request.calls.last.request.content)[
@@ -0,0 +1,132 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slackhealthbot.core.schedules import DailySchedule, IntervalSchedule
+from slackhealthbot.data.repositories.sqlalchemyschedulerepository import (
+    SQLAlchemyScheduleRepository,
+)
+from slackhealthbot.tasks import scheduler
+from slackhealthbot.tasks.scheduler import missed_runs_counter, run_on_schedule
+
+
+class RecordingJob:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.runs: list[datetime.datetime] = []
+
+    async def __call__(self, scheduled_at: datetime.datetime):
+        self.runs.append(scheduled_at)
+        if self.fail:
+            raise ValueError("failed")
+
+
+async def run_for(coro, duration_s: float):
+    task = asyncio.create_task(coro)
+    await asyncio.sleep(duration_s)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_first_run_recorded(mocked_async_session: AsyncSession):
+    """
+    Given a job which never ran, on an interval schedule
+    When the scheduler starts
+    Then the job runs right away
+    And its run is recorded.
+    """
+    repo = SQLAlchemyScheduleRepository(db=mocked_async_session)
+    job = RecordingJob()
+
+    await run_for(
+        run_on_schedule(
+            name="job",
+            schedule=IntervalSchedule(datetime.timedelta(hours=1)),
+            job=job,
+        ),
+        duration_s=0.5,
+    )
+
+    assert len(job.runs) == 1
+    assert await repo.get_last_run(name="job") == job.runs[0]
+
+
+@pytest.mark.asyncio
+async def test_missed_runs_caught_up(mocked_async_session: AsyncSession):
+    """
+    Given a daily job whose last run was 3 days ago
+    When the scheduler starts
+    Then the latest missed run runs right away, and only that one.
+    """
+    repo = SQLAlchemyScheduleRepository(db=mocked_async_session)
+    now = scheduler.now()
+    schedule = DailySchedule((now - datetime.timedelta(hours=1)).time())
+    latest_missed_run = schedule.next_after(now - datetime.timedelta(days=1))
+    await repo.record_run(
+        name="daily", scheduled_at=latest_missed_run - datetime.timedelta(days=3)
+    )
+    job = RecordingJob()
+
+    await run_for(
+        run_on_schedule(name="daily", schedule=schedule, job=job),
+        duration_s=0.5,
+    )
+
+    assert job.runs == [latest_missed_run]
+    assert missed_runs_counter.get(job="daily") == 2  # noqa: PLR2004
+    assert await repo.get_last_run(name="daily") == latest_missed_run
+
+
+@pytest.mark.asyncio
+async def test_failed_run_not_recorded(mocked_async_session: AsyncSession):
+    """
+    Given a job which fails
+    When it runs
+    Then its run isn't recorded, so that it runs again after a restart.
+    """
+    repo = SQLAlchemyScheduleRepository(db=mocked_async_session)
+    job = RecordingJob(fail=True)
+
+    await run_for(
+        run_on_schedule(
+            name="job",
+            schedule=IntervalSchedule(datetime.timedelta(hours=1)),
+            job=job,
+        ),
+        duration_s=0.5,
+    )
+
+    assert len(job.runs) == 1
+    assert await repo.get_last_run(name="job") is None
+
+
+@pytest.mark.asyncio
+async def test_early_run_not_repeated(
+    mocked_async_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    Given a daily job
+    When the wall clock is still a bit before the scheduled time after the run
+    Then the job doesn't run again before the next day.
+    """
+    scheduled_at = datetime.datetime(2024, 8, 19, 21, 0).astimezone()
+    monkeypatch.setattr(
+        scheduler, "now", lambda: scheduled_at - datetime.timedelta(seconds=0.2)
+    )
+    job = RecordingJob()
+
+    await run_for(
+        run_on_schedule(
+            name="daily",
+            schedule=DailySchedule(datetime.time(hour=21)),
+            job=job,
+            persistent=False,
+        ),
+        duration_s=1,
+    )
+
+    assert job.runs == [scheduled_at]
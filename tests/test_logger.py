@@ -0,0 +1,76 @@
+import io
+import json
+import logging
+
+import pytest
+from asgi_correlation_id import correlation_id
+
+from slackhealthbot.logger import create_log_handlers, dropped_logs_counter
+from slackhealthbot.settings import LogFormat, Logging
+
+
+@pytest.fixture
+def test_logger(request: pytest.FixtureRequest) -> logging.Logger:
+    # A new logger per test: the logging configuration of the database migrations
+    # disables the existing loggers.
+    logger = logging.getLogger(request.node.name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+
+def test_json_logs(test_logger: logging.Logger):
+    """
+    Given the logs configured in the json format
+    When we log during a request, with an exception
+    Then the writer thread writes a JSON object
+    And it has the correlation id of the request, and the traceback.
+    """
+    stream = io.StringIO()
+    queue_handler, listener = create_log_handlers(
+        Logging(format=LogFormat.json), stream=stream
+    )
+    test_logger.addHandler(queue_handler)
+    listener.start()
+    token = correlation_id.set("somecorrelationid")
+    payload = {"activity": 1}
+
+    try:
+        raise ValueError("failed")
+    except ValueError:
+        test_logger.exception("Error processing %s", payload)
+    # The logged arguments may change once logged.
+    payload["activity"] = 2
+    correlation_id.reset(token)
+    listener.stop()
+
+    record = json.loads(stream.getvalue())
+    assert record["level"] == "ERROR"
+    assert record["logger"] == test_logger.name
+    assert record["correlation_id"] == "somecorrelationid"
+    assert record["message"] == "Error processing {'activity': 1}"
+    assert "ValueError: failed" in record["exc_info"]
+
+
+def test_logs_dropped_when_queue_full(test_logger: logging.Logger):
+    """
+    Given a log queue which is full
+    When we log
+    Then the records are dropped and counted, without waiting
+    And the queued records are still written.
+    """
+    stream = io.StringIO()
+    queue_handler, listener = create_log_handlers(Logging(queue_size=1), stream=stream)
+    test_logger.addHandler(queue_handler)
+    dropped_count = dropped_logs_counter.get(level="WARNING")
+
+    for index in range(3):
+        test_logger.warning(f"message {index}")
+    listener.start()
+    listener.stop()
+
+    assert dropped_logs_counter.get(level="WARNING") == dropped_count + 2
+    [line] = stream.getvalue().splitlines()
+    assert line.endswith("WARNING   [None] message 0")
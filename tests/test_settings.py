@@ -0,0 +1,108 @@
+import logging
+import time
+from copy import deepcopy
+
+from slackhealthbot.settings import (
+    Activities,
+    ActivityType,
+    Goals,
+    Report,
+    ReportField,
+)
+
+
+def test_report_merged_with_default_report():
+    """
+    Given activity types with and without a report configuration
+    When we get their reports
+    Then the reports are merged with the default report.
+    """
+    activities = Activities(
+        activity_types=[
+            ActivityType(name="Spinning", id=55001),
+            ActivityType(
+                name="Treadmill",
+                id=90019,
+                report=Report(
+                    daily=True,
+                    realtime=False,
+                    daily_goals=Goals(distance_km=2.0),
+                ),
+            ),
+        ],
+    )
+
+    assert activities.get_report(55001) == activities.default_report
+    treadmill_report = activities.get_report(90019)
+    assert treadmill_report.fields == tuple(ReportField)
+    assert treadmill_report.daily_goals.distance_km == 2.0  # noqa: PLR2004
+    assert activities.get_report(1) is None
+    assert activities.daily_activity_type_ids == (90019,)
+
+
+def test_compiled_again_on_assignment():
+    """
+    Given compiled activity types
+    When we assign other activity types
+    Then they're compiled.
+    """
+    activities = Activities(activity_types=[ActivityType(name="Spinning", id=55001)])
+
+    activities.activity_types = [
+        ActivityType(name="Walk", id=90013, report=Report(daily=True, realtime=True))
+    ]
+
+    assert activities.get_activity_type(55001) is None
+    assert activities.get_activity_type(90013).name == "Walk"
+    assert activities.daily_activity_type_ids == (90013,)
+
+
+def test_report_lookup_benchmark():
+    """
+    Micro-benchmark of the lookups done for each activity: the compiled
+    reports are looked up by id, without scanning or copying the configuration.
+    """
+    lookup_count = 10000
+    activities = Activities(
+        activity_types=[
+            ActivityType(
+                name=f"Activity {index}",
+                id=index,
+                report=Report(daily=index % 2 == 0, realtime=True),
+            )
+            for index in range(50)
+        ],
+    )
+    activity_type_id = 49
+
+    def scan_and_copy() -> Report:
+        # The lookup before the activity types were compiled.
+        activity_type = next(
+            x for x in activities.activity_types if x.id == activity_type_id
+        )
+        report = deepcopy(activity_type.report)
+        if not report.fields:
+            report = report.model_copy(
+                update={"fields": activities.default_report.fields}
+            )
+        return report
+
+    start = time.perf_counter()
+    for _ in range(lookup_count):
+        scan_and_copy()
+    scan_duration_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(lookup_count):
+        activities.get_activity_type(activity_type_id)
+        activities.get_report(activity_type_id)
+    compiled_duration_s = time.perf_counter() - start
+
+    logging.info(
+        f"{lookup_count} report lookups: {scan_duration_s:.3f}s scanning and copying, "
+        f"{compiled_duration_s:.3f}s compiled"
+    )
+    assert activities.get_report(activity_type_id) == scan_and_copy()
+    # The lookups don't copy the report.
+    assert activities.get_report(activity_type_id) is activities.get_report(
+        activity_type_id
+    )
@@ -66,6 +66,7 @@ async def mocked_async_session(
     async for session in mocked_async_session_generator():
         app.container.db.override(session)
         yield session
+        app.container.db.reset_override()
 
 
 @pytest.fixture
@@ -0,0 +1,53 @@
+import json
+
+from httpx import Response
+
+
+def streamed_response(
+    deltas: list[str],
+    completed: bool = True,
+    input_tokens: int = 42,
+    output_tokens: int = 12,
+) -> Response:
+    """
+    :return: a streamed openai response, with the given text deltas.
+        https://platform.openai.com/docs/api-reference/responses-streaming
+    """
+    events = [
+        {
+            "type": "response.output_text.delta",
+            "item_id": "msg_1",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": delta,
+            "sequence_number": index,
+        }
+        for index, delta in enumerate(deltas)
+    ]
+    if completed:
+        events.append(
+            {
+                "type": "response.completed",
+                "sequence_number": len(deltas),
+                "response": {
+                    "id": "resp_1",
+                    "object": "response",
+                    "status": "completed",
+                    "output": [],
+                    "usage": {
+                        "input_tokens": input_tokens,
+                        "input_tokens_details": {"cached_tokens": 0},
+                        "output_tokens": output_tokens,
+                        "output_tokens_details": {"reasoning_tokens": 0},
+                        "total_tokens": input_tokens + output_tokens,
+                    },
+                },
+            }
+        )
+    return Response(
+        status_code=200,
+        headers={"content-type": "text/event-stream"},
+        content="".join(
+            f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events
+        ),
+    )